@@ -0,0 +1,102 @@
+# =========================
+# BENCH: scoring skalar (score_candidate_profile per pasangan) vs score_pairs_batch (NumPy)
+# - Skenario "rescoring offline": banyak baris x kandidat sekaligus
+# - Cek skor + kolom debug batch sama dengan versi skalar (toleransi float)
+#
+# Jalankan (dari folder repo):
+#   py bench\bench_batch_score.py
+#   py bench\bench_batch_score.py --rows 20000 --cands 10
+# =========================
+
+import os
+import sys
+import time
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import script
+import similarity
+import textnorm
+from bench_textnorm import load_seed, synth_rows
+
+KEC = ["", "", "Denpasar Selatan", "Denpasar Barat", "Denpasar Timur", "Denpasar Utara"]
+
+
+def build_pairs(rows, cand_names, cand_addrs, n_cands, rng):
+    profiles = [
+        script.RowProfile(nama, script.normalize_addr(alamat), rng.choice(KEC))
+        for nama, alamat in rows
+    ]
+    row_ix, names, addrs, echo, gen = [], [], [], [], []
+    for i in range(len(rows)):
+        for j in range(n_cands):
+            k = (i * 7 + j) % len(cand_names)
+            row_ix.append(i)
+            names.append(cand_names[k])
+            addrs.append(cand_addrs[k % len(cand_addrs)] if rng.random() > 0.1 else "")
+            echo.append(rng.random() < 0.05)
+            gen.append(rng.random() < 0.15)
+    return profiles, row_ix, names, addrs, echo, gen
+
+def run_scalar(profiles, row_ix, names, addrs, echo, gen):
+    out = np.empty(len(names))
+    cols = {}
+    for k in range(len(names)):
+        sc, dbg = script.score_candidate_profile(
+            profiles[row_ix[k]], names[k], addrs[k], is_echo=echo[k], is_generic=gen[k]
+        )
+        out[k] = sc
+        cols.setdefault("s_name", []).append(dbg.s_name)
+        cols.setdefault("s_addr", []).append(dbg.s_addr)
+        cols.setdefault("ov_addr", []).append(dbg.ov_addr)
+        cols.setdefault("bonus", []).append(dbg.bonus)
+        cols.setdefault("penalty", []).append(dbg.penalty)
+    return out, cols
+
+def reset_caches():
+    similarity.clear_caches()
+    textnorm.clear_caches()
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark scoring skalar vs batch NumPy")
+    ap.add_argument("--rows", type=int, default=5000)
+    ap.add_argument("--cands", type=int, default=10, help="kandidat per baris")
+    ap.add_argument("--seed", type=int, default=5171)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    seed_rows, cand_names, cand_addrs = load_seed()
+    rows = synth_rows(seed_rows, args.rows, rng)
+    pool_names = cand_names + [r[0] for r in synth_rows(seed_rows, 400, rng)]
+    pool_addrs = cand_addrs + [r[1] for r in synth_rows(seed_rows, 400, rng)]
+    pairs = build_pairs(rows, pool_names, pool_addrs, args.cands, rng)
+    n = len(pairs[2])
+
+    reset_caches()
+    t0 = time.perf_counter()
+    sc_scalar, cols = run_scalar(*pairs)
+    t_scalar = time.perf_counter() - t0
+
+    reset_caches()
+    t0 = time.perf_counter()
+    res = script.score_pairs_batch(pairs[0], pairs[1], pairs[2], pairs[3], is_echo=pairs[4], is_generic=pairs[5])
+    t_batch = time.perf_counter() - t0
+
+    diff = float(np.max(np.abs(res["score"] - sc_scalar))) if n else 0.0
+    col_diff = {c: float(np.max(np.abs(res[c] - np.asarray(v, dtype=float)))) for c, v in cols.items()} if n else {}
+    print(f"✔ {n} pasangan ({args.rows} baris x {args.cands} kandidat)", flush=True)
+    print(f"   beda skor maks = {diff:.3g}; kolom: " + ", ".join(f"{c}={d:.3g}" for c, d in col_diff.items()), flush=True)
+    if diff > 1e-9 or any(d > 1e-9 for d in col_diff.values()):
+        sys.exit(1)
+
+    print("\nmode      detik    pasangan/detik", flush=True)
+    print(f"skalar  {t_scalar:>7.3f}   {n / max(1e-9, t_scalar):>12.0f}", flush=True)
+    print(f"batch   {t_batch:>7.3f}   {n / max(1e-9, t_batch):>12.0f}   (x{t_scalar / max(1e-9, t_batch):.1f})", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# =========================
+# BENCH: profil browser "default" vs "lean"
+# - Jalankan N baris pertama test.xlsx lewat process_row yang sama dengan script.py
+# - Ukur byte transfer (event Network.* dari performance log) dan detik per baris
+# - Cache query/place dimatikan supaya tiap profil benar-benar buka Google Maps
+#
+# Jalankan (dari folder repo):
+#   py bench\bench_browser_profile.py --rows 10
+#   py bench\bench_browser_profile.py --rows 10 --profiles lean --json bench_profile.json
+# =========================
+
+import os
+import sys
+import json
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd
+import script
+
+
+def drain_bytes(driver) -> int:
+    """
+    Jumlahkan encodedDataLength dari performance log sejak panggilan terakhir.
+    Request yang diblok (lean) tidak pernah sampai loadingFinished, jadi tidak terhitung.
+    """
+    total = 0
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return 0
+    for e in entries:
+        try:
+            msg = json.loads(e["message"])["message"]
+        except Exception:
+            continue
+        if msg.get("method") == "Network.loadingFinished":
+            total += int(msg.get("params", {}).get("encodedDataLength", 0) or 0)
+    return total
+
+
+def run_profile(profile, df, driver_path):
+    driver, log_fh = script.build_driver(driver_path, profile=profile, perf_log=True)
+    try:
+        # performance log butuh Network.enable; lean sudah, default belum
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+        except Exception:
+            pass
+
+        t0 = time.time()
+        script.open_home(driver)
+        home_sec = time.time() - t0
+        home_bytes = drain_bytes(driver)
+
+        per_row = []
+        for idx, row in df.iterrows():
+            if script.should_stop():
+                break
+            t1 = time.time()
+            res = script.process_row(driver, idx, row)
+            sec = time.time() - t1
+            nbytes = drain_bytes(driver)
+            kode = ((res or {}).get("gc") or (None,))[0]
+            per_row.append({"idx": int(idx), "sec": sec, "bytes": nbytes, "kode": kode})
+    finally:
+        script.close_driver(driver, log_fh)
+
+    n = max(1, len(per_row))
+    return {
+        "profile": profile,
+        "rows": len(per_row),
+        "home_sec": round(home_sec, 3),
+        "home_bytes": home_bytes,
+        "sec_per_row": round(sum(r["sec"] for r in per_row) / n, 3),
+        "bytes_per_row": int(sum(r["bytes"] for r in per_row) / n),
+        "total_bytes": home_bytes + sum(r["bytes"] for r in per_row),
+        "per_row": per_row,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Bandingkan profil browser default vs lean")
+    ap.add_argument("--input", default=os.path.join(ROOT, "test.xlsx"))
+    ap.add_argument("--rows", type=int, default=10)
+    ap.add_argument("--profiles", default="default,lean")
+    ap.add_argument("--json", default="", help="simpan hasil lengkap ke file json")
+    args = ap.parse_args()
+
+    script.install_signal_handlers()
+    script.QUERY_CACHE_ENABLED = False
+    script.PLANNER_ENABLED = False  # urutan query tetap: profil dibandingkan dengan query yang sama
+
+    df = script.prepare_dataframe(pd.read_excel(args.input)).head(args.rows)
+    # paksa semua baris lewat browser (abaikan coords lama)
+    df["latitude"] = pd.NA
+    df["longitude"] = pd.NA
+
+    driver_path = script.resolve_chromedriver_path()
+    results = []
+    for profile in [p.strip() for p in args.profiles.split(",") if p.strip()]:
+        print(f"\n=== profil {profile} ===", flush=True)
+        results.append(run_profile(profile, df, driver_path))
+
+    print("\nprofil    baris   detik/baris   KB/baris   KB total", flush=True)
+    for r in results:
+        print(
+            f"{r['profile']:<9} {r['rows']:>5}   {r['sec_per_row']:>11.2f}   "
+            f"{r['bytes_per_row'] / 1024:>8.0f}   {r['total_bytes'] / 1024:>8.0f}",
+            flush=True,
+        )
+    if len(results) >= 2 and results[0]["bytes_per_row"] and results[0]["sec_per_row"]:
+        base = results[0]
+        for r in results[1:]:
+            print(
+                f"{r['profile']} vs {base['profile']}: "
+                f"byte x{r['bytes_per_row'] / max(1, base['bytes_per_row']):.2f}, "
+                f"waktu x{r['sec_per_row'] / base['sec_per_row']:.2f}",
+                flush=True,
+            )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 hasil -> {args.json}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# =========================
+# BENCH END-TO-END offline: script.process_row asli lawan server Maps tiruan
+# - Server bench/fake_maps.py jalan di thread (latensi/render bisa diatur), Chrome
+#   diarahkan ke sana lewat script.MAPS_BASE_URL -> tidak ada request ke Google
+# - Loop yang diukur sama dengan run biasa: run_query_via_url -> buka detail ->
+#   extract_place_record -> scoring -> finalize (cache query/place dimatikan)
+# - Output: baris/menit, detik per tahap (p50/p95/p99 dari metrics.py), status_kode,
+#   jumlah request per jenis halaman; --json untuk simpan/diff antar commit
+#
+# Jalankan (dari folder repo):
+#   py bench\bench_e2e.py --rows 30
+#   py bench\bench_e2e.py --rows 30 --latency-ms 400 --render-ms 200 --json bench_e2e.json
+#   py bench\bench_e2e.py --rows 60 --engine cdp --tabs 4     (butuh: pip install websockets psutil)
+#   (offline: set SCREP_CHROMEDRIVER=path\chromedriver.exe)
+# =========================
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+import script
+import fake_maps
+from metrics import Metrics
+
+
+def input_rows(args, places):
+    """
+    Baris input: dari workbook (--input, diulang sampai --rows) atau sintetis dari tempat server.
+    """
+    if args.input:
+        df = script.prepare_dataframe(pd.read_excel(args.input))
+        recs = df[["nama_usaha", "alamat_usaha", "nmkec"]].to_dict("records")
+        rows = [dict(recs[i % len(recs)]) for i in range(args.rows)]
+        for r in rows:
+            r["latitude"] = None
+            r["longitude"] = None
+        return rows
+    return fake_maps.synthetic_rows(places, args.rows, args.seed)
+
+
+def run_selenium(args, rows, metrics):
+    driver, log_fh = script.build_driver(script.resolve_chromedriver_path(), profile=args.profile)
+    n = 0
+    try:
+        script.open_home(driver)
+        script.take_row_stages()
+        t0 = time.time()
+        for idx, row in enumerate(rows):
+            if script.should_stop():
+                break
+            res = script.run_row(driver, idx, row)
+            if res is None:
+                break
+            metrics.row_done((res.get("gc") or (None,))[0], res.pop("stages", ()))
+            n += 1
+        metrics.sample_rss()
+        return n, time.time() - t0
+    finally:
+        script.close_driver(driver, log_fh)
+
+
+async def run_cdp(args, rows, metrics):
+    """
+    Engine CDP: satu Chrome, --tabs tab mengambil baris dari antrean bersama.
+    """
+    browser = await script.cdp_engine.Browser.launch(script.build_chrome_options(args.profile).arguments)
+    todo = asyncio.Queue()
+    for item in enumerate(rows):
+        todo.put_nowait(item)
+    n = 0
+
+    async def tab_loop(tab):
+        nonlocal n
+        await script.cdp_open_home(tab)
+        while not todo.empty() and not script.should_stop():
+            idx, row = todo.get_nowait()
+            res = await script.cdp_run_row(tab, idx, row)
+            if res is None:
+                break
+            metrics.row_done((res.get("gc") or (None,))[0], res.pop("stages", ()))
+            n += 1
+
+    try:
+        tabs = [await browser.new_tab() for _ in range(max(1, args.tabs))]
+        if args.profile == "lean":
+            for tab in tabs:
+                await tab.block_urls(script.LEAN_BLOCKED_URLS)
+        t0 = time.time()
+        await asyncio.gather(*(tab_loop(tab) for tab in tabs))
+        metrics.sample_rss()
+        return n, time.time() - t0
+    finally:
+        await browser.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Bench end-to-end lawan server Google Maps tiruan")
+    ap.add_argument("--rows", type=int, default=30)
+    ap.add_argument("--input", default=os.path.join(ROOT, "test_CONTOH_OUTPUT.xlsx"),
+                    help="workbook input (nama_usaha/alamat_usaha/nmkec); '' = baris sintetis")
+    ap.add_argument("--profile", default="lean", help="profil browser (lean = headless)")
+    ap.add_argument("--engine", choices=("selenium", "cdp"), default="selenium")
+    ap.add_argument("--tabs", type=int, default=4, help="jumlah tab untuk --engine cdp")
+    ap.add_argument("--json", default="", help="simpan ringkasan ke file json")
+    fake_maps.add_server_args(ap)
+    args = ap.parse_args()
+
+    fm = fake_maps.server_from_args(args)
+    server, base = fm.serve(0)
+    script.MAPS_BASE_URL = base
+    script.QUERY_CACHE_ENABLED = False
+    script.PLANNER_ENABLED = False  # urutan query tetap -> hasil bisa dibandingkan antar run
+    script.install_signal_handlers()
+    script.METRICS = metrics = Metrics()
+
+    rows = input_rows(args, fm.index.places)
+    print(f"🗺 server tiruan {base} | {len(fm.index.places)} tempat | {len(rows)} baris | profil {args.profile} | engine {args.engine}", flush=True)
+
+    try:
+        if args.engine == "cdp":
+            n, t_rows = asyncio.run(run_cdp(args, rows, metrics))
+        else:
+            n, t_rows = run_selenium(args, rows, metrics)
+    finally:
+        server.shutdown()
+
+    rpm = n * 60.0 / t_rows if t_rows > 0 else 0.0
+    metrics.report()
+    script.report_wait_stats()
+    print(f"\n🏁 {n} baris dalam {t_rows:.1f}s -> {rpm:.1f} baris/menit | request server: {fm.hits}", flush=True)
+
+    if args.json:
+        out = {
+            "rows": n,
+            "sec": round(t_rows, 3),
+            "rows_per_min": round(rpm, 2),
+            "server": {
+                "places": len(fm.index.places), "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms,
+                "render_ms": args.render_ms, "consent": args.consent, "requests": fm.hits,
+            },
+            "profile": args.profile,
+            "engine": args.engine,
+            "tabs": args.tabs if args.engine == "cdp" else 1,
+            "rss_peak_mb": round(metrics.rss_peak_mb, 1),
+            "status": dict(metrics.status),
+            "stages": {
+                name: {
+                    "n": h.n, "total": round(h.total, 4), "p50": round(h.quantile(0.5), 4),
+                    "p95": round(h.quantile(0.95), 4), "p99": round(h.quantile(0.99), 4), "max": round(h.max, 4),
+                }
+                for name, h in sorted(metrics.stages.items())
+            },
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(out, f, indent=2)
+        print(f"💾 hasil -> {args.json}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
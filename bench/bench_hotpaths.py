@@ -0,0 +1,353 @@
+# =========================
+# BENCH MIKRO jalur panas matching + normalisasi (tanpa browser)
+# - Pasangan (input, kandidat) sintetis dari test.xlsx + test_CONTOH_OUTPUT.xlsx:
+#   ~35% kandidat = tempat yang benar (nama/alamat gmaps baris itu), sisanya pengecoh
+# - Tiap fungsi diukur terpisah (normalize_*, token, soft_token_overlap, fuzzy_ratio,
+#   score_candidate(_profile), build_queries_adaptive, finalize_decision) + jalur
+#   scoring penuh satu baris (RowProfile -> quick-score list -> skor detail top-2 ->
+#   early stop -> finalize)
+# - Warmup lalu --repeat kali; ops/detik dari median. Alokasi: puncak tracemalloc per
+#   batch dan byte yang tertahan per op (isi cache LRU ikut terhitung di mode cold)
+# - Cache LRU textnorm/similarity dikosongkan sebelum tiap batch (--cache cold, default)
+#   supaya yang terukur fungsi aslinya, bukan lookup cache
+# - Baseline: --save simpan json, --compare bandingkan (exit 1 kalau ada yang melambat
+#   lebih dari --tolerance persen)
+#
+# Jalankan (dari folder repo):
+#   py bench\bench_hotpaths.py --save bench_hotpaths.json
+#   py bench\bench_hotpaths.py --compare bench_hotpaths.json
+#   py bench\bench_hotpaths.py --only score,row_path --repeat 9
+# =========================
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import script
+import similarity
+import textnorm
+from bench_textnorm import load_seed, PREFIX, SUFFIX, STREET
+
+KEC = ["", "", "Denpasar Selatan", "Denpasar Barat", "Denpasar Timur", "Denpasar Utara"]
+
+
+# =========================
+# Data
+# =========================
+def _perturb_name(nama, rng):
+    nama = f"{rng.choice(PREFIX)}{nama}{rng.choice(SUFFIX)}"
+    return nama.upper() if rng.random() < 0.6 else nama
+
+def _perturb_addr(alamat, rng):
+    if rng.random() < 0.12:
+        return ""
+    for s in ("Jalan ", "Jl. ", "JL. ", "JALAN "):
+        if alamat.startswith(s):
+            alamat = rng.choice(STREET) + " " + alamat[len(s):]
+            break
+    if rng.random() < 0.4:
+        alamat = f"{alamat} RT {rng.randrange(1, 20)}/RW {rng.randrange(1, 9)}"
+    return alamat
+
+def build_pairs(n, rng):
+    """
+    n pasangan dict: nama_in/alamat_raw/kec (input register) + nama_g/alamat_g/lat/lon
+    (kandidat gmaps) + match (kandidat memang tempat yang benar).
+    """
+    seed_rows, cand_names, cand_addrs = load_seed()
+    k = min(len(seed_rows), len(cand_names), len(cand_addrs))
+    out = []
+    for _ in range(n):
+        i = rng.randrange(k)
+        nama, alamat = seed_rows[i]
+        match = rng.random() < 0.35
+        j = i if match else rng.randrange(len(cand_names))
+        out.append({
+            "nama_in": script.clean_text(_perturb_name(nama, rng)),
+            "alamat_raw": _perturb_addr(alamat, rng),
+            "kec": rng.choice(KEC),
+            "nama_g": cand_names[j],
+            "alamat_g": cand_addrs[j % len(cand_addrs)] if rng.random() > 0.1 else "",
+            "lat": rng.uniform(-8.72, -8.60),
+            "lon": rng.uniform(115.17, 115.26),
+            "match": match,
+        })
+    return out
+
+def build_rows(pairs, n_cands, rng):
+    """
+    Per baris: pasangan input + n_cands kandidat list (name_hint/sub_hint + record detail).
+    """
+    rows = []
+    for i, p in enumerate(pairs):
+        cands = [p] + [pairs[rng.randrange(len(pairs))] for _ in range(n_cands - 1)]
+        rng.shuffle(cands)
+        rows.append((p, [
+            {
+                "href": f"https://www.google.com/maps/place/x/data=!3d{c['lat']:.6f}!4d{c['lon']:.6f}",
+                "name_hint": c["nama_g"],
+                "sub_hint": (c["alamat_g"] or "").split(",")[0],
+                "rec": {
+                    "nama": c["nama_g"], "alamat": c["alamat_g"], "phone": "",
+                    "lat": c["lat"], "lon": c["lon"], "is_closed": False, "closed_type": None,
+                },
+            }
+            for c in cands
+        ]))
+    return rows
+
+
+# =========================
+# Kasus: setup(data) -> (fungsi batch, jumlah op per batch)
+# =========================
+def case_normalize_addr(d):
+    xs = [p["alamat_raw"] for p in d["pairs"]] + [p["alamat_g"] for p in d["pairs"]]
+    f = textnorm.normalize_addr
+    return (lambda: [f(x) for x in xs]), len(xs)
+
+def case_normalize_name(d):
+    xs = [p["nama_in"] for p in d["pairs"]] + [p["nama_g"] for p in d["pairs"]]
+    f = textnorm.normalize_name
+    return (lambda: [f(x) for x in xs]), len(xs)
+
+def case_name_tokens2(d):
+    xs = [p["nama_in"] for p in d["pairs"]] + [p["nama_g"] for p in d["pairs"]]
+    f = textnorm.name_tokens2
+    return (lambda: [f(x) for x in xs]), len(xs)
+
+def case_addr_tokens(d):
+    xs = [p["alamat_raw"] for p in d["pairs"]] + [p["alamat_g"] for p in d["pairs"]]
+    f = textnorm.addr_tokens
+    return (lambda: [f(x) for x in xs]), len(xs)
+
+def case_soft_token_overlap(d):
+    # set biasa (bukan frozenset) seperti pemanggil lama, supaya konversi ikut terukur
+    xs = [
+        (set(textnorm.name_tokens2(p["nama_in"])), set(textnorm.name_tokens2(p["nama_g"])))
+        for p in d["pairs"]
+    ]
+    f = similarity.soft_token_overlap
+    return (lambda: [f(a, b) for a, b in xs]), len(xs)
+
+def case_fuzzy_ratio(d):
+    xs = [(textnorm.normalize_name(p["nama_in"]), textnorm.normalize_name(p["nama_g"])) for p in d["pairs"]]
+    f = similarity.fuzzy_ratio
+    return (lambda: [f(a, b) for a, b in xs]), len(xs)
+
+def case_score_candidate(d):
+    xs = [
+        (p["nama_in"], textnorm.normalize_addr(p["alamat_raw"]), p["kec"], p["nama_g"], p["alamat_g"])
+        for p in d["pairs"]
+    ]
+    f = script.score_candidate
+    return (lambda: [f(*x) for x in xs]), len(xs)
+
+def case_score_candidate_profile(d):
+    xs = [
+        (script.RowProfile(p["nama_in"], textnorm.normalize_addr(p["alamat_raw"]), p["kec"]), p["nama_g"], p["alamat_g"])
+        for p in d["pairs"]
+    ]
+    f = script.score_candidate_profile
+    return (lambda: [f(*x) for x in xs]), len(xs)
+
+def case_build_queries_adaptive(d):
+    xs = [(p["nama_in"], p["alamat_raw"], p["kec"]) for p in d["pairs"]]
+    f, city = script.build_queries_adaptive, script.CITY_CONTEXT
+    return (lambda: [f(a, b, c, city) for a, b, c in xs]), len(xs)
+
+def case_finalize_decision(d):
+    xs = []
+    for p in d["pairs"]:
+        alamat_in = textnorm.normalize_addr(p["alamat_raw"])
+        prof = script.RowProfile(p["nama_in"], alamat_in, p["kec"])
+        sc, dbg = script.score_candidate_profile(prof, p["nama_g"], p["alamat_g"])
+        best = script.BestMatch()
+        best.take(sc, dbg, {
+            "nama": p["nama_g"], "alamat": p["alamat_g"], "phone": "", "lat": p["lat"], "lon": p["lon"],
+            "is_closed": False, "closed_type": None,
+        }, "bench")
+        xs.append((prof, best, alamat_in, p["kec"]))
+    f = script.finalize_decision
+    return (lambda: [f(*x) for x in xs]), len(xs)
+
+def row_path(p, cands, top_open=2):
+    """
+    Jalur scoring satu baris di process_row (list mode) tanpa browser.
+    """
+    queries = script.build_queries_adaptive(p["nama_in"], p["alamat_raw"], p["kec"], script.CITY_CONTEXT)
+    alamat_in = script.normalize_addr(p["alamat_raw"])
+    prof = script.RowProfile(p["nama_in"], alamat_in, p["kec"])
+    best = script.BestMatch()
+    scored = list(zip(script.quick_score_list_batch(prof, cands), cands))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    for ci, (_, c) in enumerate(scored[:top_open], start=1):
+        rec = c["rec"]
+        is_echo = script.looks_like_query_echo(rec["nama"] or "", queries[0], script.CITY_CONTEXT)
+        is_gen = script.is_generic_place_name(rec["nama"] or "")
+        sc, dbg = script.score_candidate_profile(prof, rec["nama"], rec["alamat"], is_echo=is_echo, is_generic=is_gen)
+        if sc > best.score:
+            best.take(sc, dbg, rec, f"listTop#{ci}")
+        if script.should_early_stop(best, script.THRESHOLD_EARLY_STOP, kec_in=prof.kec_in):
+            break
+    return script.finalize_decision(prof, best, alamat_in, p["kec"])
+
+def case_row_path(d):
+    rows = d["rows"]
+    return (lambda: [row_path(p, cands) for p, cands in rows]), len(rows)
+
+CASES = {
+    "normalize_addr": case_normalize_addr,
+    "normalize_name": case_normalize_name,
+    "name_tokens2": case_name_tokens2,
+    "addr_tokens": case_addr_tokens,
+    "soft_token_overlap": case_soft_token_overlap,
+    "fuzzy_ratio": case_fuzzy_ratio,
+    "score_candidate": case_score_candidate,
+    "score_candidate_profile": case_score_candidate_profile,
+    "build_queries_adaptive": case_build_queries_adaptive,
+    "finalize_decision": case_finalize_decision,
+    "row_path": case_row_path,
+}
+
+
+# =========================
+# Pengukuran
+# =========================
+def clear_caches():
+    textnorm.clear_caches()
+    similarity.clear_caches()
+
+def measure(batch, ops, warmup, repeat, cold):
+    for _ in range(warmup):
+        if cold:
+            clear_caches()
+        batch()
+    times = []
+    for _ in range(repeat):
+        if cold:
+            clear_caches()
+        t0 = time.perf_counter()
+        batch()
+        times.append(time.perf_counter() - t0)
+
+    # satu batch lagi di bawah tracemalloc (lebih lambat, tidak ikut waktu)
+    if cold:
+        clear_caches()
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        out = batch()
+        cur, peak = tracemalloc.get_traced_memory()
+        del out
+    finally:
+        tracemalloc.stop()
+
+    med = statistics.median(times)
+    return {
+        "ops": ops,
+        "median_sec": round(med, 6),
+        "best_sec": round(min(times), 6),
+        "ops_per_sec": round(ops / med, 1) if med > 0 else 0.0,
+        "us_per_op": round(med * 1e6 / ops, 3),
+        "peak_kb": round((peak - base) / 1024.0, 1),
+        "retained_b_per_op": round((cur - base) / ops, 1),
+    }
+
+def compare(results, baseline, tolerance):
+    """
+    Cetak selisih ops/detik terhadap baseline. Return jumlah kasus yang melambat > tolerance%.
+    """
+    base_cases = baseline.get("cases", {})
+    bad = 0
+    print(f"\n{'kasus':<24} {'baseline':>11} {'sekarang':>11} {'selisih':>9}", flush=True)
+    for name, r in results.items():
+        b = base_cases.get(name)
+        if not b or not b.get("ops_per_sec"):
+            print(f"{name:<24} {'-':>11} {r['ops_per_sec']:>11.0f} {'baru':>9}", flush=True)
+            continue
+        delta = (r["ops_per_sec"] / b["ops_per_sec"] - 1.0) * 100.0
+        flag = ""
+        if delta < -tolerance:
+            flag = "  ⚠ lebih lambat"
+            bad += 1
+        elif delta > tolerance:
+            flag = "  ✔ lebih cepat"
+        print(f"{name:<24} {b['ops_per_sec']:>11.0f} {r['ops_per_sec']:>11.0f} {delta:>+8.1f}%{flag}", flush=True)
+    return bad
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Bench mikro matching + normalisasi")
+    ap.add_argument("--pairs", type=int, default=5000, help="jumlah pasangan (input, kandidat)")
+    ap.add_argument("--rows", type=int, default=1000, help="jumlah baris untuk row_path")
+    ap.add_argument("--cands", type=int, default=8, help="kandidat list per baris (row_path)")
+    ap.add_argument("--warmup", type=int, default=1)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--cache", choices=("cold", "warm"), default="cold")
+    ap.add_argument("--only", default="", help="daftar kasus dipisah koma (default semua)")
+    ap.add_argument("--seed", type=int, default=5171)
+    ap.add_argument("--save", default="", help="simpan hasil sebagai baseline json")
+    ap.add_argument("--compare", default="", help="bandingkan dengan baseline json")
+    ap.add_argument("--tolerance", type=float, default=10.0, help="persen; lebih lambat dari ini = regresi")
+    args = ap.parse_args()
+
+    names = [n.strip() for n in args.only.split(",") if n.strip()] or list(CASES)
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        print(f"kasus tidak dikenal: {', '.join(unknown)} (pilihan: {', '.join(CASES)})", flush=True)
+        return 2
+
+    rng = random.Random(args.seed)
+    pairs = build_pairs(args.pairs, rng)
+    data = {"pairs": pairs, "rows": build_rows(pairs[:args.rows], args.cands, rng)}
+    cold = args.cache == "cold"
+
+    print(f"{len(pairs)} pasangan, {len(data['rows'])} baris x {args.cands} kandidat | cache {args.cache}", flush=True)
+    print(f"\n{'kasus':<24} {'ops/detik':>11} {'us/op':>9} {'puncak KB':>10} {'tertahan B/op':>14}", flush=True)
+    results = {}
+    for name in names:
+        batch, ops = CASES[name](data)
+        r = measure(batch, ops, args.warmup, args.repeat, cold)
+        results[name] = r
+        print(
+            f"{name:<24} {r['ops_per_sec']:>11.0f} {r['us_per_op']:>9.2f} "
+            f"{r['peak_kb']:>10.1f} {r['retained_b_per_op']:>14.1f}",
+            flush=True
+        )
+
+    bad = 0
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            bad = compare(results, json.load(f), args.tolerance)
+
+    if args.save:
+        out = {
+            "meta": {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "machine": platform.machine(),
+                "system": platform.system(),
+                "args": {k: getattr(args, k) for k in ("pairs", "rows", "cands", "warmup", "repeat", "cache", "seed")},
+            },
+            "cases": results,
+        }
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(out, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"💾 baseline -> {args.save}", flush=True)
+
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+# =========================
+# BENCH: kemiripan lama (SequenceMatcher tiap pasangan) vs similarity.py
+# - Beban meniru scoring process_row pada baris dengan banyak kandidat (beberapa query,
+#   list + detail): soft_jaccard + ov_name (soft_token_overlap 2x), fuzzy_ratio nama,
+#   cek echo 0.78/0.90
+# - Cek keputusan identik: LCS vs DP biasa, ratio >= thr untuk semua pasangan token,
+#   nilai soft_token_overlap/fuzzy_ratio dan hasil echo
+#
+# Jalankan (dari folder repo):
+#   py bench\bench_similarity.py
+#   py bench\bench_similarity.py --rows 20000 --cands 10
+# =========================
+
+import os
+import sys
+import time
+import random
+import argparse
+from difflib import SequenceMatcher
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import similarity
+import textnorm
+from textnorm import name_tokens2, normalize_name, STOP_WORDS
+from bench_textnorm import load_seed, synth_rows
+
+CITY = "denpasar, bali"
+
+
+# =========================
+# Versi lama (disalin apa adanya dari script.py sebelum similarity.py)
+# =========================
+def legacy_fuzzy_ratio(a: str, b: str) -> float:
+    a = (a or "").strip().lower()
+    b = (b or "").strip().lower()
+    if not a or not b:
+        return 0.0
+    return SequenceMatcher(None, a, b).ratio()
+
+def legacy_soft_token_overlap(a_set: set, b_set: set, sim_thr: float = 0.88) -> int:
+    if not a_set or not b_set:
+        return 0
+    b_list = list(b_set)
+    cnt = 0
+    for ta in a_set:
+        if ta in b_set:
+            cnt += 1
+            continue
+        best = 0.0
+        for tb in b_list:
+            r = SequenceMatcher(None, ta, tb).ratio()
+            if r > best:
+                best = r
+            if best >= sim_thr:
+                break
+        if best >= sim_thr:
+            cnt += 1
+    return cnt
+
+def legacy_soft_jaccard(a_set: set, b_set: set, sim_thr: float = 0.88) -> float:
+    if not a_set or not b_set:
+        return 0.0
+    inter = legacy_soft_token_overlap(a_set, b_set, sim_thr=sim_thr)
+    union = len(a_set) + len(b_set) - inter
+    return inter / max(1, union)
+
+def _echo(fuzzy_ge, nama_detail, query_used, city_context):
+    # badan looks_like_query_echo; fuzzy_ge(a, b, thr) -> bool
+    n = (nama_detail or "").strip().lower()
+    q = (query_used or "").strip().lower()
+    c = (city_context or "").strip().lower()
+    if not n:
+        return False
+    if c and c in n and n.count(",") >= 2:
+        if q and fuzzy_ge(n, q, 0.78):
+            return True
+        if q and (q[: max(12, int(len(q) * 0.55))] in n):
+            return True
+    if q and fuzzy_ge(n, q, 0.90):
+        return True
+    return False
+
+def _strip_loc(s):
+    return " ".join(t for t in s.split() if t not in STOP_WORDS)
+
+LEGACY = {
+    "fuzzy_ratio": legacy_fuzzy_ratio,
+    "soft_token_overlap": legacy_soft_token_overlap,
+    "soft_jaccard": legacy_soft_jaccard,
+    "fuzzy_ge": lambda a, b, thr: legacy_fuzzy_ratio(a, b) >= thr,
+}
+NEW = {
+    "fuzzy_ratio": similarity.fuzzy_ratio,
+    "soft_token_overlap": similarity.soft_token_overlap,
+    "soft_jaccard": similarity.soft_jaccard,
+    "fuzzy_ge": similarity.fuzzy_at_least,
+}
+
+
+# =========================
+# Beban kerja (meniru satu baris process_row)
+# - tiap query mengembalikan `cands` kandidat list dari "sekitar" baris itu;
+#   query berbeda untuk baris yang sama sebagian besar mengembalikan tempat yang sama
+# - semua kandidat list di-quick-score, OPEN_TOP teratas dibuka: score detail + cek echo
+# =========================
+QUERIES_PER_ROW = 4
+OPEN_TOP = 3
+
+def _score(fns, n_in, fz_in, g):
+    n_g = name_tokens2(g)
+    return (
+        fns["soft_jaccard"](n_in, n_g, 0.88)
+        + fns["soft_token_overlap"](n_in, n_g, 0.88)
+        + fns["fuzzy_ratio"](fz_in, _strip_loc(normalize_name(g)))
+    )
+
+def workload(fns, rows, cand_names, n_cands):
+    fge = fns["fuzzy_ge"]
+    k = len(cand_names)
+    hood = n_cands + n_cands // 2
+    acc = 0.0
+    for i, (nama, alamat) in enumerate(rows):
+        n_in = name_tokens2(nama)
+        fz_in = _strip_loc(normalize_name(nama))
+        near = [cand_names[(i * 7 + j) % k] for j in range(hood)]
+        queries = [f"{nama} {CITY}", f"{nama} {alamat}", nama, f"{alamat} {CITY}"][:QUERIES_PER_ROW]
+        for qi, q in enumerate(queries):
+            shown = near[qi * 2 % hood:] + near[:qi * 2 % hood]
+            shown = shown[:n_cands]
+            scored = sorted(((_score(fns, n_in, fz_in, g), g) for g in shown), reverse=True)
+            for sc, g in scored[:OPEN_TOP]:
+                acc += _score(fns, n_in, fz_in, g)
+                acc += _echo(fge, f"{g}, {CITY}", q, CITY)
+                acc += _echo(fge, g, q, CITY)
+    return acc
+
+def _lcs_dp(a, b):
+    prev = [0] * (len(b) + 1)
+    for ca in a:
+        cur = [0]
+        for j, cb in enumerate(b):
+            cur.append(prev[j] + 1 if ca == cb else max(prev[j + 1], cur[j]))
+        prev = cur
+    return prev[-1]
+
+def check_identical(rows, cand_names):
+    bad = 0
+    toks = set()
+    for nama, _ in rows:
+        toks |= name_tokens2(nama)
+    for g in cand_names:
+        toks |= name_tokens2(g)
+    toks = sorted(toks)[:1500]
+
+    n_pairs = 0
+    for ta in toks:
+        for tb in toks:
+            n_pairs += 1
+            r = SequenceMatcher(None, ta, tb).ratio()
+            for thr in (0.78, 0.88, 0.90):
+                if (r >= thr) != similarity.ratio_at_least(ta, tb, thr):
+                    bad += 1
+                    if bad <= 5:
+                        print(f"   ❌ ratio_at_least({ta!r}, {tb!r}, {thr}) vs ratio={r}", flush=True)
+            if n_pairs % 37 == 0 and _lcs_dp(ta, tb) != similarity._lcs_len(ta, tb):
+                bad += 1
+                print(f"   ❌ lcs({ta!r}, {tb!r})", flush=True)
+
+    n_cand = 0
+    for i, (nama, _) in enumerate(rows):
+        n_in = name_tokens2(nama)
+        fz_in = _strip_loc(normalize_name(nama))
+        q = f"{nama} {CITY}"
+        for j in range(12):
+            g = cand_names[(i * 7 + j) % len(cand_names)]
+            n_g = name_tokens2(g)
+            fz_g = _strip_loc(normalize_name(g))
+            n_cand += 1
+            pairs = [
+                (legacy_soft_token_overlap(n_in, n_g), similarity.soft_token_overlap(n_in, n_g)),
+                (legacy_soft_jaccard(n_in, n_g), similarity.soft_jaccard(n_in, n_g)),
+                (legacy_fuzzy_ratio(fz_in, fz_g), similarity.fuzzy_ratio(fz_in, fz_g)),
+                (_echo(LEGACY["fuzzy_ge"], f"{g}, {CITY}", q, CITY), _echo(NEW["fuzzy_ge"], f"{g}, {CITY}", q, CITY)),
+                (_echo(LEGACY["fuzzy_ge"], g, nama, CITY), _echo(NEW["fuzzy_ge"], g, nama, CITY)),
+            ]
+            for a, b in pairs:
+                if a != b:
+                    bad += 1
+                    if bad <= 5:
+                        print(f"   ❌ {nama!r} vs {g!r}: lama={a!r} baru={b!r}", flush=True)
+    return n_pairs, n_cand, bad
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark kemiripan lama vs similarity.py")
+    ap.add_argument("--rows", type=int, default=5000, help="jumlah baris sintetis")
+    ap.add_argument("--cands", type=int, default=10, help="kandidat list per query (MAX_CANDIDATES)")
+    ap.add_argument("--seed", type=int, default=5171)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    seed_rows, cand_names, _ = load_seed()
+    big_rows = synth_rows(seed_rows, args.rows, rng)
+    # kandidat gmaps: nama asli + variasi nama input (typo/prefix) supaya ada pasangan mirip
+    cand_pool = cand_names + [r[0] for r in synth_rows(seed_rows, 400, rng)]
+
+    n_pairs, n_cand, bad = check_identical(seed_rows + big_rows[:2000], cand_pool)
+    print(f"✔ cek identik: {n_pairs} pasangan token x 3 threshold, {n_cand} kandidat, {bad} beda", flush=True)
+    if bad:
+        sys.exit(1)
+
+    print("\nskenario                        lama(s)   baru(s)   speedup", flush=True)
+    for label, rows in [
+        (f"test.xlsx ({len(seed_rows)} baris)", seed_rows),
+        (f"sintetis ({len(big_rows)} baris)", big_rows),
+    ]:
+        # pemanasan textnorm (dipakai kedua versi), bukan bagian ukuran
+        for s in [r[0] for r in rows] + cand_pool:
+            name_tokens2(s)
+            normalize_name(s)
+        similarity.clear_caches()
+        t_old = timed(workload, LEGACY, rows, cand_pool, args.cands)
+        t_new = timed(workload, NEW, rows, cand_pool, args.cands)
+        print(f"{label:<31} {t_old:>8.3f}  {t_new:>8.3f}   x{t_old / max(1e-9, t_new):.1f}", flush=True)
+
+    similarity.report_cache_stats()
+    textnorm.report_cache_stats()
+
+
+if __name__ == "__main__":
+    main()
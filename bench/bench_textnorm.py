@@ -0,0 +1,246 @@
+# =========================
+# BENCH: normalisasi teks lama (re.sub tanpa compile, tanpa cache) vs textnorm.py
+# - Data diambil dari test.xlsx (input) + test_CONTOH_OUTPUT.xlsx (nama/alamat gmaps)
+# - Beban meniru score_candidate: per kandidat, nama/alamat input dinormalisasi ulang
+# - Juga cek hasil identik untuk semua string yang dipakai
+#
+# Jalankan (dari folder repo):
+#   py bench\bench_textnorm.py
+#   py bench\bench_textnorm.py --rows 100000 --cands 8
+# =========================
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd
+import textnorm
+from textnorm import STOP_WORDS, GENERIC_NAME, NAME_STOP_EXTRA, NAME_NOISE_PATTERNS
+
+
+# =========================
+# Versi lama (disalin apa adanya dari script.py sebelum textnorm.py)
+# =========================
+def legacy_clean_text(s: str) -> str:
+    s = str(s or "")
+    s = s.replace("<", " ").replace(">", " ")
+    s = re.sub(r"\bRT\s*\d+\/?\s*RW\s*\d+\b", " ", s, flags=re.I)
+    s = re.sub(r"\bRT\s*\d+\b", " ", s, flags=re.I)
+    s = re.sub(r"\bRW\s*\d+\b", " ", s, flags=re.I)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+def legacy_split_stuck_words(s: str) -> str:
+    if not s:
+        return ""
+    s = re.sub(r"([a-z])([A-Z])", r"\1 \2", s)
+    s = re.sub(r"([A-Za-z])(\d)", r"\1 \2", s)
+    s = re.sub(r"(\d)([A-Za-z])", r"\1 \2", s)
+    return s
+
+def legacy_normalize_addr(addr: str) -> str:
+    a = legacy_clean_text(addr)
+    a = legacy_split_stuck_words(a)
+
+    a = re.sub(r"\bJl\.?\b", "Jalan", a, flags=re.I)
+    a = re.sub(r"\bJln\.?\b", "Jalan", a, flags=re.I)
+    a = re.sub(r"\bGg\.?\b", "Gang", a, flags=re.I)
+    a = re.sub(r"\bBr\.?\b", "Banjar", a, flags=re.I)
+    a = re.sub(r"\bDs\.?\b", "Desa", a, flags=re.I)
+    a = re.sub(r"\bKel\.?\b", "Kelurahan", a, flags=re.I)
+
+    a = re.sub(r"\s+", " ", a).strip()
+    return a
+
+def legacy_normalize_name(s: str) -> str:
+    s = legacy_clean_text(s or "")
+    s = legacy_split_stuck_words(s)
+    s = s.replace("&", " dan ")
+    s = re.sub(r"[/,_\-]+", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    low = s.lower()
+    for pat in NAME_NOISE_PATTERNS:
+        low = re.sub(pat, " ", low, flags=re.I)
+        low = re.sub(r"\s+", " ", low).strip()
+    return low.strip()
+
+def legacy_name_tokens2(s: str):
+    s = legacy_normalize_name(s)
+    s = re.sub(r"[^a-z0-9\s]", " ", s)
+    toks = [t for t in s.split() if len(t) >= 2]
+    out = set()
+    for t in toks:
+        if t in STOP_WORDS:
+            continue
+        if t in GENERIC_NAME:
+            continue
+        if t in NAME_STOP_EXTRA:
+            continue
+        out.add(t)
+    return out
+
+def legacy_addr_tokens(addr: str):
+    a = legacy_normalize_addr(addr or "").lower()
+    a = re.sub(r"[^a-z0-9\s]", " ", a)
+    raw = [t for t in a.split() if t]
+    out = set()
+    for t in raw:
+        if t in STOP_WORDS:
+            continue
+        if re.fullmatch(r"\d{1,4}", t):
+            out.add(t)
+            continue
+        if re.fullmatch(r"\d{1,4}[a-z]{1,2}", t):
+            out.add(t)
+            continue
+        if re.fullmatch(r"[a-z]{2,}", t):
+            out.add(t)
+            continue
+        if re.fullmatch(r"[ivxlcdm]{2,}", t):
+            out.add(t)
+            continue
+    return out
+
+def legacy_addr_alpha_tokens(addr: str):
+    a = legacy_normalize_addr(addr or "").lower()
+    a = re.sub(r"[^a-z0-9\s]", " ", a)
+    toks = [t for t in a.split() if t and t not in STOP_WORDS and len(t) >= 3]
+    return {t for t in toks if re.fullmatch(r"[a-z]{3,}", t)}
+
+LEGACY = {
+    "normalize_name": legacy_normalize_name,
+    "normalize_addr": legacy_normalize_addr,
+    "name_tokens2": legacy_name_tokens2,
+    "addr_tokens": legacy_addr_tokens,
+    "addr_alpha_tokens": legacy_addr_alpha_tokens,
+}
+NEW = {
+    "normalize_name": textnorm.normalize_name,
+    "normalize_addr": textnorm.normalize_addr,
+    "name_tokens2": textnorm.name_tokens2,
+    "addr_tokens": textnorm.addr_tokens,
+    "addr_alpha_tokens": textnorm.addr_alpha_tokens,
+}
+
+
+# =========================
+# Data
+# =========================
+def _col(df, c):
+    if c not in df.columns:
+        return []
+    return [str(v) for v in df[c].dropna().tolist() if str(v).strip()]
+
+def load_seed():
+    inp = pd.read_excel(os.path.join(ROOT, "test.xlsx"))
+    out = pd.read_excel(os.path.join(ROOT, "test_CONTOH_OUTPUT.xlsx"))
+    rows = list(zip(inp["nama_usaha"].fillna("").astype(str), inp["alamat_usaha"].fillna("").astype(str)))
+    cand_names = _col(out, "nama_gmaps") or [r[0] for r in rows]
+    cand_addrs = _col(out, "alamat_gmaps") or [r[1] for r in rows]
+    return rows, cand_names, cand_addrs
+
+PREFIX = ["", "", "TOKO ", "UD ", "CV ", "WARUNG ", "PT ", "KOPERASI "]
+SUFFIX = ["", "", " JAYA", " ABADI", " (CABANG)", " & SONS", " DENPASAR"]
+STREET = ["JL.", "Jl", "JLN", "Gg.", "Br."]
+
+def synth_rows(seed_rows, n, rng):
+    """
+    Variasi realistis dari baris asli: prefix badan usaha, suffix, nomor rumah,
+    singkatan jalan dan RT/RW berbeda. ~30% baris sengaja duplikat (gelombang survei ulang).
+    """
+    out = []
+    for i in range(n):
+        if out and rng.random() < 0.30:
+            out.append(out[rng.randrange(len(out))])
+            continue
+        nama, alamat = seed_rows[rng.randrange(len(seed_rows))]
+        nama = f"{rng.choice(PREFIX)}{nama}{rng.choice(SUFFIX)} {rng.randrange(1, 400)}"
+        alamat = re.sub(r"\bJ[Ll][Nn]?\.?", rng.choice(STREET), alamat)
+        alamat = f"{alamat} No.{rng.randrange(1, 900)}{rng.choice(['', 'A', 'B'])} RT {rng.randrange(1, 20)}/RW {rng.randrange(1, 9)}"
+        out.append((nama, alamat))
+    return out
+
+
+# =========================
+# Beban kerja (meniru panggilan normalisasi di score_candidate + finalize)
+# =========================
+def workload(fns, rows, cand_names, cand_addrs, n_cands):
+    nn, na, nt, at, aa = (
+        fns["normalize_name"], fns["normalize_addr"], fns["name_tokens2"],
+        fns["addr_tokens"], fns["addr_alpha_tokens"],
+    )
+    k = len(cand_names)
+    for i, (nama, alamat) in enumerate(rows):
+        alamat_in = na(alamat)
+        for j in range(n_cands):
+            g_nama = cand_names[(i + j) % k]
+            g_alamat = cand_addrs[(i + j) % len(cand_addrs)]
+            nt(nama); nt(g_nama)                 # name_tokens2 in/g
+            nn(nama); nn(g_nama)                 # strip_loc_words(normalize_name(...))
+            nn(nama); nn(g_nama)                 # containment_score
+            nt(nama); nt(g_nama)                 # soft_token_overlap (ov_name)
+            at(alamat_in); at(g_alamat)          # addr_tokens in/g
+        aa(alamat_in); aa(cand_addrs[i % len(cand_addrs)])  # finalize
+
+def check_identical(rows, cand_names, cand_addrs):
+    strings = set()
+    for nama, alamat in rows:
+        strings.add(nama)
+        strings.add(alamat)
+    strings.update(cand_names)
+    strings.update(cand_addrs)
+    strings.update(["", "JalanIMAM BONJOL No486A", "PT. ABC (Persero) Tbk", "Br. Kaja Gg.III RT 02/RW 05"])
+    bad = 0
+    for s in strings:
+        for name, old in LEGACY.items():
+            a, b = old(s), NEW[name](s)
+            if isinstance(a, set):
+                b = set(b)
+            if a != b:
+                bad += 1
+                if bad <= 5:
+                    print(f"   ❌ {name}({s!r}): lama={a!r} baru={b!r}", flush=True)
+    return len(strings), bad
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark normalisasi teks lama vs textnorm.py")
+    ap.add_argument("--rows", type=int, default=100000, help="jumlah baris sintetis untuk skenario besar")
+    ap.add_argument("--cands", type=int, default=8, help="kandidat per baris")
+    ap.add_argument("--seed", type=int, default=5171)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    seed_rows, cand_names, cand_addrs = load_seed()
+    big_rows = synth_rows(seed_rows, args.rows, rng)
+
+    n_str, bad = check_identical(seed_rows + big_rows[:20000], cand_names, cand_addrs)
+    print(f"✔ cek identik: {n_str} string, {bad} beda", flush=True)
+    if bad:
+        sys.exit(1)
+
+    print("\nskenario                     lama(s)   baru(s)   speedup", flush=True)
+    for label, rows in [
+        (f"test.xlsx ({len(seed_rows)} baris)", seed_rows),
+        (f"sintetis ({len(big_rows)} baris)", big_rows),
+    ]:
+        textnorm.clear_caches()
+        t_old = timed(workload, LEGACY, rows, cand_names, cand_addrs, args.cands)
+        t_new = timed(workload, NEW, rows, cand_names, cand_addrs, args.cands)
+        print(f"{label:<28} {t_old:>8.3f}  {t_new:>8.3f}   x{t_old / max(1e-9, t_new):.1f}", flush=True)
+
+    textnorm.report_cache_stats()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# =========================
+# CEK mode streaming + 1 browser (run_sequential + StreamTable) lawan server Maps tiruan
+# - Input CSV kecil, chunk sangat kecil (--chunk-rows) supaya batas chunk sering terlewati
+#   saat baris berikut dibaca duluan (prefetch) -> hasil harus tetap masuk semua
+# - Campuran baris: butuh browser, duplikat (dedup), coords sudah ada, nama kosong
+# - Dijalankan dengan prefetch nyala dan mati; keluar dengan kode 1 kalau ada yang salah
+#
+# Jalankan (dari folder repo):
+#   py bench\check_stream_sequential.py
+#   py bench\check_stream_sequential.py --rows 15 --chunk-rows 4
+#   (offline: set SCREP_CHROMEDRIVER=path\chromedriver.exe)
+# =========================
+
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+import script
+import fake_maps
+from metrics import Metrics
+
+
+def input_frame(places, n: int, seed: int) -> pd.DataFrame:
+    rows = fake_maps.synthetic_rows(places, n, seed)
+    if len(rows) >= 4:
+        rows[1] = dict(rows[0])                                   # duplikat -> dedup
+        rows[2] = dict(rows[2], latitude=-8.65, longitude=115.22)  # coords sudah ada
+        rows[3] = dict(rows[3], nama_usaha="")                     # nama kosong
+    return pd.DataFrame(rows)
+
+
+def run_once(df: pd.DataFrame, chunk_rows: int, prefetch: bool, workdir: str) -> list:
+    """
+    Satu run_sequential di mode streaming. Return daftar masalah (kosong = lolos).
+    """
+    in_path = os.path.join(workdir, f"input_{int(prefetch)}.csv")
+    out_path = os.path.join(workdir, f"output_{int(prefetch)}.xlsx")
+    df.to_csv(in_path, index=False)
+
+    script.PREFETCH_ENABLED = prefetch
+    script.METRICS = Metrics()
+    table = script.StreamTable(in_path, out_path, None, chunk_rows=chunk_rows)
+    try:
+        script.run_sequential(table, journal=None, dedup=script.RowDeduper(), gazetteer=None)
+    except Exception as e:
+        return [f"run_sequential gagal: {type(e).__name__}: {e}"]
+
+    problems = []
+    out = pd.read_excel(out_path)
+    if len(out) != len(df):
+        problems.append(f"jumlah baris output {len(out)}, input {len(df)}")
+    if "gcs_result" not in out.columns:
+        problems.append("kolom gcs_result tidak ada di output")
+    else:
+        missing = [int(i) for i in out.index[out["gcs_result"].isna()]]
+        if missing:
+            problems.append(f"baris tanpa hasil: {missing}")
+    if list(out["nama_usaha"].fillna("").astype(str)) != list(df["nama_usaha"].fillna("").astype(str)):
+        problems.append("urutan/isi nama_usaha output beda dengan input")
+    return problems
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Cek mode streaming + 1 browser lawan server Maps tiruan")
+    ap.add_argument("--rows", type=int, default=15)
+    ap.add_argument("--chunk-rows", type=int, default=4)
+    ap.add_argument("--profile", default="lean", help="profil browser (lean = headless)")
+    fake_maps.add_server_args(ap)
+    args = ap.parse_args()
+
+    fm = fake_maps.server_from_args(args)
+    server, base = fm.serve(0)
+    script.MAPS_BASE_URL = base
+    script.QUERY_CACHE_ENABLED = False
+    script.PLANNER_ENABLED = False
+    script.BROWSER_PROFILE = args.profile
+    script.install_signal_handlers()
+
+    df = input_frame(fm.index.places, args.rows, args.seed)
+    workdir = tempfile.mkdtemp(prefix="screp_check_stream_")
+    failed = False
+    try:
+        for prefetch in (True, False):
+            problems = run_once(df, args.chunk_rows, prefetch, workdir)
+            label = f"prefetch={'nyala' if prefetch else 'mati'}"
+            if problems:
+                failed = True
+                for p in problems:
+                    print(f"❌ {label}: {p}", flush=True)
+            else:
+                print(f"✅ {label}: {len(df)} baris (chunk {args.chunk_rows}) tertulis lengkap", flush=True)
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
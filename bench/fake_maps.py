@@ -0,0 +1,386 @@
+# =========================
+# SERVER GOOGLE MAPS TIRUAN (offline) untuk bench/regresi end-to-end
+# - Halaman list (/maps/search/?api=1&query=...) dan place (/maps/place/...!3d..!4d..)
+#   memakai hook DOM yang sama dengan script.py: a.hfpxzc (+ card role=article),
+#   h1.DUwDvf, [data-item-id="address"], tombol Telepon, banner tutup (div.UGUb2e),
+#   tombol consent, judul "Nama - Google Maps"
+# - Data tempat: hasil lama (nama_gmaps/alamat_gmaps/latitude/longitude/status_tutup,
+#   default test_CONTOH_OUTPUT.xlsx) + tempat sintetis sebagai pengecoh (seed tetap)
+# - Latensi bisa diatur: tunda respon server (--latency-ms/--jitter-ms) dan tunda
+#   render konten di browser (--render-ms, konten disisipkan JS seperti SPA)
+# - Query dengan satu tempat yang namanya cocok penuh -> redirect 302 ke place
+#   (seperti Google), beberapa kandidat -> list, tidak ada -> halaman kosong
+#
+# Jalankan (dari folder repo):
+#   py bench\fake_maps.py --port 8765 --latency-ms 300 --render-ms 150
+#   set SCREP_MAPS_BASE_URL=http://127.0.0.1:8765/maps   (lalu py script.py seperti biasa)
+# =========================
+
+import os
+import sys
+import html
+import time
+import random
+import hashlib
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qs, quote, unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd
+from textnorm import name_tokens2, addr_tokens
+
+DEFAULT_DATA = os.path.join(ROOT, "test_CONTOH_OUTPUT.xlsx")
+LIST_LIMIT = 10      # kandidat per halaman list (Google ~7-20 sebelum scroll)
+
+_KEC = ["Denpasar Barat", "Denpasar Timur", "Denpasar Selatan", "Denpasar Utara"]
+_DESA = ["Dauh Puri Klod", "Sumerta Kelod", "Sesetan", "Ubung", "Panjer", "Pemecutan", "Renon", "Peguyangan"]
+_JALAN = ["Jl. Teuku Umar", "Jl. Gatot Subroto", "Jl. Raya Sesetan", "Jl. Diponegoro", "Jl. Hayam Wuruk",
+          "Jl. Gunung Agung", "Jl. Cokroaminoto", "Jl. Imam Bonjol", "Jl. Tukad Badung", "Jl. Pidada"]
+_JENIS = ["Toko", "Warung", "Bengkel", "Apotek", "Laundry", "Salon", "Kios", "Kedai", "Percetakan", "Klinik"]
+_KATA = ["Jaya", "Makmur", "Sari", "Dewata", "Bali", "Abadi", "Sejahtera", "Mandiri", "Sentosa", "Agung",
+         "Merta", "Bersama", "Lestari", "Indah", "Murni", "Santhi", "Ayu", "Putra", "Dharma", "Kencana"]
+
+
+class FakePlace:
+    __slots__ = ("fid", "nama", "alamat", "lat", "lon", "phone", "closed", "kategori", "n_tok", "a_tok")
+
+    def __init__(self, fid, nama, alamat, lat, lon, phone="", closed="", kategori=""):
+        self.fid = fid
+        self.nama = nama
+        self.alamat = alamat
+        self.lat = lat
+        self.lon = lon
+        self.phone = phone
+        self.closed = closed          # "" / "permanent" / "temporary"
+        self.kategori = kategori
+        self.n_tok = name_tokens2(nama)
+        self.a_tok = addr_tokens(alamat)
+
+    def href(self, base="") -> str:
+        # bentuk URL asli: /maps/place/<nama>/data=!4m7!3m6!1s0x..:0x..!8m2!3d<lat>!4d<lon>!16s...
+        return (
+            f"{base}/maps/place/{quote(self.nama.replace(' ', '+'), safe='+')}/"
+            f"data=!4m7!3m6!1s{self.fid}!8m2!3d{self.lat:.7f}!4d{self.lon:.7f}!16s%2Fg%2F0"
+        )
+
+
+def _fid(seed: str) -> str:
+    h = hashlib.sha1(seed.encode("utf-8")).hexdigest()
+    return f"0x{h[:16]}:0x{h[16:32]}"
+
+def _cell(v):
+    if v is None:
+        return ""
+    s = str(v).strip()
+    return "" if s.lower() in ("nan", "none", "<na>") else s
+
+def load_places(path: str):
+    """
+    Tempat dari workbook output lama (baris dengan nama_gmaps + koordinat).
+    """
+    df = pd.read_excel(path) if path.lower().endswith((".xlsx", ".xls")) else pd.read_csv(path)
+    out = []
+    for r in df.to_dict("records"):
+        nama = _cell(r.get("nama_gmaps"))
+        try:
+            lat, lon = float(r.get("latitude")), float(r.get("longitude"))
+        except (TypeError, ValueError):
+            continue
+        if not nama or lat != lat or lon != lon:
+            continue
+        closed = _cell(r.get("status_tutup")).lower()
+        closed = "temporary" if "sementara" in closed or "temporary" in closed else ("permanent" if closed else "")
+        out.append(FakePlace(
+            _fid(f"{nama}|{lat}|{lon}"), nama, _cell(r.get("alamat_gmaps")).lstrip(", "),
+            lat, lon, _cell(r.get("nomor_telepon")), closed,
+        ))
+    return out
+
+def synthetic_places(n: int, seed: int = 0):
+    """
+    n tempat sintetis di dalam Denpasar (nama 2-3 kata, alamat gaya Google, ~5% tutup).
+    """
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        jenis = rnd.choice(_JENIS)
+        nama = " ".join([jenis] + rnd.sample(_KATA, rnd.choice((1, 2))))
+        kec = rnd.choice(_KEC)
+        alamat = (
+            f"{rnd.choice(_JALAN)} No.{rnd.randint(1, 400)}, {rnd.choice(_DESA)}, "
+            f"Kec. {kec}, Kota Denpasar, Bali 80{rnd.randint(111, 239)}"
+        )
+        lat = round(rnd.uniform(-8.72, -8.60), 7)
+        lon = round(rnd.uniform(115.17, 115.26), 7)
+        phone = f"0812-{rnd.randint(1000, 9999)}-{rnd.randint(1000, 9999)}" if rnd.random() < 0.6 else ""
+        closed = rnd.choice(("permanent", "temporary")) if rnd.random() < 0.05 else ""
+        out.append(FakePlace(_fid(f"syn{seed}:{i}"), nama, alamat, lat, lon, phone, closed, jenis))
+    return out
+
+def synthetic_rows(places, n: int, seed: int = 0):
+    """
+    Baris input (nama_usaha/alamat_usaha/nmkec) dari tempat yang ada, dengan gangguan
+    khas register: huruf besar, "JL"/"NO", prefix PT/CV/UD, alamat kadang kosong.
+    """
+    rnd = random.Random(seed + 1)
+    rows = []
+    for i in range(n):
+        p = places[rnd.randrange(len(places))]
+        nama = p.nama.upper()
+        if rnd.random() < 0.3:
+            nama = rnd.choice(("PT ", "CV ", "UD ")) + nama
+        alamat = p.alamat.split(",")[0].upper().replace("JL.", "JL").replace("NO.", "NO ")
+        if rnd.random() < 0.15:
+            alamat = ""
+        kec = ""
+        for k in _KEC:
+            if k in p.alamat:
+                kec = k.upper()
+        rows.append({"nama_usaha": nama, "alamat_usaha": alamat, "nmkec": kec, "latitude": None, "longitude": None})
+    return rows
+
+
+# =========================
+# Cari tempat untuk satu query
+# =========================
+class PlaceIndex:
+    def __init__(self, places):
+        self.places = places
+        self.by_fid = {p.fid: p for p in places}
+        self._tok = {}
+        for i, p in enumerate(places):
+            for t in p.n_tok:
+                self._tok.setdefault(t, []).append(i)
+
+    def search(self, query: str, limit: int = LIST_LIMIT):
+        """
+        Return (kind, places): ("place", [p]) kalau satu tempat cocok penuh namanya,
+        ("list", [...]) kalau beberapa kandidat, ("empty", []) kalau tidak ada.
+        """
+        q_name = name_tokens2(query)
+        q_addr = addr_tokens(query)
+        hits = {}
+        for t in q_name:
+            for i in self._tok.get(t, ()):
+                hits[i] = hits.get(i, 0) + 1
+        if not hits:
+            return "empty", []
+        ranked = sorted(
+            hits,
+            key=lambda i: (-hits[i] / max(1, len(self.places[i].n_tok)), -len(q_addr & self.places[i].a_tok), i),
+        )
+        full = [i for i in ranked if hits[i] >= len(self.places[i].n_tok)]
+        if len(full) == 1 and (len(ranked) == 1 or hits[ranked[1]] < hits[full[0]]):
+            return "place", [self.places[full[0]]]
+        return "list", [self.places[i] for i in ranked[:limit]]
+
+
+# =========================
+# HTML
+# =========================
+_CLOSED_TEXT = {"permanent": "Tutup permanen", "temporary": "Tutup sementara"}
+
+def _page(title: str, body: str, render_ms: int, consent: bool) -> str:
+    # konten di <template> lalu disisipkan setelah render_ms (meniru render SPA Maps)
+    consent_html = (
+        '<div id="consent"><button onclick="document.cookie=\'CONSENT=YES+; path=/\';'
+        'document.getElementById(\'consent\').remove()">Terima semua</button></div>'
+        if consent else ""
+    )
+    return (
+        "<!doctype html><html lang=\"id\"><head><meta charset=\"utf-8\">"
+        f"<title>{html.escape(title)}</title></head><body>{consent_html}"
+        '<input id="searchboxinput"><template id="c">'
+        f"{body}</template><script>"
+        "(function(){var t=document.getElementById('c');"
+        "function show(){document.body.appendChild(t.content.cloneNode(true));}"
+        f"var ms={int(render_ms)};if(ms>0)setTimeout(show,ms);else show();}})();"
+        "</script></body></html>"
+    )
+
+def place_html(p: FakePlace, render_ms=0, consent=False) -> str:
+    e = html.escape
+    closed = ""
+    if p.closed:
+        closed = f'<div class="UGUb2e"><span>{_CLOSED_TEXT[p.closed]}</span></div>'
+    addr = ""
+    if p.alamat:
+        addr = (
+            f'<button data-item-id="address" aria-label="Alamat: {e(p.alamat)}">'
+            f'<div class="Io6YTe fontBodyMedium kR99db fdkmkc">{e(p.alamat)}</div></button>'
+        )
+    phone = ""
+    if p.phone:
+        # hasil rekaman berisi ikon + "\n" + nomor (innerText tombol asli), jadi tiap bagian satu div
+        parts = [x.strip() for x in p.phone.split("\n") if x.strip()]
+        num = parts[-1]
+        phone = (
+            f'<button data-item-id="phone:tel:{e(num)}" aria-label="Telepon: {e(num)}">'
+            + "".join(f'<div class="Io6YTe fontBodyMedium kR99db fdkmkc">{e(x)}</div>' for x in parts)
+            + "</button>"
+        )
+    body = (
+        f'<div role="main" aria-label="{e(p.nama)}"><div class="lMbq3e">'
+        f'<h1 class="DUwDvf lfPIob">{e(p.nama)}</h1>'
+        f'<div class="skqShb"><button class="DkEaL">{e(p.kategori or "Usaha")}</button></div>'
+        f"{closed}</div>{addr}{phone}</div>"
+    )
+    return _page(f"{p.nama} - Google Maps", body, render_ms, consent)
+
+def list_html(query: str, places, render_ms=0, consent=False, partial=False) -> str:
+    e = html.escape
+    cards = []
+    for p in places:
+        meta = e(p.alamat.split(",")[0]) if p.alamat else ""
+        cards.append(
+            f'<div role="article" class="Nv2PK" aria-label="{e(p.nama)}">'
+            f'<a class="hfpxzc" aria-label="{e(p.nama)}" href="{e(p.href())}"></a>'
+            f'<div class="qBF1Pd fontHeadlineSmall">{e(p.nama)}</div>'
+            f'<div class="W4Efsd"><span>{e(p.kategori or "Usaha")}</span><span>{meta}</span></div></div>'
+        )
+    note = '<div class="L5xkq Hk4XGb">Hasil sebagian cocok</div>' if partial else ""
+    body = f'<div role="main" aria-label="Hasil untuk {e(query)}"><h1>Hasil</h1>{note}<div role="feed">{"".join(cards)}</div></div>'
+    return _page(f"{query} - Google Maps", body, render_ms, consent)
+
+def empty_html(query: str, render_ms=0, consent=False) -> str:
+    body = '<div role="main"><h1>Hasil</h1><div class="Q2vNVc">Google Maps tidak dapat menemukan hasil</div></div>'
+    return _page(f"{query} - Google Maps", body, render_ms, consent)
+
+
+# =========================
+# Server
+# =========================
+class FakeMaps:
+    """
+    Konfigurasi + statistik server (jumlah request per jenis halaman).
+    """
+    def __init__(self, places, latency_ms=0, jitter_ms=0, render_ms=0, consent=False, seed=0):
+        self.index = PlaceIndex(places)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.render_ms = render_ms
+        self.consent = consent
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self.hits = {}
+
+    def delay(self):
+        if not self.latency_ms and not self.jitter_ms:
+            return
+        with self._lock:
+            j = self._rnd.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        time.sleep(max(0.0, self.latency_ms + j) / 1000.0)
+
+    def count(self, kind):
+        with self._lock:
+            self.hits[kind] = self.hits.get(kind, 0) + 1
+
+    def handler(self):
+        fm = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, code, body="", headers=()):
+                data = body.encode("utf-8")
+                self.send_response(code)
+                for k, v in headers:
+                    self.send_header(k, v)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                u = urlsplit(self.path)
+                consent = fm.consent and "CONSENT=YES" not in (self.headers.get("Cookie") or "")
+                fm.delay()
+                if u.path.startswith("/maps/search"):
+                    q = (parse_qs(u.query).get("query") or [""])[0]
+                    kind, found = fm.index.search(q)
+                    fm.count(kind)
+                    if kind == "place":
+                        self._send(302, "", [("Location", found[0].href())])
+                    elif kind == "list":
+                        partial = not any(p.n_tok <= name_tokens2(q) for p in found)
+                        self._send(200, list_html(q, found, fm.render_ms, consent, partial))
+                    else:
+                        self._send(200, empty_html(q, fm.render_ms, consent))
+                elif u.path.startswith("/maps/place/"):
+                    fid = ""
+                    for part in unquote(u.path).split("!"):
+                        if part.startswith("1s0x"):
+                            fid = part[2:]
+                    p = fm.index.by_fid.get(fid)
+                    fm.count("place_page" if p else "404")
+                    if p is None:
+                        self._send(404, "<h1>404</h1>")
+                    else:
+                        self._send(200, place_html(p, fm.render_ms, consent))
+                elif u.path.rstrip("/") in ("", "/maps"):
+                    fm.count("home")
+                    body = '<div role="main"><div id="map"></div></div>'
+                    self._send(200, _page("Google Maps", body, fm.render_ms, consent))
+                else:
+                    self._send(404, "<h1>404</h1>")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def serve(self, port=0, host="127.0.0.1"):
+        """
+        Jalankan di thread daemon. Return (server, base_url) dengan base_url = http://host:port/maps.
+        """
+        server = ThreadingHTTPServer((host, port), self.handler())
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="fake-maps", daemon=True).start()
+        return server, f"http://{host}:{server.server_address[1]}/maps"
+
+
+def build_places(data=DEFAULT_DATA, synthetic=300, seed=0):
+    places = load_places(data) if data and os.path.exists(data) else []
+    return places + synthetic_places(synthetic, seed)
+
+
+def add_server_args(ap):
+    ap.add_argument("--data", default=DEFAULT_DATA, help="workbook output lama sebagai isi tempat ('' = sintetis saja)")
+    ap.add_argument("--synthetic", type=int, default=300, help="jumlah tempat sintetis (pengecoh)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--latency-ms", type=int, default=150, help="tunda respon server per request")
+    ap.add_argument("--jitter-ms", type=int, default=50)
+    ap.add_argument("--render-ms", type=int, default=100, help="tunda render konten di browser")
+    ap.add_argument("--consent", action="store_true", help="tampilkan tombol consent sampai cookie diset")
+
+def server_from_args(args):
+    places = build_places(args.data, args.synthetic, args.seed)
+    return FakeMaps(places, args.latency_ms, args.jitter_ms, args.render_ms, args.consent, args.seed)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Server Google Maps tiruan (offline)")
+    ap.add_argument("--port", type=int, default=8765)
+    add_server_args(ap)
+    args = ap.parse_args()
+
+    fm = server_from_args(args)
+    server, base = fm.serve(args.port)
+    print(f"🗺 {len(fm.index.places)} tempat | SCREP_MAPS_BASE_URL={base} | Ctrl+C untuk berhenti", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        print(f"request: {fm.hits}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
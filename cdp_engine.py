@@ -0,0 +1,275 @@
+# =========================
+# ENGINE CDP (asyncio): bicara langsung ke Chrome lewat DevTools protocol
+# - Satu Chrome, satu koneksi websocket, banyak tab (sesi "flatten" per tab);
+#   perintah ke tab berbeda jalan bersamaan di satu event loop, tanpa chromedriver
+# - Browser.launch(): start Chrome dengan --remote-debugging-port=0, alamat websocket
+#   dibaca dari DevToolsActivePort di user-data-dir sementara
+# - Tab.call / Tab.call_async: jalankan potongan JS yang sama dengan execute_script /
+#   execute_async_script Selenium (arguments[...] + callback done di argumen terakhir)
+# - Isi logika Google Maps (query, kandidat, ekstraksi, scoring) tetap di script.py
+#
+# Butuh paket websockets (opsional, hanya untuk engine ini): pip install websockets
+# =========================
+
+import os
+import json
+import base64
+import shutil
+import asyncio
+import tempfile
+import subprocess
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+CHROME_START_TIMEOUT_SEC = 30
+COMMAND_TIMEOUT_SEC = 30
+
+# pesan error CDP kalau dokumen diganti (navigasi) di tengah evaluate -> ulang di dokumen baru
+_CONTEXT_LOST = (
+    "execution context was destroyed",
+    "cannot find context",
+    "cannot find default execution context",
+    "inspected target navigated or closed",
+)
+
+
+class CDPError(Exception):
+    pass
+
+class ContextLost(CDPError):
+    pass
+
+class JSError(CDPError):
+    pass
+
+
+def _is_context_lost(text: str) -> bool:
+    low = (text or "").lower()
+    return any(m in low for m in _CONTEXT_LOST)
+
+def find_chrome() -> str:
+    """
+    Path chrome: SCREP_CHROME_BINARY, lalu nama umum di PATH, lalu lokasi instal Windows.
+    """
+    path = os.environ.get("SCREP_CHROME_BINARY", "").strip()
+    if path:
+        return path
+    for name in ("chrome", "google-chrome", "google-chrome-stable", "chromium", "chromium-browser"):
+        found = shutil.which(name)
+        if found:
+            return found
+    for base in (os.environ.get("PROGRAMFILES"), os.environ.get("PROGRAMFILES(X86)"), os.environ.get("LOCALAPPDATA")):
+        if base:
+            cand = os.path.join(base, "Google", "Chrome", "Application", "chrome.exe")
+            if os.path.exists(cand):
+                return cand
+    raise CDPError("Chrome tidak ditemukan; set SCREP_CHROME_BINARY=path\\chrome.exe")
+
+
+class Connection:
+    """
+    Satu websocket ke browser. Balasan dicocokkan lewat id; event diabaikan
+    (semua tunggu halaman lewat JS, sama seperti jalur Selenium).
+    """
+    def __init__(self, ws):
+        self.ws = ws
+        self._next_id = 0
+        self._pending = {}
+        self._reader = asyncio.get_running_loop().create_task(self._read())
+
+    async def send(self, method, params=None, session_id=None, timeout=COMMAND_TIMEOUT_SEC):
+        self._next_id += 1
+        msg_id = self._next_id
+        msg = {"id": msg_id, "method": method, "params": params or {}}
+        if session_id:
+            msg["sessionId"] = session_id
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[msg_id] = fut
+        try:
+            await self.ws.send(json.dumps(msg))
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            self._pending.pop(msg_id, None)
+
+    async def _read(self):
+        err = CDPError("koneksi DevTools tertutup")
+        try:
+            async for raw in self.ws:
+                msg = json.loads(raw)
+                fut = self._pending.get(msg.get("id"))
+                if fut is None or fut.done():
+                    continue
+                if "error" in msg:
+                    text = msg["error"].get("message", "") + " " + str(msg["error"].get("data", ""))
+                    fut.set_exception(ContextLost(text) if _is_context_lost(text) else CDPError(text.strip()))
+                else:
+                    fut.set_result(msg.get("result", {}))
+        except Exception as e:
+            err = CDPError(f"koneksi DevTools putus: {e}")
+        finally:
+            for fut in self._pending.values():
+                if not fut.done():
+                    fut.set_exception(err)
+
+    async def close(self):
+        try:
+            await self.ws.close()
+        except Exception:
+            pass
+        self._reader.cancel()
+
+
+class Tab:
+    """
+    Satu tab (target page) dengan sesi CDP sendiri.
+    """
+    def __init__(self, browser, target_id, session_id):
+        self.browser = browser
+        self.target_id = target_id
+        self.session_id = session_id
+
+    async def send(self, method, params=None, timeout=COMMAND_TIMEOUT_SEC):
+        return await self.browser.conn.send(method, params, session_id=self.session_id, timeout=timeout)
+
+    async def _evaluate(self, expression, await_promise=False, timeout=COMMAND_TIMEOUT_SEC):
+        res = await self.send(
+            "Runtime.evaluate",
+            {"expression": expression, "returnByValue": True, "awaitPromise": await_promise},
+            timeout=timeout,
+        )
+        exc = res.get("exceptionDetails")
+        if exc:
+            text = ((exc.get("exception") or {}).get("description") or exc.get("text") or "")
+            if _is_context_lost(text):
+                raise ContextLost(text)
+            raise JSError(text)
+        return (res.get("result") or {}).get("value")
+
+    async def call(self, js, *args, timeout=COMMAND_TIMEOUT_SEC):
+        """
+        Setara driver.execute_script(js, *args): badan fungsi dengan `return`.
+        """
+        expr = f"(function(){{{js}\n}}).apply(null, {json.dumps(list(args))})"
+        return await self._evaluate(expr, timeout=timeout)
+
+    async def call_async(self, js, *args, timeout=COMMAND_TIMEOUT_SEC):
+        """
+        Setara driver.execute_async_script(js, *args): callback done = argumen terakhir.
+        """
+        expr = (
+            "new Promise(function(done){"
+            f"(function(){{{js}\n}}).apply(null, {json.dumps(list(args))}.concat([done]));"
+            "})"
+        )
+        return await self._evaluate(expr, await_promise=True, timeout=timeout)
+
+    async def navigate(self, url, timeout=COMMAND_TIMEOUT_SEC):
+        # balasan Page.navigate datang setelah navigasi commit (atau gagal)
+        res = await self.send("Page.navigate", {"url": url}, timeout=timeout)
+        if res.get("errorText"):
+            raise CDPError(f"navigasi gagal: {res['errorText']} ({url})")
+        return res
+
+    async def current_url(self) -> str:
+        for _ in range(20):
+            try:
+                return await self._evaluate("location.href") or ""
+            except ContextLost:
+                await asyncio.sleep(0.05)
+        return ""
+
+    async def page_source(self) -> str:
+        try:
+            return await self._evaluate("document.documentElement ? document.documentElement.outerHTML : ''") or ""
+        except CDPError:
+            return ""
+
+    async def screenshot(self, path):
+        res = await self.send("Page.captureScreenshot", {"format": "png"})
+        with open(path, "wb") as f:
+            f.write(base64.b64decode(res.get("data") or ""))
+
+    async def block_urls(self, patterns):
+        await self.send("Network.enable")
+        await self.send("Network.setBlockedURLs", {"urls": list(patterns)})
+
+    async def close(self):
+        # tab kandidat dibuka/ditutup per baris -> lepas dari daftar browser supaya tidak menumpuk
+        if self in self.browser.tabs:
+            self.browser.tabs.remove(self)
+        try:
+            await self.browser.conn.send("Target.closeTarget", {"targetId": self.target_id}, timeout=5)
+        except Exception:
+            pass
+
+
+class Browser:
+    def __init__(self, proc, conn, user_data_dir):
+        self.proc = proc
+        self.conn = conn
+        self.user_data_dir = user_data_dir
+        self.tabs = []
+
+    @classmethod
+    async def launch(cls, args=(), binary=None):
+        """
+        Start Chrome dengan argumen tambahan (mis. dari build_chrome_options().arguments).
+        """
+        if websockets is None:
+            raise RuntimeError("Engine CDP butuh websockets: pip install websockets")
+        binary = binary or find_chrome()
+        user_data_dir = tempfile.mkdtemp(prefix="screp_cdp_")
+        cmd = [binary, "--remote-debugging-port=0", f"--user-data-dir={user_data_dir}",
+               "--no-first-run", "--no-default-browser-check", "about:blank"]
+        for a in args:
+            a = a if a.startswith("--") else "--" + a
+            if a.split("=")[0] not in ("--remote-debugging-port", "--user-data-dir"):
+                cmd.insert(-1, a)
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        port_file = os.path.join(user_data_dir, "DevToolsActivePort")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + CHROME_START_TIMEOUT_SEC
+        ws_url = None
+        while loop.time() < deadline:
+            if proc.poll() is not None:
+                break
+            try:
+                with open(port_file, "r", encoding="utf-8") as f:
+                    lines = f.read().split()
+                if len(lines) >= 2:
+                    ws_url = f"ws://127.0.0.1:{lines[0]}{lines[1]}"
+                    break
+            except OSError:
+                pass
+            await asyncio.sleep(0.1)
+        if ws_url is None:
+            proc.kill()
+            shutil.rmtree(user_data_dir, ignore_errors=True)
+            raise CDPError(f"Chrome tidak membuka port DevTools ({binary})")
+
+        ws = await websockets.connect(ws_url, max_size=None, ping_interval=None)
+        return cls(proc, Connection(ws), user_data_dir)
+
+    async def new_tab(self, url="about:blank") -> Tab:
+        res = await self.conn.send("Target.createTarget", {"url": url})
+        target_id = res["targetId"]
+        res = await self.conn.send("Target.attachToTarget", {"targetId": target_id, "flatten": True})
+        tab = Tab(self, target_id, res["sessionId"])
+        self.tabs.append(tab)
+        return tab
+
+    async def close(self):
+        try:
+            await self.conn.send("Browser.close", timeout=5)
+        except Exception:
+            pass
+        await self.conn.close()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.proc.wait, 10)
+        except Exception:
+            self.proc.kill()
+        shutil.rmtree(self.user_data_dir, ignore_errors=True)
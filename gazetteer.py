@@ -0,0 +1,305 @@
+# =========================
+# GAZETTEER LOKAL dari hasil run sebelumnya
+# - Sumber: workbook output lama (kolom nama_gmaps/alamat_gmaps/latitude/longitude/status_kode);
+#   hanya match yang diterima penuh (status_kode 1/3) yang masuk; "Perlu dicek" (2) dan
+#   coords saja (5) tidak, karena hit gazetteer langsung ditulis sebagai status 1/3
+# - Disimpan di screp_gazetteer.sqlite (satu baris per tempat), dimuat ke memori saat start:
+#     * inverted index token nama (name_tokens2) dan token alamat (addr_tokens) -> id tempat
+#     * grid koordinat (sel ~500 m) untuk cari tempat berdekatan / gabung duplikat
+# - Scoring & keputusan "cukup yakin" ada di script.py (score_candidate yang sama)
+#
+# Isi gazetteer dari folder hasil lama (dari folder repo):
+#   py gazetteer.py hasil_lama\*.xlsx
+# =========================
+
+import os
+import sys
+import glob
+import math
+import time
+import sqlite3
+from collections import defaultdict
+
+from textnorm import normalize_name, name_tokens2, addr_tokens
+import tableio
+
+GAZETTEER_FILE = "screp_gazetteer.sqlite"
+GAZETTEER_STATUS = (1, 3)         # status_kode yang dianggap tempat terverifikasi
+GRID_DEG = 0.005                  # ukuran sel grid (derajat, ~550 m di Denpasar)
+MERGE_RADIUS_M = 60               # nama sama + jarak <= ini -> tempat yang sama
+MAX_POSTING = 2000                # token nama yang terlalu umum tidak dipakai untuk ambil kandidat
+
+
+def distance_m(lat1, lon1, lat2, lon2) -> float:
+    # equirectangular; cukup akurat untuk jarak dalam satu kota
+    k = math.cos(math.radians((lat1 + lat2) / 2.0))
+    dx = math.radians(lon2 - lon1) * k
+    dy = math.radians(lat2 - lat1)
+    return 6371000.0 * math.hypot(dx, dy)
+
+def _cell(lat, lon):
+    return (math.floor(lat / GRID_DEG), math.floor(lon / GRID_DEG))
+
+def _float_or_none(v):
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(f) else f
+
+def _text(v) -> str:
+    if v is None:
+        return ""
+    if isinstance(v, float) and math.isnan(v):
+        return ""
+    s = str(v).strip()
+    return "" if s.lower() in ("nan", "none", "<na>") else s
+
+
+class Place:
+    """
+    Satu tempat di gazetteer (bentuk record sama dengan extract_place_record lewat as_record).
+    """
+    __slots__ = ("id", "nama", "alamat", "lat", "lon", "phone", "status_kode", "status_tutup",
+                 "seen", "name_norm", "n_tok", "a_tok")
+
+    def __init__(self, nama, alamat, lat, lon, phone="", status_kode=1, status_tutup="", seen=1, id=None):
+        self.id = id
+        self.nama = nama
+        self.alamat = alamat
+        self.lat = lat
+        self.lon = lon
+        self.phone = phone
+        self.status_kode = int(status_kode)
+        self.status_tutup = status_tutup
+        self.seen = int(seen)
+        self.name_norm = normalize_name(nama)
+        self.n_tok = name_tokens2(nama)
+        self.a_tok = addr_tokens(alamat)
+
+    def as_record(self) -> dict:
+        closed = self.status_kode == 3
+        return {
+            "nama": self.nama, "alamat": self.alamat, "phone": self.phone,
+            "lat": self.lat, "lon": self.lon,
+            "is_closed": closed, "closed_type": (self.status_tutup or "unknown") if closed else None,
+        }
+
+
+class Gazetteer:
+    def __init__(self, path=None):
+        self.path = path
+        self.places = []
+        self._name_idx = defaultdict(list)   # token nama -> [id]
+        self._addr_idx = defaultdict(list)   # token alamat -> [id]
+        self._grid = defaultdict(list)       # sel -> [id]
+        self._dirty = set()
+        self.hits = 0                        # baris yang terjawab dari gazetteer (diisi script.py)
+
+    def __len__(self):
+        return len(self.places)
+
+    # ---------- isi ----------
+    def _index(self, p: Place):
+        for t in p.n_tok:
+            self._name_idx[t].append(p.id)
+        for t in p.a_tok:
+            self._addr_idx[t].append(p.id)
+        self._grid[_cell(p.lat, p.lon)].append(p.id)
+
+    def _same_place(self, nama_norm, lat, lon):
+        for pid in self.near(lat, lon, MERGE_RADIUS_M):
+            if self.places[pid].name_norm == nama_norm:
+                return self.places[pid]
+        return None
+
+    def add(self, nama, alamat, lat, lon, phone="", status_kode=1, status_tutup="") -> bool:
+        """
+        Tambah satu tempat. Return True kalau tempat baru; kalau sudah ada (nama sama,
+        jarak <= MERGE_RADIUS_M) hanya diperbarui (alamat/telepon yang kosong diisi, status terakhir).
+        """
+        nama = _text(nama)
+        lat, lon = _float_or_none(lat), _float_or_none(lon)
+        if not nama or lat is None or lon is None:
+            return False
+        alamat, phone, status_tutup = _text(alamat), _text(phone), _text(status_tutup)
+
+        old = self._same_place(normalize_name(nama), lat, lon)
+        if old is not None:
+            old.seen += 1
+            old.status_kode = int(status_kode)
+            old.status_tutup = status_tutup
+            if alamat and not old.alamat:
+                old.alamat = alamat
+                old.a_tok = addr_tokens(alamat)
+                for t in old.a_tok:
+                    self._addr_idx[t].append(old.id)
+            if phone and not old.phone:
+                old.phone = phone
+            self._dirty.add(old.id)
+            return False
+
+        p = Place(nama, alamat, lat, lon, phone, status_kode, status_tutup, id=len(self.places))
+        self.places.append(p)
+        self._index(p)
+        self._dirty.add(p.id)
+        return True
+
+    def import_frame(self, df) -> int:
+        if "nama_gmaps" not in df.columns or "status_kode" not in df.columns:
+            return 0
+        added = 0
+        for r in df.itertuples(index=False):
+            row = r._asdict()
+            kode = _float_or_none(row.get("status_kode"))
+            if kode is None or int(kode) not in GAZETTEER_STATUS:
+                continue
+            added += self.add(
+                row.get("nama_gmaps"), row.get("alamat_gmaps"),
+                row.get("latitude"), row.get("longitude"),
+                row.get("nomor_telepon"), int(kode), row.get("status_tutup"),
+            )
+        return added
+
+    def import_workbook(self, path: str, chunk_rows: int = 5000) -> int:
+        """
+        Impor satu workbook output (xlsx/csv/parquet), dibaca per chunk.
+        Return jumlah tempat baru.
+        """
+        cols = ("nama_gmaps", "alamat_gmaps", "latitude", "longitude", "nomor_telepon", "status_kode", "status_tutup")
+        added = 0
+        for chunk in tableio.iter_input_chunks(path, chunk_rows):
+            chunk = chunk[[c for c in cols if c in chunk.columns]]
+            added += self.import_frame(chunk)
+        return added
+
+    # ---------- cari ----------
+    def near(self, lat, lon, radius_m):
+        """
+        id tempat dalam radius_m dari (lat, lon), lewat sel grid sekitarnya.
+        """
+        ci, cj = _cell(lat, lon)
+        span = int(radius_m / (GRID_DEG * 111000.0)) + 1
+        out = []
+        for di in range(-span, span + 1):
+            for dj in range(-span, span + 1):
+                for pid in self._grid.get((ci + di, cj + dj), ()):
+                    p = self.places[pid]
+                    if distance_m(lat, lon, p.lat, p.lon) <= radius_m:
+                        out.append(pid)
+        return out
+
+    def candidates(self, n_tok, a_tok, limit=30):
+        """
+        Shortlist id tempat untuk satu baris input: paling banyak token nama sama,
+        lalu token alamat sama. Tanpa token nama yang cocok, pakai tempat yang
+        berbagi >= 2 token alamat (nama bisa saja mirip tanpa token persis sama).
+        """
+        n_hits = defaultdict(int)
+        for t in sorted(n_tok, key=lambda t: len(self._name_idx.get(t, ()))):
+            ids = self._name_idx.get(t)
+            if not ids:
+                continue
+            if len(ids) > MAX_POSTING and n_hits:
+                continue
+            for pid in ids:
+                n_hits[pid] += 1
+
+        a_hits = defaultdict(int)
+        for t in a_tok:
+            ids = self._addr_idx.get(t, ())
+            if len(ids) > MAX_POSTING:
+                continue
+            for pid in ids:
+                a_hits[pid] += 1
+
+        pool = set(n_hits)
+        if len(pool) < limit:
+            pool.update(pid for pid, c in a_hits.items() if c >= 2)
+        ranked = sorted(pool, key=lambda pid: (-n_hits.get(pid, 0), -a_hits.get(pid, 0), pid))
+        return ranked[:limit]
+
+    # ---------- simpan/muat ----------
+    @staticmethod
+    def _connect(path):
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS places ("
+            " id INTEGER PRIMARY KEY, nama TEXT NOT NULL, alamat TEXT NOT NULL,"
+            " lat REAL NOT NULL, lon REAL NOT NULL, phone TEXT NOT NULL,"
+            " status_kode INTEGER NOT NULL, status_tutup TEXT NOT NULL,"
+            " seen INTEGER NOT NULL, updated REAL NOT NULL)"
+        )
+        return conn
+
+    @classmethod
+    def load(cls, path=GAZETTEER_FILE):
+        gz = cls(path)
+        if not os.path.exists(path):
+            return gz
+        conn = cls._connect(path)
+        try:
+            rows = conn.execute(
+                "SELECT id, nama, alamat, lat, lon, phone, status_kode, status_tutup, seen FROM places ORDER BY id"
+            ).fetchall()
+        finally:
+            conn.close()
+        for pid, nama, alamat, lat, lon, phone, kode, tutup, seen in rows:
+            if kode not in GAZETTEER_STATUS:
+                continue  # dari versi lama yang juga menyimpan status 2/5
+            p = Place(nama, alamat, lat, lon, phone, kode, tutup, seen, id=len(gz.places))
+            gz.places.append(p)
+            gz._index(p)
+        if rows and (len(gz.places) != len(rows) or rows[-1][0] != len(rows) - 1):
+            gz._dirty = set(range(len(gz.places)))  # id di file tidak rapat -> tulis ulang semua
+        return gz
+
+    def save(self, path=None):
+        path = path or self.path or GAZETTEER_FILE
+        if not self._dirty and os.path.exists(path):
+            return 0
+        conn = self._connect(path)
+        try:
+            now = time.time()
+            with conn:
+                if len(self._dirty) == len(self.places):
+                    conn.execute("DELETE FROM places")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO places VALUES (?,?,?,?,?,?,?,?,?,?)",
+                    [
+                        (p.id, p.nama, p.alamat, p.lat, p.lon, p.phone, p.status_kode, p.status_tutup, p.seen, now)
+                        for p in (self.places[i] for i in sorted(self._dirty))
+                    ],
+                )
+        finally:
+            conn.close()
+        n = len(self._dirty)
+        self._dirty.clear()
+        self.path = path
+        return n
+
+
+def main(argv):
+    paths = []
+    for pat in argv:
+        paths.extend(sorted(glob.glob(pat)) or [pat])
+    if not paths:
+        print("Pakai: py gazetteer.py hasil_lama\\*.xlsx [...]", flush=True)
+        return 2
+    gz = Gazetteer.load(GAZETTEER_FILE)
+    before = len(gz)
+    for path in paths:
+        t0 = time.perf_counter()
+        try:
+            added = gz.import_workbook(path)
+        except Exception as e:
+            print(f"⚠️ {path}: {e}", flush=True)
+            continue
+        print(f"📚 {path}: +{added} tempat ({time.perf_counter() - t0:.1f}s)", flush=True)
+    gz.save(GAZETTEER_FILE)
+    print(f"✅ Gazetteer {GAZETTEER_FILE}: {len(gz)} tempat (+{len(gz) - before})", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,273 @@
+# =========================
+# INDEX SPASIAL KECAMATAN (point-in-polygon + grid)
+# - Batas kecamatan dibaca dari GeoJSON lokal (Polygon/MultiPolygon, satu feature per kecamatan)
+# - Grid dihitung sekali saat load:
+#     sel yang tidak dilewati tepi polygon -> langsung diberi label kecamatan (atau "di luar")
+#     sel yang dilewati tepi -> cek ray casting persis, hanya ke polygon kandidat sel itu
+# - locate() vektor NumPy: satu kolom koordinat penuh sekaligus (validasi workbook)
+# - Kota = gabungan semua kecamatan di file
+#
+# Validasi workbook hasil (dari folder repo):
+#   py geoindex.py test.xlsx --geojson denpasar_kecamatan.geojson
+# =========================
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+GRID_DEG = 0.0025          # ~275 m; Denpasar ~ 70 x 45 sel
+PIP_CHUNK = 2_000_000      # batas elemen titik x tepi per langkah broadcast
+NAME_KEYS = ("nmkec", "NMKEC", "kecamatan", "KECAMATAN", "WADMKC", "NAMOBJ", "NAME_3", "name", "nama")
+
+
+def kec_key(s) -> str:
+    # "Kec. Denpasar Selatan" / "DENPASAR SELATAN" -> "denpasar selatan"
+    s = str(s or "").lower()
+    s = re.sub(r"\b(kec\.|kecamatan)\s*", " ", s)
+    return " ".join(s.split())
+
+
+def _rings_of(geom):
+    # -> list polygon, tiap polygon = list ring (ndarray n x 2, kolom lon/lat)
+    t = (geom or {}).get("type")
+    coords = (geom or {}).get("coordinates") or []
+    if t == "Polygon":
+        polys = [coords]
+    elif t == "MultiPolygon":
+        polys = coords
+    else:
+        return []
+    out = []
+    for poly in polys:
+        rings = [np.asarray(r, dtype=float)[:, :2] for r in poly if len(r) >= 3]
+        if rings:
+            out.append(rings)
+    return out
+
+def _pip(lon, lat, rings):
+    """
+    Even-odd ray casting vektor: titik (lon, lat) di dalam polygon (ring luar + lubang).
+    """
+    inside = np.zeros(len(lon), dtype=bool)
+    if not len(lon):
+        return inside
+    for ring in rings:
+        x1, y1 = ring[:, 0], ring[:, 1]
+        x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+        dy = np.where(y2 == y1, 1.0, y2 - y1)
+        step = max(1, PIP_CHUNK // max(1, len(x1)))
+        for s in range(0, len(lon), step):
+            X = lon[s:s + step, None]
+            Y = lat[s:s + step, None]
+            cond = (y1 > Y) != (y2 > Y)
+            xint = (x2 - x1) * (Y - y1) / dy + x1
+            inside[s:s + step] ^= (np.count_nonzero(cond & (X < xint), axis=1) % 2).astype(bool)
+    return inside
+
+
+class KecIndex:
+    """
+    regions: list (nama_kecamatan, [polygon...]) dengan polygon = [ring luar, lubang...].
+    """
+    OUTSIDE = -1
+    BOUNDARY = -2
+
+    def __init__(self, regions, cell_deg: float = GRID_DEG):
+        self.names = [n for n, _ in regions]
+        self.keys = [kec_key(n) for n in self.names]
+        self.polys = [[r for poly in polys for r in poly] for _, polys in regions]  # semua ring per kecamatan
+        self.cell = float(cell_deg)
+
+        pts = np.concatenate([r for rings in self.polys for r in rings])
+        self.lon0, self.lat0 = pts[:, 0].min(), pts[:, 1].min()
+        self.nx = int((pts[:, 0].max() - self.lon0) / self.cell) + 1
+        self.ny = int((pts[:, 1].max() - self.lat0) / self.cell) + 1
+
+        # 1) sel yang dilewati tepi (pakai bbox tiap tepi: konservatif, tetap benar)
+        cand = {}
+        for rid, rings in enumerate(self.polys):
+            for ring in rings:
+                x1, y1 = ring[:, 0], ring[:, 1]
+                x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+                i0 = self._ix(np.minimum(x1, x2), self.lon0, self.nx)
+                i1 = self._ix(np.maximum(x1, x2), self.lon0, self.nx)
+                j0 = self._ix(np.minimum(y1, y2), self.lat0, self.ny)
+                j1 = self._ix(np.maximum(y1, y2), self.lat0, self.ny)
+                for a0, a1, b0, b1 in zip(i0.tolist(), i1.tolist(), j0.tolist(), j1.tolist()):
+                    for j in range(b0, b1 + 1):
+                        for i in range(a0, a1 + 1):
+                            s = cand.setdefault(j * self.nx + i, set())
+                            s.add(rid)
+
+        # 2) sel lain: isi penuh satu kecamatan atau di luar -> cukup cek titik tengah
+        label = np.full(self.nx * self.ny, self.OUTSIDE, dtype=np.int32)
+        flat = np.arange(self.nx * self.ny)
+        free = np.ones(len(flat), dtype=bool)
+        free[list(cand)] = False
+        cx = self.lon0 + (flat[free] % self.nx + 0.5) * self.cell
+        cy = self.lat0 + (flat[free] // self.nx + 0.5) * self.cell
+        lab_free = np.full(len(cx), self.OUTSIDE, dtype=np.int32)
+        for rid, rings in enumerate(self.polys):
+            lab_free[_pip(cx, cy, rings) & (lab_free == self.OUTSIDE)] = rid
+        label[free] = lab_free
+        label[list(cand)] = self.BOUNDARY
+        self.label = label
+        # kecamatan tetangga bisa berbagi tepi -> sel batas punya beberapa kandidat
+        self.cand = {k: sorted(v) for k, v in cand.items()}
+
+    def _ix(self, v, v0, n):
+        return np.clip(np.floor((v - v0) / self.cell).astype(np.int64), 0, n - 1)
+
+    def __len__(self):
+        return len(self.names)
+
+    def locate(self, lats, lons) -> np.ndarray:
+        """
+        Index kecamatan (0..n-1) untuk tiap titik, -1 kalau di luar semua kecamatan / koordinat kosong.
+        """
+        lat = np.asarray(lats, dtype=float).ravel()
+        lon = np.asarray(lons, dtype=float).ravel()
+        out = np.full(len(lat), self.OUTSIDE, dtype=np.int32)
+        ok = np.isfinite(lat) & np.isfinite(lon)
+        i = np.floor((lon - self.lon0) / self.cell)
+        j = np.floor((lat - self.lat0) / self.cell)
+        ok &= (i >= 0) & (i < self.nx) & (j >= 0) & (j < self.ny)
+        cell = np.where(ok, j * self.nx + i, 0).astype(np.int64)
+        lab = np.where(ok, self.label[cell], self.OUTSIDE)
+        out[:] = np.where(lab >= 0, lab, self.OUTSIDE)
+
+        edge = np.flatnonzero(lab == self.BOUNDARY)
+        if len(edge):
+            by_rid = {}
+            for k, c in zip(edge.tolist(), cell[edge].tolist()):
+                for rid in self.cand[c]:
+                    by_rid.setdefault(rid, []).append(k)
+            for rid, ks in sorted(by_rid.items()):
+                ks = np.asarray(ks, dtype=np.int64)
+                ks = ks[out[ks] == self.OUTSIDE]
+                if len(ks):
+                    out[ks[_pip(lon[ks], lat[ks], self.polys[rid])]] = rid
+        return out
+
+    def kec_of(self, lat, lon) -> str:
+        try:
+            k = int(self.locate([float(lat)], [float(lon)])[0])
+        except (TypeError, ValueError):
+            return ""
+        return self.names[k] if k >= 0 else ""
+
+    def contains(self, lat, lon) -> bool:
+        try:
+            return int(self.locate([float(lat)], [float(lon)])[0]) >= 0
+        except (TypeError, ValueError):
+            return False
+
+    def in_kec(self, lat, lon, kec) -> bool:
+        return kec_key(self.kec_of(lat, lon)) == kec_key(kec)
+
+
+def load_geojson(path: str, name_key: str = "", cell_deg: float = GRID_DEG) -> KecIndex:
+    """
+    Baca GeoJSON FeatureCollection batas kecamatan. Nama kecamatan diambil dari
+    properti name_key, atau key pertama di NAME_KEYS yang ada.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        gj = json.load(f)
+    feats = gj.get("features") if gj.get("type") == "FeatureCollection" else [gj]
+    merged = {}
+    for ft in feats or []:
+        props = ft.get("properties") or {}
+        keys = (name_key,) if name_key else NAME_KEYS
+        name = next((str(props[k]) for k in keys if props.get(k)), "")
+        polys = _rings_of(ft.get("geometry"))
+        if name and polys:
+            merged.setdefault(name, []).extend(polys)  # satu kecamatan bisa dipecah beberapa feature
+    if not merged:
+        raise ValueError(f"Tidak ada polygon kecamatan di {path}")
+    return KecIndex(list(merged.items()), cell_deg=cell_deg)
+
+
+# =========================
+# Validasi workbook hasil
+# =========================
+def validate_frame(df, index: KecIndex) -> dict:
+    """
+    Cek semua baris berkoordinat sekaligus. Return ringkasan + array per baris:
+    kec_point (nama kecamatan titik, "" di luar kota), in_city, kec_mismatch (vs kolom nmkec).
+    """
+    lat = np.asarray(df["latitude"], dtype=float) if "latitude" in df.columns else np.full(len(df), np.nan)
+    lon = np.asarray(df["longitude"], dtype=float) if "longitude" in df.columns else np.full(len(df), np.nan)
+    has = np.isfinite(lat) & np.isfinite(lon)
+    loc = index.locate(lat, lon)
+    in_city = loc >= 0
+    names = np.asarray([""] + index.names, dtype=object)
+    kec_point = names[loc + 1]
+
+    key_idx = {k: i for i, k in enumerate(index.keys)}
+    if "nmkec" in df.columns:
+        want = np.asarray([key_idx.get(kec_key(v), -3) if str(v or "").strip() and str(v) != "nan" else -3
+                           for v in df["nmkec"].tolist()], dtype=np.int64)
+    else:
+        want = np.full(len(df), -3, dtype=np.int64)
+    mismatch = in_city & (want >= 0) & (loc != want)
+
+    return {
+        "rows": len(df),
+        "with_coords": int(has.sum()),
+        "in_city": int(in_city.sum()),
+        "outside_city": int((has & ~in_city).sum()),
+        "kec_mismatch": int(mismatch.sum()),
+        "per_kec": {n: int((loc == i).sum()) for i, n in enumerate(index.names)},
+        "kec_point": kec_point,
+        "in_city_mask": in_city,
+        "outside_mask": has & ~in_city,
+        "mismatch_mask": mismatch,
+    }
+
+def main(argv=None):
+    import pandas as pd
+
+    ap = argparse.ArgumentParser(description="Validasi koordinat workbook hasil terhadap batas kecamatan")
+    ap.add_argument("workbook")
+    ap.add_argument("--geojson", default=os.environ.get("SCREP_KEC_GEOJSON", "") or "denpasar_kecamatan.geojson")
+    ap.add_argument("--name-key", default="", help="properti GeoJSON berisi nama kecamatan")
+    ap.add_argument("--show", type=int, default=10, help="contoh baris bermasalah yang ditampilkan")
+    args = ap.parse_args(argv)
+
+    if not os.path.exists(args.geojson):
+        print(f"❌ GeoJSON batas kecamatan tidak ditemukan: {args.geojson}", flush=True)
+        return 2
+    t0 = time.perf_counter()
+    index = load_geojson(args.geojson, args.name_key)
+    t_load = time.perf_counter() - t0
+
+    df = pd.read_excel(args.workbook)
+    t0 = time.perf_counter()
+    rep = validate_frame(df, index)
+    t_check = time.perf_counter() - t0
+
+    print(f"🗺️ {len(index)} kecamatan dari {args.geojson} (index {t_load * 1000:.0f} ms, grid {index.nx}x{index.ny})", flush=True)
+    print(
+        f"✔ {rep['rows']} baris, {rep['with_coords']} berkoordinat: {rep['in_city']} di dalam kota, "
+        f"{rep['outside_city']} di luar, {rep['kec_mismatch']} beda kecamatan dengan nmkec "
+        f"({t_check * 1000:.1f} ms)",
+        flush=True
+    )
+    for n, c in rep["per_kec"].items():
+        print(f"   {n:<24} {c:>7}", flush=True)
+    cols = [c for c in ("nama_usaha", "nmkec", "latitude", "longitude", "status_kode") if c in df.columns]
+    for label, mask in (("di luar kota", rep["outside_mask"]), ("beda kecamatan", rep["mismatch_mask"])):
+        if mask.any() and args.show:
+            sub = df.loc[mask, cols].head(args.show).copy()
+            sub["kec_titik"] = rep["kec_point"][mask][:args.show]
+            print(f"\n⚠️ Contoh {label}:\n{sub.to_string()}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
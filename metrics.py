@@ -0,0 +1,307 @@
+# =========================
+# METRIK LATENSI per tahap + endpoint Prometheus lokal (opsional)
+# - stage("nama") / @timed("nama"): catat durasi satu tahap ke buffer per proses;
+#   buffer diambil per baris (take_row_stages) dan ikut dikirim bersama hasil baris,
+#   jadi worker pool tetap terkumpul di coordinator
+# - Metrics: histogram per tahap (bucket log, p50/p95/p99), jumlah per status_kode,
+#   baris/menit (jendela 5 menit) dan ETA, RAM proses + Chrome (psutil opsional)
+# - serve(metrics, port): http://127.0.0.1:<port>/metrics format teks Prometheus
+# =========================
+
+import os
+import time
+import bisect
+import inspect
+import threading
+import contextvars
+import collections
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# batas atas bucket (detik): 1 ms .. ~10 menit, kelipatan 1.25 (kesalahan kuantil < ~12%)
+BUCKETS = tuple(round(0.001 * 1.25 ** i, 6) for i in range(60))
+RATE_WINDOW_SEC = 300
+
+
+class Histogram:
+    __slots__ = ("counts", "n", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # + bucket +Inf
+        self.n = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, sec: float):
+        self.counts[bisect.bisect_left(BUCKETS, sec)] += 1
+        self.n += 1
+        self.total += sec
+        if sec > self.max:
+            self.max = sec
+
+    def quantile(self, q: float) -> float:
+        """
+        Perkiraan kuantil: interpolasi log di dalam bucket, dibatasi max yang teramati.
+        """
+        if not self.n:
+            return 0.0
+        rank = q * self.n
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if not c:
+                continue
+            if seen + c >= rank:
+                hi = BUCKETS[i] if i < len(BUCKETS) else self.max
+                lo = BUCKETS[i - 1] if i > 0 else hi / 1.25
+                frac = (rank - seen) / c
+                val = lo * (hi / lo) ** frac if lo > 0 else hi * frac
+                return min(val, self.max)
+            seen += c
+        return self.max
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}                          # nama tahap -> Histogram
+        self.status = collections.Counter()       # status_kode -> jumlah baris
+        self.rows = 0
+        self.t_start = time.time()
+        self._recent = collections.deque()        # waktu selesai baris (jendela rate)
+        self.total = None                         # total baris input (None = belum tahu, mode streaming)
+        self.skipped = 0                          # baris yang sudah selesai sebelum run ini (journal)
+        self.rss_mb = 0.0                         # RAM terakhir proses ini + anak (Chrome/chromedriver/worker)
+        self.rss_peak_mb = 0.0
+
+    def observe(self, stage: str, sec: float):
+        with self._lock:
+            h = self.stages.get(stage)
+            if h is None:
+                h = self.stages[stage] = Histogram()
+            h.observe(sec)
+
+    def row_done(self, status_kode=None, stages=()):
+        now = time.time()
+        with self._lock:
+            for stage, sec in stages or ():
+                h = self.stages.get(stage)
+                if h is None:
+                    h = self.stages[stage] = Histogram()
+                h.observe(sec)
+            self.rows += 1
+            self.status[str(status_kode) if status_kode is not None else "?"] += 1
+            self._recent.append(now)
+            while self._recent and now - self._recent[0] > RATE_WINDOW_SEC:
+                self._recent.popleft()
+
+    def set_total(self, total, skipped=0):
+        with self._lock:
+            self.total = total
+            self.skipped = skipped
+
+    def sample_rss(self):
+        # dipanggil sesekali (progress/report); butuh psutil, tanpa psutil tetap 0
+        mb = process_rss_mb(os.getpid())
+        with self._lock:
+            self.rss_mb = mb
+            self.rss_peak_mb = max(self.rss_peak_mb, mb)
+        return mb
+
+    def rows_per_min(self) -> float:
+        with self._lock:
+            now = time.time()
+            span = min(RATE_WINDOW_SEC, now - self.t_start)
+            n = sum(1 for t in self._recent if now - t <= RATE_WINDOW_SEC)
+        return n * 60.0 / span if span > 0 else 0.0
+
+    def eta_sec(self):
+        if self.total is None:
+            return None
+        rate = self.rows_per_min()
+        left = max(0, self.total - self.skipped - self.rows)
+        if not left:
+            return 0.0
+        return left * 60.0 / rate if rate > 0 else None
+
+    # ---------- output ----------
+    def prometheus_text(self) -> str:
+        out = []
+        with self._lock:
+            stages = {k: (list(h.counts), h.n, h.total, h) for k, h in self.stages.items()}
+            status = dict(self.status)
+            rows = self.rows
+        out.append("# HELP screp_stage_seconds Durasi per tahap (per baris / per kandidat)")
+        out.append("# TYPE screp_stage_seconds histogram")
+        for stage, (counts, n, total, _) in sorted(stages.items()):
+            cum = 0
+            for le, c in zip(BUCKETS, counts):
+                cum += c
+                out.append(f'screp_stage_seconds_bucket{{stage="{stage}",le="{le:g}"}} {cum}')
+            out.append(f'screp_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {n}')
+            out.append(f'screp_stage_seconds_sum{{stage="{stage}"}} {total:.6f}')
+            out.append(f'screp_stage_seconds_count{{stage="{stage}"}} {n}')
+        out.append("# HELP screp_stage_quantile_seconds Perkiraan p50/p95/p99 per tahap")
+        out.append("# TYPE screp_stage_quantile_seconds gauge")
+        for stage, (_, _, _, h) in sorted(stages.items()):
+            for q in (0.5, 0.95, 0.99):
+                out.append(f'screp_stage_quantile_seconds{{stage="{stage}",quantile="{q:g}"}} {h.quantile(q):.6f}')
+        out.append("# HELP screp_rows_total Baris selesai per status_kode")
+        out.append("# TYPE screp_rows_total counter")
+        for kode, c in sorted(status.items()):
+            out.append(f'screp_rows_total{{status_kode="{kode}"}} {c}')
+        out.append("# TYPE screp_rows_per_minute gauge")
+        out.append(f"screp_rows_per_minute {self.rows_per_min():.3f}")
+        eta = self.eta_sec()
+        if eta is not None:
+            out.append("# TYPE screp_eta_seconds gauge")
+            out.append(f"screp_eta_seconds {eta:.0f}")
+        if self.total is not None:
+            out.append("# TYPE screp_rows_remaining gauge")
+            out.append(f"screp_rows_remaining {max(0, self.total - self.skipped - rows)}")
+        if self.rss_mb:
+            out.append("# TYPE screp_rss_megabytes gauge")
+            out.append(f"screp_rss_megabytes {self.rss_mb:.1f}")
+        out.append("# TYPE screp_uptime_seconds gauge")
+        out.append(f"screp_uptime_seconds {time.time() - self.t_start:.0f}")
+        return "\n".join(out) + "\n"
+
+    def progress_line(self) -> str:
+        done = self.rows + self.skipped
+        total = "?" if self.total is None else self.total
+        eta = self.eta_sec()
+        mb = self.sample_rss()
+        return (
+            f"📈 {done}/{total} baris | {self.rows_per_min():.1f} baris/menit"
+            + (f" | ETA {fmt_duration(eta)}" if eta is not None else "")
+            + (f" | RAM {mb:.0f} MB" if mb else "")
+        )
+
+    def report(self):
+        with self._lock:
+            stages = sorted(self.stages.items(), key=lambda kv: -kv[1].total)
+            status = dict(self.status)
+            rows = self.rows
+        if not rows and not stages:
+            return
+        elapsed = time.time() - self.t_start
+        print("\n📊 Latensi per tahap:", flush=True)
+        print(f"   {'tahap':<16} {'n':>7} {'p50(s)':>8} {'p95(s)':>8} {'p99(s)':>8} {'max(s)':>8} {'total(s)':>9}", flush=True)
+        for name, h in stages:
+            print(
+                f"   {name:<16} {h.n:>7} {h.quantile(0.5):>8.3f} {h.quantile(0.95):>8.3f} "
+                f"{h.quantile(0.99):>8.3f} {h.max:>8.3f} {h.total:>9.1f}",
+                flush=True
+            )
+        rate = rows * 60.0 / elapsed if elapsed > 0 else 0.0
+        print(
+            f"   {rows} baris dalam {fmt_duration(elapsed)} ({rate:.1f} baris/menit) | status_kode: "
+            + ", ".join(f"{k}={v}" for k, v in sorted(status.items())),
+            flush=True
+        )
+        if self.rss_peak_mb:
+            print(
+                f"   RAM puncak {self.rss_peak_mb:.0f} MB -> {rate * 1024.0 / self.rss_peak_mb:.1f} baris/menit per GB",
+                flush=True
+            )
+
+
+def process_rss_mb(pid) -> float:
+    """
+    RAM (RSS, MB) satu proses + semua anaknya, mis. chromedriver + Chrome.
+    0 kalau psutil tidak terpasang (opsional: pip install psutil).
+    """
+    try:
+        import psutil
+    except ImportError:
+        return 0.0
+    try:
+        p = psutil.Process(pid)
+        return sum(x.memory_info().rss for x in [p] + p.children(recursive=True)) / (1024.0 * 1024.0)
+    except Exception:
+        return 0.0
+
+
+def fmt_duration(sec) -> str:
+    sec = int(sec or 0)
+    h, rem = divmod(sec, 3600)
+    m, s = divmod(rem, 60)
+    if h:
+        return f"{h}j{m:02d}m"
+    if m:
+        return f"{m}m{s:02d}s"
+    return f"{s}s"
+
+
+# =========================
+# Buffer tahap baris yang sedang jalan
+# - ContextVar: per proses/thread seperti biasa, dan per task asyncio (engine CDP
+#   menjalankan beberapa baris sekaligus di satu proses, tiap tab satu task)
+# =========================
+_row_stages = contextvars.ContextVar("screp_row_stages", default=None)
+
+def _stage_buf() -> list:
+    buf = _row_stages.get()
+    if buf is None:
+        buf = []
+        _row_stages.set(buf)
+    return buf
+
+@contextmanager
+def stage(name: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _stage_buf().append((name, time.perf_counter() - t0))
+
+def timed(name: str):
+    def deco(fn):
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def awrapper(*args, **kwargs):
+                with stage(name):
+                    return await fn(*args, **kwargs)
+            return awrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+def take_row_stages() -> list:
+    # buffer baru (bukan clear): task asyncio mewarisi list milik pembuatnya,
+    # panggilan pertama di task langsung memisahkan buffernya
+    buf = _row_stages.get()
+    _row_stages.set([])
+    return buf or []
+
+
+# =========================
+# Endpoint HTTP lokal
+# =========================
+def serve(metrics: Metrics, port: int, host: str = "127.0.0.1"):
+    """
+    Jalankan server /metrics di thread daemon. Return server (panggil shutdown() saat selesai).
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="screp-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,240 @@
+# =========================
+# PLANNER QUERY adaptif: belajar varian query mana yang benar-benar menghasilkan match
+# - Varian dari build_query_variants (script.py): nama+alamat+kec, nama+kec,
+#   alamat+nama, nama+kota; baris dikelompokkan per jenis (row_kind di script.py:
+#   alamat ada/lemah/kosong, nama generik, kecamatan ada)
+# - Per jenis dicatat jumlah baris; per (jenis, varian): di berapa baris varian itu
+#   benar-benar dijalankan (belum berhenti dini), dan di berapa baris kandidat terbaiknya
+#   sendiri lolos jadi match diterima (status_kode 1/3). Bukan hanya varian penyumbang
+#   kandidat terbaik baris -> varian urutan belakang tidak kalah hanya karena urutannya
+# - Urutan: peluang (menang+1)/(coba+2) menurun; data jenis itu belum cukup -> urutan bawaan
+# - Varian yang peluangnya rendah (sudah cukup dicoba) ditunda ke cadangan: hanya
+#   dicoba kalau keputusan akhir baris masih belum diterima (fallback tetap ada)
+# - Disimpan di screp_queryplan.sqlite; tiap proses menulis selisih (aman untuk worker pool)
+#
+# Lihat isi statistik (dari folder repo):
+#   py queryplan.py
+# =========================
+
+import os
+import sys
+import sqlite3
+import threading
+
+QUERYPLAN_FILE = "screp_queryplan.sqlite"
+MIN_TRIES = 20          # baris minimal per jenis sebelum urutan diubah; percobaan minimal sebelum varian ditunda
+DROP_BELOW = 0.05       # peluang di bawah ini (dan sudah MIN_TRIES kali dicoba) -> cadangan
+FLUSH_EVERY_ROWS = 50   # tulis selisih statistik ke sqlite tiap N baris
+
+
+class QueryPlan:
+    """
+    Rencana query satu baris: queries = [(varian, query)] yang dicoba berurutan,
+    reserve = varian yang ditunda (dicoba hanya kalau need_more() masih True).
+    """
+    __slots__ = ("kind", "queries", "reserve", "default", "tried", "exhausted", "used_reserve", "top", "reordered")
+
+    def __init__(self, kind, queries, reserve=(), default=None, reordered=False):
+        self.kind = kind
+        self.queries = list(queries)
+        self.reserve = list(reserve)
+        # urutan bawaan (nama varian), untuk perkiraan query yang dihemat
+        self.default = list(default) if default is not None else [v for v, _ in self.queries + self.reserve]
+        self.tried = []
+        self.exhausted = False     # semua query rencana sudah dicoba (tidak berhenti dini)
+        self.used_reserve = False
+        self.top = {}              # varian -> (score, kandidat) terbaik dari query varian itu sendiri
+        self.reordered = reordered # urutan/cadangan beda dari bawaan (dihitung di record)
+
+    @property
+    def n_default(self) -> int:
+        return len(self.default)
+
+    def fixed_cost(self) -> int:
+        """
+        Perkiraan jumlah query kalau urutan bawaan dipakai: semua varian kalau baris ini
+        tidak berhenti dini, kalau berhenti dini sampai posisi bawaan varian terakhir.
+        """
+        if self.exhausted or not self.tried:
+            return self.n_default
+        return self.default.index(self.tried[-1]) + 1
+
+    def first_query(self) -> str:
+        return self.queries[0][1] if self.queries else ""
+
+    def offer(self, variant, score, cand):
+        if variant is not None and score > self.top.get(variant, (float("-inf"),))[0]:
+            self.top[variant] = (score, cand)
+
+    def walk(self, need_more):
+        for variant, q in self.queries:
+            self.tried.append(variant)
+            yield variant, q
+        self.exhausted = True
+        if self.reserve and need_more():
+            self.used_reserve = True
+            for variant, q in self.reserve:
+                self.tried.append(variant)
+                yield variant, q
+
+
+class QueryPlanner:
+    def __init__(self, path=QUERYPLAN_FILE, min_tries=MIN_TRIES, drop_below=DROP_BELOW):
+        self.path = path
+        self.min_tries = min_tries
+        self.drop_below = drop_below
+        self.stats = {}        # (kind, variant) -> [tries, wins]
+        self.kind_rows = {}    # kind -> jumlah baris
+        self._delta = {}       # (kind, variant) -> [tries, wins] belum ditulis
+        self._delta_rows = {}  # kind -> baris belum ditulis
+        self._lock = threading.Lock()
+        self._since_flush = 0
+        # statistik run ini (report)
+        self.rows = 0
+        self.queries_run = 0
+        self.queries_fixed = 0     # perkiraan kalau urutan bawaan (QueryPlan.fixed_cost)
+        self.queries_max = 0
+        self.reordered = 0
+        self.reserve_used = 0
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_variant ("
+            "kind TEXT NOT NULL, variant TEXT NOT NULL, "
+            "tries INTEGER NOT NULL DEFAULT 0, wins INTEGER NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (kind, variant))"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_kind ("
+            "kind TEXT PRIMARY KEY, rows INTEGER NOT NULL DEFAULT 0)"
+        )
+        self.conn.commit()
+        self.load()
+
+    def load(self):
+        with self._lock:
+            self.stats.clear()
+            self.kind_rows.clear()
+            for kind, variant, tries, wins in self.conn.execute(
+                "SELECT kind, variant, tries, wins FROM query_variant"
+            ):
+                self.stats[(kind, variant)] = [tries, wins]
+            for kind, rows in self.conn.execute("SELECT kind, rows FROM query_kind"):
+                self.kind_rows[kind] = rows
+
+    def payoff(self, kind, variant) -> float:
+        tries, wins = self.stats.get((kind, variant), (0, 0))
+        return (wins + 1.0) / (tries + 2.0)
+
+    def plan(self, kind, variants) -> QueryPlan:
+        """
+        variants: [(varian, query)] urutan bawaan. Return QueryPlan (selalu minimal satu query).
+        """
+        variants = list(variants)
+        with self._lock:
+            if len(variants) <= 1 or self.kind_rows.get(kind, 0) < self.min_tries:
+                return QueryPlan(kind, variants)
+            ranked = sorted(
+                enumerate(variants),
+                key=lambda iv: (-self.payoff(kind, iv[1][0]), iv[0]),
+            )
+            ordered = [v for _, v in ranked]
+            keep, reserve = [], []
+            for variant, q in ordered:
+                tries = self.stats.get((kind, variant), (0, 0))[0]
+                if keep and tries >= self.min_tries and self.payoff(kind, variant) < self.drop_below:
+                    reserve.append((variant, q))
+                else:
+                    keep.append((variant, q))
+            reordered = [v for v, _ in ordered] != [v for v, _ in variants] or bool(reserve)
+        return QueryPlan(kind, keep, reserve, default=[v for v, _ in variants], reordered=reordered)
+
+    def record(self, plan: QueryPlan, won=()):
+        """
+        Baris selesai: jenis baris +1 baris, tiap varian yang dijalankan +1 coba,
+        varian (dari yang dijalankan) yang kandidatnya sendiri diterima +1 menang.
+        """
+        with self._lock:
+            for store in (self.kind_rows, self._delta_rows):
+                store[plan.kind] = store.get(plan.kind, 0) + 1
+            for variant in plan.tried:
+                for store in (self.stats, self._delta):
+                    st = store.setdefault((plan.kind, variant), [0, 0])
+                    st[0] += 1
+                    if variant in won:
+                        st[1] += 1
+            self.rows += 1
+            self.queries_run += len(plan.tried)
+            self.queries_fixed += plan.fixed_cost()
+            self.queries_max += plan.n_default
+            if plan.reordered:
+                self.reordered += 1
+            if plan.used_reserve:
+                self.reserve_used += 1
+            self._since_flush += 1
+            due = self._since_flush >= FLUSH_EVERY_ROWS
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            delta, self._delta = self._delta, {}
+            delta_rows, self._delta_rows = self._delta_rows, {}
+            self._since_flush = 0
+        if not delta and not delta_rows:
+            return
+        try:
+            self.conn.executemany(
+                "INSERT INTO query_variant (kind, variant, tries, wins) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(kind, variant) DO UPDATE SET "
+                "tries = tries + excluded.tries, wins = wins + excluded.wins",
+                [(k, v, t, w) for (k, v), (t, w) in delta.items()],
+            )
+            self.conn.executemany(
+                "INSERT INTO query_kind (kind, rows) VALUES (?, ?) "
+                "ON CONFLICT(kind) DO UPDATE SET rows = rows + excluded.rows",
+                list(delta_rows.items()),
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ Statistik planner query tidak tersimpan: {e}", flush=True)
+
+    def report(self):
+        if not self.rows:
+            return
+        saved = self.queries_fixed - self.queries_run
+        print(
+            f"\n🧭 Planner query: {self.rows} baris, {self.queries_run / self.rows:.2f} query/baris "
+            f"(urutan tetap ~{self.queries_fixed / self.rows:.2f}, maks {self.queries_max / self.rows:.2f}) "
+            f"-> hemat ~{saved} query ({saved / self.rows:.2f}/baris) | urutan diubah {self.reordered} baris, "
+            f"cadangan dipakai {self.reserve_used} baris",
+            flush=True
+        )
+
+    def table(self):
+        # [(kind, variant, tries, wins, payoff)] urut per jenis lalu peluang
+        with self._lock:
+            rows = [(k, v, t, w, self.payoff(k, v)) for (k, v), (t, w) in self.stats.items()]
+        return sorted(rows, key=lambda r: (r[0], -r[4]))
+
+    def close(self):
+        self.flush()
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+def main(argv):
+    path = argv[1] if len(argv) > 1 else QUERYPLAN_FILE
+    if not os.path.exists(path):
+        print(f"Belum ada statistik planner: {path}")
+        return
+    planner = QueryPlanner(path)
+    print(f"{'jenis baris':<32} {'baris':>7} {'varian':<12} {'coba':>7} {'menang':>7} {'peluang':>8}")
+    for kind, variant, tries, wins, p in planner.table():
+        print(f"{kind:<32} {planner.kind_rows.get(kind, 0):>7} {variant:<12} {tries:>7} {wins:>7} {p:>8.2f}")
+    planner.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
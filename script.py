@@ -3,30 +3,102 @@
 # - Tambahan: FORCE STOP (Ctrl+C / STOP.txt)
 # - Tambahan: AUTOSAVE aman (tmp -> replace) + autosave backup
 # - Perbaikan: handle query kosong, save robust, folder screenshot, log lebih jelas
+# - Tambahan: WORKER POOL (SCREP_WORKERS=N -> N Chrome paralel, 1 coordinator yang save)
+# - Tambahan: QUERY CACHE SQLite (rerun tidak perlu buka Google Maps lagi untuk query yang sama)
+# - Tambahan: PLACE CACHE (kandidat yang sama lintas query/baris tidak dibuka ulang)
+# - Tambahan: profil browser "lean" (SCREP_BROWSER_PROFILE=lean: headless, tanpa tile/gambar/font)
+# - Perbaikan: tunggu halaman event-driven (MutationObserver), implicit wait 0, statistik lama tunggu
+# - Perbaikan: normalisasi teks dipindah ke textnorm.py (regex terkompilasi + cache LRU)
+# - Perbaikan: kemiripan token/fuzzy dipindah ke similarity.py (saring batas panjang/LCS + cache)
+# - Perbaikan: scoring pakai RowProfile (fitur input dihitung sekali per baris) + record slot
+# - Tambahan: batch scoring NumPy (score_pairs_batch); quick-score list mode dihitung sekaligus
+# - Tambahan: JOURNAL per baris (<file>.journal.jsonl, fsync) -> restart langsung lanjut dari baris terakhir
+# - Perbaikan: dengan journal, autosave xlsx penuh jadi jarang (compact); .autosave cukup salin file
+# - Perbaikan: checkpoint xlsx ditulis thread writer di background (snapshot df, coalesce, flush saat stop)
+# - Tambahan: input streaming per chunk (xlsx read-only / csv / parquet; SCREP_INPUT, SCREP_STREAM=1)
+# - Tambahan: DEDUP baris duplikat (nama/alamat/kec ternormalisasi) -> dicari sekali, hasil disalin
+# - Tambahan: GAZETTEER lokal dari output lama -> baris yang yakin cocok tidak perlu buka browser
+# - Tambahan: batas kecamatan dari GeoJSON (SCREP_KEC_GEOJSON) -> cek dalam kota/kecamatan persis, fallback bbox
+# - Tambahan: latensi per tahap (p50/p95/p99), baris/menit, ETA; endpoint Prometheus (SCREP_METRICS_PORT)
+# - Tambahan: SCREP_MAPS_BASE_URL / SCREP_CHROMEDRIVER -> bench end-to-end offline lawan server Maps tiruan
+# - Perbaikan: pohon keputusan akhir dipisah ke finalize_decision (bisa diukur bench\bench_hotpaths.py)
+# - Tambahan: SCREP_ENGINE=cdp -> engine asyncio DevTools (satu Chrome, SCREP_CDP_TABS tab), tanpa chromedriver
+# - Tambahan: kandidat list top-k (SCREP_TOP_OPEN) dibuka paralel di tab baru, tanpa kembali ke halaman list (SCREP_CAND_TABS=0 = berurutan di tab list)
+# - Tambahan: prefetch query pertama baris berikutnya di tab cadangan selagi baris sekarang diproses (SCREP_PREFETCH=0 = mati)
+# - Tambahan: planner query adaptif (queryplan.py) -> varian yang jarang berhasil per jenis baris diurut belakang/ditunda (SCREP_PLANNER=0 = urutan tetap)
 # =========================
 
 import os
 import time
 import re
+import json
+import hashlib
+import shutil
+import queue
+import collections
+import threading
+import asyncio
+import contextvars
+import sqlite3
+import multiprocessing as mp
+import numpy as np
 import pandas as pd
 import signal
 from urllib.parse import quote_plus
-from difflib import SequenceMatcher
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import (
+    JavascriptException,
     TimeoutException,
     StaleElementReferenceException,
     WebDriverException,
 )
 from webdriver_manager.chrome import ChromeDriverManager
 
+# Normalisasi teks (regex terkompilasi + memo LRU) ada di textnorm.py
+from textnorm import (
+    STOP_WORDS,
+    GENERIC_NAME,
+    clean_text,
+    normalize_addr,
+    normalize_name,
+    name_tokens2,
+    addr_tokens,
+    addr_alpha_tokens,
+    report_cache_stats as report_norm_cache_stats,
+)
+# Kemiripan token/fuzzy (SequenceMatcher + saring batas panjang/LCS + memo) ada di similarity.py
+from similarity import (
+    fuzzy_ratio,
+    fuzzy_at_least,
+    soft_token_overlap,
+    soft_jaccard,
+    report_cache_stats as report_sim_cache_stats,
+)
+# Baca input per chunk (xlsx read-only / csv / parquet) + tulis xlsx streaming ada di tableio.py
+import tableio
+# Gazetteer lokal (tempat terverifikasi dari output lama + index token/grid) ada di gazetteer.py
+from gazetteer import Gazetteer, GAZETTEER_FILE, distance_m
+# Batas kecamatan (GeoJSON -> point-in-polygon + grid) ada di geoindex.py
+import geoindex
+# Statistik varian query per jenis baris (urutan/penundaan query adaptif) ada di queryplan.py
+from queryplan import QueryPlan, QueryPlanner, QUERYPLAN_FILE
+# Engine alternatif asyncio lewat DevTools protocol (SCREP_ENGINE=cdp) ada di cdp_engine.py
+import cdp_engine
+# Histogram latensi per tahap + endpoint Prometheus lokal ada di metrics.py
+from metrics import Metrics, stage, timed, take_row_stages, serve as serve_metrics
+
 os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
 
+def _env_int(name: str, default: int) -> int:
+    # setting bisa dioverride lewat env (contoh: set SCREP_WORKERS=4)
+    try:
+        return int(os.environ.get(name, "") or default)
+    except Exception:
+        return default
+
 # =========================
 # FORCE STOP + AUTOSAVE
 # =========================
@@ -34,13 +106,27 @@ STOP_FILE = "STOP.txt"            # buat file ini di folder script untuk stop ha
 AUTOSAVE_EVERY_ROWS = 10          # autosave tiap N baris
 AUTOSAVE_EVERY_SEC = 60           # atau tiap N detik (mana yang tercapai dulu)
 AUTOSAVE_KEEP_COPY = True         # simpan juga file .autosave.xlsx
+# Kalau journal aktif, tiap baris sudah aman di journal; xlsx penuh cukup ditulis jarang:
+AUTOSAVE_COMPACT_EVERY_SEC = _env_int("SCREP_COMPACT_EVERY_SEC", 600)  # minimal jeda tulis xlsx penuh
+AUTOSAVE_COMPACT_MAX_SHARE = 0.05  # dan waktu tulis xlsx maksimal ~5% dari waktu run (file besar -> makin jarang)
 SCREENSHOT_DIR = "debug_screens"  # folder screenshot error
+METRICS_PORT = _env_int("SCREP_METRICS_PORT", 0)  # >0 -> http://127.0.0.1:<port>/metrics
+PROGRESS_EVERY_ROWS = 25          # cetak baris/menit + ETA tiap N baris
+METRICS = Metrics()               # hanya diisi di coordinator / proses utama
+# Basis URL Google Maps; bench e2e mengarahkan ke server tiruan lokal (bench/fake_maps.py)
+MAPS_BASE_URL = (os.environ.get("SCREP_MAPS_BASE_URL", "") or "https://www.google.com/maps").rstrip("/")
 
 _stop_requested = False
+_stop_event = None                # multiprocessing.Event (hanya di mode worker pool)
 
 def request_stop(reason=""):
     global _stop_requested
     _stop_requested = True
+    if _stop_event is not None:
+        try:
+            _stop_event.set()
+        except Exception:
+            pass
     if reason:
         print(f"\n🛑 STOP requested: {reason}", flush=True)
 
@@ -48,15 +134,22 @@ def _on_signal(sig, frame):
     # Ctrl+C / kill -> stop aman
     request_stop(f"signal={sig}")
 
-signal.signal(signal.SIGINT, _on_signal)
-try:
-    signal.signal(signal.SIGTERM, _on_signal)
-except Exception:
-    pass
+def install_signal_handlers():
+    signal.signal(signal.SIGINT, _on_signal)
+    try:
+        signal.signal(signal.SIGTERM, _on_signal)
+    except Exception:
+        pass
 
 def should_stop() -> bool:
     if _stop_requested:
         return True
+    if _stop_event is not None:
+        try:
+            if _stop_event.is_set():
+                return True
+        except Exception:
+            pass
     try:
         if os.path.exists(STOP_FILE):
             request_stop(f"found {STOP_FILE}")
@@ -75,7 +168,9 @@ def safe_save_excel(df: pd.DataFrame, file_path: str, tag: str = ""):
     """
     Save aman: tulis ke tmp, lalu replace.
     Mengurangi risiko file corrupt kalau proses berhenti/PC mati.
+    Return lama save (detik), None kalau gagal.
     """
+    t0 = time.time()
     try:
         base, ext = os.path.splitext(file_path)
         tmp_path = base + ".__tmp__" + (ext or ".xlsx")
@@ -83,18 +178,92 @@ def safe_save_excel(df: pd.DataFrame, file_path: str, tag: str = ""):
         os.replace(tmp_path, file_path)
 
         if AUTOSAVE_KEEP_COPY:
+            # isi sama dengan file utama -> salin file, tidak perlu serialisasi ulang
             bak_path = base + ".autosave" + (ext or ".xlsx")
             try:
-                df.to_excel(bak_path, index=False)
+                shutil.copyfile(file_path, bak_path)
             except Exception:
                 pass
 
+        sec = time.time() - t0
         if tag:
-            print(f"💾 Saved {tag} -> {file_path}", flush=True)
+            print(f"💾 Saved {tag} -> {file_path} ({sec:.1f}s)", flush=True)
         else:
-            print(f"💾 Saved -> {file_path}", flush=True)
+            print(f"💾 Saved -> {file_path} ({sec:.1f}s)", flush=True)
+        return sec
     except Exception as e:
         print(f"⚠️ Gagal save ({tag}): {e}", flush=True)
+        return None
+
+class CheckpointWriter:
+    """
+    Checkpoint xlsx ditulis di thread terpisah, jadi browser tidak menunggu disk.
+    - submit(): ambil snapshot df (copy) lalu langsung kembali
+    - maksimal satu save berjalan; snapshot yang masih antre ditimpa yang lebih baru (coalesce)
+    - flush(): tunggu antrean + save berjalan selesai; close(): flush lalu hentikan thread
+    """
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._cond = threading.Condition()
+        self._pending = None  # (snapshot, tag)
+        self._busy = False
+        self._closed = False
+        self.saves = 0
+        self.coalesced = 0
+        self.busy_sec = 0.0
+        self.last_save_sec = 0.0
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, df: pd.DataFrame, tag: str = ""):
+        snap = df.copy(deep=True)
+        with self._cond:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = (snap, tag)
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                snap, tag = self._pending
+                self._pending = None
+                self._busy = True
+            t0 = time.time()
+            sec = safe_save_excel(snap, self.file_path, tag=tag)
+            if sec is not None:
+                METRICS.observe("save", sec)
+            with self._cond:
+                self.busy_sec += time.time() - t0
+                self.saves += 1
+                if sec is not None:
+                    self.last_save_sec = sec
+                self._busy = False
+                self._cond.notify_all()
+
+    def flush(self, timeout=None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending is None and not self._busy, timeout)
+
+    def close(self):
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def report(self):
+        if not self.saves:
+            return
+        print(
+            f"🖋️ Writer checkpoint: {self.saves} save, sibuk {self.busy_sec:.1f}s di background "
+            f"({self.coalesced} digabung)",
+            flush=True
+        )
 
 # =========================
 # Denpasar bbox filter (WAJIB)
@@ -116,6 +285,45 @@ def is_within_bbox(lat, lon, bbox=DENPASAR_BBOX):
     except Exception:
         return False
 
+# Batas kecamatan persis (polygon) kalau file GeoJSON ada; tanpa file -> tetap DENPASAR_BBOX.
+# Bbox mencakup sebagian Badung, polygon tidak.
+KEC_GEOJSON = os.environ.get("SCREP_KEC_GEOJSON", "") or "denpasar_kecamatan.geojson"
+_kec_index = None  # None = belum dimuat, False = tidak ada / gagal
+
+def get_kec_index():
+    global _kec_index
+    if _kec_index is None:
+        _kec_index = False
+        if os.path.exists(KEC_GEOJSON):
+            try:
+                _kec_index = geoindex.load_geojson(KEC_GEOJSON)
+                print(f"🗺️ Batas kecamatan: {len(_kec_index)} kecamatan dari {KEC_GEOJSON}", flush=True)
+            except Exception as e:
+                print(f"⚠️ GeoJSON kecamatan tidak dipakai ({e}); pakai bbox", flush=True)
+    return _kec_index or None
+
+def in_city(lat, lon, bbox=DENPASAR_BBOX) -> bool:
+    index = get_kec_index() if bbox is DENPASAR_BBOX else None
+    if index is None:
+        return is_within_bbox(lat, lon, bbox=bbox)
+    if lat is None or lon is None:
+        return False
+    return index.contains(lat, lon)
+
+def kec_conflict(kec_in, lat, lon) -> bool:
+    """
+    True hanya kalau pasti beda: polygon termuat, kec input dikenal, dan titik ada
+    di kecamatan lain dalam kota. Tanpa GeoJSON selalu False.
+    """
+    index = get_kec_index()
+    if index is None or lat is None or lon is None:
+        return False
+    key = geoindex.kec_key(kec_in)
+    if not key or key not in index.keys:
+        return False
+    kec_pt = index.kec_of(lat, lon)
+    return bool(kec_pt) and geoindex.kec_key(kec_pt) != key
+
 # =========================
 # Helper: safe cell (NaN -> "")
 # =========================
@@ -132,31 +340,179 @@ def s_cell(v) -> str:
     except Exception:
         return ""
 
+# =========================
+# Helper: tunggu halaman (event-driven, tanpa sleep/poll dari Python)
+# =========================
+# Satu execute_async_script per tunggu: cek kondisi tiap ada mutasi DOM (MutationObserver)
+# dan resolve begitu terpenuhi. Interval 250ms hanya cadangan untuk perubahan URL
+# via pushState (tidak memicu mutasi). Return {ok, ms}.
+WAIT_FOR_JS = r"""
+const kind = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+const t0 = performance.now();
+const skip = new Set(["hasil", "result", "results"]);
+const url = () => location.href.toLowerCase();
+const has = (sel) => !!document.querySelector(sel);
+const checks = {
+  doc: () => document.readyState === "interactive" || document.readyState === "complete",
+  results: () => (location.href.includes("!3d") && location.href.includes("!4d")) || has("a.hfpxzc") || has("h1"),
+  links: () => has("a.hfpxzc"),
+  h1: () => has("h1"),
+  place_or_h1: () => url().includes("/maps/place") || has("h1"),
+  place: () => {
+    if (!url().includes("/maps/place")) return false;
+    for (const h of Array.from(document.querySelectorAll("h1")).slice(0, 2)) {
+      const t = (h.innerText || "").trim();
+      if (t && !skip.has(t.toLowerCase())) return true;
+    }
+    const t = (document.title || "").trim();
+    if (t.includes(" - ")) {
+      const base = t.split(" - ")[0].trim();
+      if (base && !skip.has(base.toLowerCase())) return true;
+    }
+    return false;
+  },
+  details: () => has('[data-item-id*="address"]') || has("div.Io6YTe"),
+};
+const fn = checks[kind] || checks.doc;
+let finished = false, obs = null, timer = null, iv = null;
+const finish = (ok) => {
+  if (finished) return;
+  finished = true;
+  if (obs) obs.disconnect();
+  clearTimeout(timer);
+  clearInterval(iv);
+  document.removeEventListener("readystatechange", check);
+  done({ok: ok, ms: Math.round(performance.now() - t0)});
+};
+function check() { try { if (fn()) finish(true); } catch (e) {} }
+check();
+if (!finished) {
+  obs = new MutationObserver(check);
+  obs.observe(document.documentElement || document, {childList: true, subtree: true, characterData: true});
+  document.addEventListener("readystatechange", check);
+  iv = setInterval(check, 250);
+  timer = setTimeout(() => finish(false), Math.max(0, timeoutMs));
+}
+"""
+
+# Statistik lama tunggu (per jenis + per baris) supaya kelihatan sisa waktu mati
+WAIT_STATS = {}          # kind -> [jumlah, total_detik, max_detik, jumlah_timeout]
+# total tunggu baris berjalan: list [detik] (bukan float) supaya task anak asyncio.gather
+# (tab kandidat CDP) menambah ke akumulator baris yang sama, bukan ke salinan context-nya
+_row_wait = contextvars.ContextVar("screp_row_wait", default=None)  # per baris (per task di engine CDP)
+
+def record_wait(kind, sec, ok):
+    st = WAIT_STATS.setdefault(kind, [0, 0.0, 0.0, 0])
+    st[0] += 1
+    st[1] += sec
+    st[2] = max(st[2], sec)
+    if not ok:
+        st[3] += 1
+    acc = _row_wait.get()
+    if acc is None:
+        acc = [0.0]
+        _row_wait.set(acc)
+    acc[0] += sec
+
+def reset_row_wait():
+    _row_wait.set([0.0])
+
+def row_wait_sec() -> float:
+    acc = _row_wait.get()
+    return acc[0] if acc is not None else 0.0
+
+def report_wait_stats():
+    if not WAIT_STATS:
+        return
+    print("\n⏱ Statistik tunggu halaman:", flush=True)
+    print(f"   {'jenis':<12} {'n':>6} {'rata2(s)':>9} {'max(s)':>8} {'timeout':>8} {'total(s)':>9}", flush=True)
+    for kind, (n, tot, mx, n_to) in sorted(WAIT_STATS.items(), key=lambda kv: -kv[1][1]):
+        print(f"   {kind:<12} {n:>6} {tot / max(1, n):>9.2f} {mx:>8.2f} {n_to:>8} {tot:>9.1f}", flush=True)
+
+def wait_for(driver, kind, timeout) -> bool:
+    """
+    Tunggu kondisi `kind` (lihat WAIT_FOR_JS) sampai `timeout` detik.
+    Return True kalau terpenuhi, False kalau timeout. Lama tunggu dicatat di WAIT_STATS.
+    """
+    t0 = time.time()
+    deadline = t0 + timeout
+    ok = False
+    while True:
+        left = deadline - time.time()
+        if left <= 0:
+            break
+        try:
+            res = driver.execute_async_script(WAIT_FOR_JS, kind, int(left * 1000))
+            ok = bool(res and res.get("ok"))
+            break
+        except TimeoutException:
+            break
+        except JavascriptException:
+            # dokumen diganti di tengah tunggu (navigasi) -> ulang di dokumen baru
+            time.sleep(0.05)
+    record_wait(kind, time.time() - t0, ok)
+    return ok
+
 # =========================
 # Helper: browser
 # =========================
 def wait_document_ready(driver, timeout=12):
-    WebDriverWait(driver, timeout).until(
-        lambda d: d.execute_script("return document.readyState") in ("interactive", "complete")
-    )
+    if not wait_for(driver, "doc", timeout):
+        raise TimeoutException(f"document belum siap setelah {timeout}s")
+
+# Tunggu tombol consent ATAU konten maps muncul (mana duluan), klik kalau ada,
+# lalu tunggu dialognya hilang. Tidak ada lagi 5 x WebDriverWait berurutan.
+CONSENT_JS = r"""
+const timeoutMs = arguments[0], done = arguments[arguments.length - 1];
+const labels = ["Accept", "I agree", "Setuju", "Terima", "AGREE"];
+const content = "a.hfpxzc, h1, #searchboxinput, div[role='main']";
+let finished = false, obs = null, timer = null;
+const finish = (v) => {
+  if (finished) return;
+  finished = true;
+  if (obs) obs.disconnect();
+  clearTimeout(timer);
+  done(v);
+};
+const findBtn = () => {
+  for (const b of document.querySelectorAll("button")) {
+    const t = b.innerText || "";
+    if (!b.disabled && labels.some((l) => t.includes(l))) return b;
+  }
+  return null;
+};
+const check = () => {
+  const b = findBtn();
+  if (b) {
+    b.click();
+    const t1 = performance.now();
+    const gone = () => {
+      if (!b.isConnected || performance.now() - t1 > 1500) return finish(true);
+      requestAnimationFrame(gone);
+    };
+    gone();
+    return;
+  }
+  if (document.querySelector(content)) finish(false);
+};
+check();
+if (!finished) {
+  obs = new MutationObserver(() => { if (!finished) check(); });
+  obs.observe(document.documentElement || document, {childList: true, subtree: true});
+  timer = setTimeout(() => finish(false), Math.max(0, timeoutMs));
+}
+"""
 
+@timed("consent")
 def click_consent_if_any(driver, timeout=2):
-    xpaths = [
-        "//button//*[contains(.,'Accept')]/ancestor::button[1]",
-        "//button//*[contains(.,'I agree')]/ancestor::button[1]",
-        "//button//*[contains(.,'Setuju')]/ancestor::button[1]",
-        "//button//*[contains(.,'Terima')]/ancestor::button[1]",
-        "//button//*[contains(.,'AGREE')]/ancestor::button[1]",
-    ]
-    for xp in xpaths:
-        try:
-            btn = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable((By.XPATH, xp)))
-            btn.click()
-            time.sleep(0.15)
-            return True
-        except TimeoutException:
-            pass
-    return False
+    t0 = time.time()
+    clicked = False
+    try:
+        clicked = bool(driver.execute_async_script(CONSENT_JS, int(timeout * 1000)))
+    except WebDriverException:
+        clicked = False
+    record_wait("consent", time.time() - t0, True)
+    return clicked
 
 def safe_text(el):
     try:
@@ -165,7 +521,7 @@ def safe_text(el):
         return None
 
 def open_home(driver):
-    driver.get("https://www.google.com/maps")
+    driver.get(MAPS_BASE_URL)
     wait_document_ready(driver, 12)
     click_consent_if_any(driver, timeout=2)
 
@@ -206,27 +562,8 @@ def parse_coords_from_url(url: str):
     return None, None
 
 # =========================
-# Normalisasi teks
+# Normalisasi teks (clean_text, normalize_* & token set: lihat textnorm.py)
 # =========================
-def clean_text(s: str) -> str:
-    s = str(s or "")
-    s = s.replace("<", " ").replace(">", " ")
-    s = re.sub(r"\bRT\s*\d+\/?\s*RW\s*\d+\b", " ", s, flags=re.I)
-    s = re.sub(r"\bRT\s*\d+\b", " ", s, flags=re.I)
-    s = re.sub(r"\bRW\s*\d+\b", " ", s, flags=re.I)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
-
-# FIX penting: pecah "JalanIMAM" -> "Jalan IMAM", "No486A" -> "No 486 A"
-def _split_stuck_words(s: str) -> str:
-    if not s:
-        return ""
-    s = re.sub(r"([a-z])([A-Z])", r"\1 \2", s)
-    s = re.sub(r"([A-Za-z])(\d)", r"\1 \2", s)
-    s = re.sub(r"(\d)([A-Za-z])", r"\1 \2", s)
-    return s
-    
-
 def extract_house_numbers(s: str) -> set:
     if not s:
         return set()
@@ -275,6 +612,14 @@ def build_queries_adaptive(nama_in, alamat_in_raw, kec_in, city_context):
     Generate query sedikit tapi efektif (urut dari paling informatif ke fallback).
     Output list query unik, max 4-5.
     """
+    return [q for _, q in build_query_variants(nama_in, alamat_in_raw, kec_in, city_context)]
+
+def build_query_variants(nama_in, alamat_in_raw, kec_in, city_context):
+    """
+    Sama dengan build_queries_adaptive, tapi tiap query diberi nama varian
+    (full / nama_kec / alamat_nama / nama_kota) untuk planner query.
+    Return [(varian, query)].
+    """
     nama = clean_text(nama_in)
     kec = clean_text(kec_in)
     addr_compact = compact_addr_for_query(alamat_in_raw)
@@ -285,24 +630,24 @@ def build_queries_adaptive(nama_in, alamat_in_raw, kec_in, city_context):
     q = []
     # 1) Nama + alamat ringkas + kec + city
     if nama and addr_compact:
-        q.append(clean_text(f"{nama}, {addr_compact}{kec_part}, {city_context}"))
+        q.append(("full", clean_text(f"{nama}, {addr_compact}{kec_part}, {city_context}")))
 
     # 2) Nama + kec + city (sering cepat & cukup)
     if nama:
-        q.append(clean_text(f"{nama}{kec_part}, {city_context}"))
+        q.append(("nama_kec", clean_text(f"{nama}{kec_part}, {city_context}")))
 
     # 3) Alamat ringkas + nama (dibalik) (kadang ranking beda)
     if nama and addr_compact:
-        q.append(clean_text(f"{addr_compact}, {nama}{kec_part}, {city_context}"))
+        q.append(("alamat_nama", clean_text(f"{addr_compact}, {nama}{kec_part}, {city_context}")))
 
     # 4) Nama + city saja (fallback)
     if nama:
-        q.append(clean_text(f"{nama}, {city_context}"))
+        q.append(("nama_kota", clean_text(f"{nama}, {city_context}")))
 
     # unique & buang kosong
     seen = set()
     out = []
-    for item in q:
+    for variant, item in q:
         item = " ".join((item or "").split()).strip()
         if not item:
             continue
@@ -310,128 +655,16 @@ def build_queries_adaptive(nama_in, alamat_in_raw, kec_in, city_context):
         if key in seen:
             continue
         seen.add(key)
-        out.append(item)
+        out.append((variant, item))
 
     return out[:4]
 
 
-def normalize_addr(addr: str) -> str:
-    a = clean_text(addr)
-    a = _split_stuck_words(a)
-
-    a = re.sub(r"\bJl\.?\b", "Jalan", a, flags=re.I)
-    a = re.sub(r"\bJln\.?\b", "Jalan", a, flags=re.I)
-    a = re.sub(r"\bGg\.?\b", "Gang", a, flags=re.I)
-    a = re.sub(r"\bBr\.?\b", "Banjar", a, flags=re.I)
-    a = re.sub(r"\bDs\.?\b", "Desa", a, flags=re.I)
-    a = re.sub(r"\bKel\.?\b", "Kelurahan", a, flags=re.I)
-
-    a = re.sub(r"\s+", " ", a).strip()
-    return a
-
-STOP_WORDS = {
-    "jalan", "gang", "banjar", "br", "dk", "dusun",
-    "denpasar", "bali", "indonesia",
-    "kecamatan", "kec", "kelurahan", "kel", "desa", "rt", "rw",
-    "kota", "kab", "kabupaten", "prov", "provinsi",
-    "jl", "jln", "gg", "no", "nomor", "nmr",
-    "gn", "gunung",
-    "blok", "block", "lantai", "lt",
-    "komplek", "kompleks", "kompleksnya", "kompleksperum",
-    "perum", "perumahan",
-    "ruko", "kav", "kavling",
-    "km", "meter",
-    "ggg",
-}
-
-GENERIC_NAME = {
-    "warung", "toko", "ud", "cv", "pt", "resto", "restaurant", "cafe", "kedai", "depot",
-    "laundry", "salon", "barber", "bengkel", "apotek", "klinik", "clinic", "fotocopy", "foto",
-    "mart", "mini", "market", "shop", "store", "service", "jasa", "hasil",
-    "sewa", "kost", "kos", "kontrakan", "homestay", "guesthouse", "villa", "hotel"
-}
-
-NAME_STOP_EXTRA = {
-    "koperasi", "kpn", "ksp", "ksu", "kud", "lpd",
-    "yayasan", "perkumpulan", "asosiasi",
-    "serba", "usaha", "konsumen",
-}
-
-NAME_NOISE_PATTERNS = [
-    r"\(.*?\)",
-    r"\b(persero|tbk|t\.bk)\b",
-    r"\b(denpasar|bali|indonesia)\b",
-    r"\b(kantor|office|cabang|unit|pusat)\b.*$",
-    r"\b(pemerintah|pemkot|pemkab)\b.*$",
-]
-
-def normalize_name(s: str) -> str:
-    s = clean_text(s or "")
-    s = _split_stuck_words(s)
-    s = s.replace("&", " dan ")
-    s = re.sub(r"[/,_\-]+", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    low = s.lower()
-    for pat in NAME_NOISE_PATTERNS:
-        low = re.sub(pat, " ", low, flags=re.I)
-        low = re.sub(r"\s+", " ", low).strip()
-    return low.strip()
-
-def name_tokens2(s: str):
-    s = normalize_name(s)
-    s = re.sub(r"[^a-z0-9\s]", " ", s)
-    toks = [t for t in s.split() if len(t) >= 2]
-    out = set()
-    for t in toks:
-        if t in STOP_WORDS:
-            continue
-        if t in GENERIC_NAME:
-            continue
-        if t in NAME_STOP_EXTRA:
-            continue
-        out.add(t)
-    return out
-
-def addr_tokens(addr: str):
-    a = normalize_addr(addr or "").lower()
-    a = re.sub(r"[^a-z0-9\s]", " ", a)
-    raw = [t for t in a.split() if t]
-    out = set()
-    for t in raw:
-        if t in STOP_WORDS:
-            continue
-        if re.fullmatch(r"\d{1,4}", t):
-            out.add(t)
-            continue
-        if re.fullmatch(r"\d{1,4}[a-z]{1,2}", t):
-            out.add(t)
-            continue
-        if re.fullmatch(r"[a-z]{2,}", t):
-            out.add(t)
-            continue
-        if re.fullmatch(r"[ivxlcdm]{2,}", t):
-            out.add(t)
-            continue
-    return out
-
-def addr_alpha_tokens(addr: str):
-    a = normalize_addr(addr or "").lower()
-    a = re.sub(r"[^a-z0-9\s]", " ", a)
-    toks = [t for t in a.split() if t and t not in STOP_WORDS and len(t) >= 3]
-    return {t for t in toks if re.fullmatch(r"[a-z]{3,}", t)}
-
 def jaccard(a: set, b: set) -> float:
     if not a or not b:
         return 0.0
     return len(a & b) / max(1, len(a | b))
 
-def fuzzy_ratio(a: str, b: str) -> float:
-    a = (a or "").strip().lower()
-    b = (b or "").strip().lower()
-    if not a or not b:
-        return 0.0
-    return SequenceMatcher(None, a, b).ratio()
-
 def strip_loc_words(s: str) -> str:
     s = (s or "").lower()
     s = re.sub(r"[^a-z0-9\s]", " ", s)
@@ -494,12 +727,12 @@ def looks_like_query_echo(nama_detail: str, query_used: str, city_context: str)
         return False
 
     if c and c in n and n.count(",") >= 2:
-        if q and fuzzy_ratio(n, q) >= 0.78:
+        if q and fuzzy_at_least(n, q, 0.78):
             return True
         if q and (q[: max(12, int(len(q) * 0.55))] in n):
             return True
 
-    if q and fuzzy_ratio(n, q) >= 0.90:
+    if q and fuzzy_at_least(n, q, 0.90):
         return True
 
     return False
@@ -543,17 +776,18 @@ def is_generic_place_name(nama_g: str) -> bool:
         return True
     return False
 
-def coords_only_guard_ok(best_name: str, dbg: dict) -> bool:
-    if not dbg:
+def coords_only_guard_ok(best_name: str, dbg) -> bool:
+    # dbg: ScoreDebug kandidat terbaik (None kalau belum ada)
+    if dbg is None or dbg is EMPTY_DEBUG:
         return False
-    if dbg.get("is_echo"):
+    if dbg.is_echo:
         return False
-    if dbg.get("is_generic"):
+    if dbg.is_generic:
         return False
 
-    ov_name = int(dbg.get("ov_name", 0) or 0)
-    s_name = float(dbg.get("s_name", 0.0) or 0.0)
-    s_fuz = float(dbg.get("s_name_fuzzy", 0.0) or 0.0)
+    ov_name = dbg.ov_name
+    s_name = dbg.s_name
+    s_fuz = dbg.s_name_fuzzy
 
     return (ov_name >= 1) or (s_name >= 0.50) or (s_fuz >= 0.55)
 
@@ -561,8 +795,9 @@ def coords_only_guard_ok(best_name: str, dbg: dict) -> bool:
 # scoring helpers
 # =========================
 def containment_score(a: str, b: str) -> float:
-    a2 = normalize_name(a)
-    b2 = normalize_name(b)
+    return _containment_norm(normalize_name(a), normalize_name(b))
+
+def _containment_norm(a2: str, b2: str) -> float:
     if not a2 or not b2:
         return 0.0
     if a2 == b2:
@@ -571,60 +806,126 @@ def containment_score(a: str, b: str) -> float:
         return min(1.0, len(a2) / max(1, len(b2)))
     return 0.0
 
-def soft_token_overlap(a_set: set, b_set: set, sim_thr: float = 0.88) -> int:
-    if not a_set or not b_set:
-        return 0
-    b_list = list(b_set)
-    cnt = 0
-    for ta in a_set:
-        if ta in b_set:
-            cnt += 1
-            continue
-        best = 0.0
-        for tb in b_list:
-            r = SequenceMatcher(None, ta, tb).ratio()
-            if r > best:
-                best = r
-            if best >= sim_thr:
-                break
-        if best >= sim_thr:
-            cnt += 1
-    return cnt
-
-def soft_jaccard(a_set: set, b_set: set, sim_thr: float = 0.88) -> float:
-    if not a_set or not b_set:
-        return 0.0
-    inter = soft_token_overlap(a_set, b_set, sim_thr=sim_thr)
-    union = len(a_set) + len(b_set) - inter
-    return inter / max(1, union)
-
 # =========================
 # Scoring
 # =========================
-def score_candidate(nama_in, alamat_in, kec_in, nama_g, alamat_g, *, is_echo=False, is_generic=False):
-    n_in = name_tokens2(nama_in)
+class RowProfile:
+    """
+    Sisi input satu baris yang dipakai scoring, dihitung sekali lalu dipakai
+    untuk semua kandidat (quick-score list + detail) dan finalize.
+    """
+    __slots__ = (
+        "nama_in", "alamat_in", "kec_in", "kec_raw", "kec_low",
+        "n_in", "name_norm", "name_fuzzy", "abv",
+        "a_in", "a_in_alpha", "addr_in_weak",
+    )
+
+    def __init__(self, nama_in, alamat_in, kec_in):
+        self.nama_in = nama_in
+        self.alamat_in = alamat_in
+        self.kec_in = kec_in
+        self.kec_raw = (kec_in or "").strip()
+        self.kec_low = self.kec_raw.lower()
+
+        self.n_in = name_tokens2(nama_in)
+        self.name_norm = normalize_name(nama_in)
+        self.name_fuzzy = strip_loc_words(self.name_norm)
+        self.abv = abbrev_input(nama_in)
+
+        self.a_in = addr_tokens(alamat_in)
+        self.a_in_alpha = addr_alpha_tokens(alamat_in)
+        self.addr_in_weak = len(self.a_in) < 2
+
+class ScoreDebug:
+    """
+    Rincian skor satu kandidat (dulu dict dbg). Default semua nol/False,
+    jadi EMPTY_DEBUG bisa dipakai kalau belum ada kandidat sama sekali.
+    """
+    __slots__ = (
+        "s_name", "s_name_tok", "s_name_soft", "s_name_fuzzy", "s_name_cont", "s_abbrev",
+        "s_addr", "ov_addr", "ov_name", "kec_eff", "bonus", "penalty",
+        "addr_in_weak", "w_name", "w_addr", "abv", "acr_g",
+        "is_echo", "is_generic", "coords_only_boost",
+    )
+
+    def __init__(self):
+        self.s_name = self.s_name_tok = self.s_name_soft = self.s_name_fuzzy = 0.0
+        self.s_name_cont = self.s_abbrev = self.s_addr = 0.0
+        self.ov_addr = self.ov_name = 0
+        self.kec_eff = self.abv = self.acr_g = ""
+        self.bonus = self.penalty = self.w_name = self.w_addr = 0.0
+        self.addr_in_weak = self.is_echo = self.is_generic = self.coords_only_boost = False
+
+    def as_dict(self) -> dict:
+        # bentuk dict lama; coords_only_boost hanya muncul kalau diset
+        d = {k: getattr(self, k) for k in self.__slots__ if k != "coords_only_boost"}
+        if self.coords_only_boost:
+            d["coords_only_boost"] = True
+        return d
+
+EMPTY_DEBUG = ScoreDebug()
+
+class BestMatch:
+    """
+    Kandidat terbaik sejauh ini untuk satu baris (dulu dict best).
+    """
+    __slots__ = (
+        "score", "dbg", "nama", "alamat", "phone", "lat", "lon",
+        "is_closed", "closed_type", "source", "variant",
+    )
+
+    def __init__(self):
+        self.score = -1.0
+        self.dbg = None
+        self.nama = self.alamat = self.phone = None
+        self.lat = self.lon = None
+        self.is_closed = False
+        self.closed_type = None
+        self.source = None
+        self.variant = None   # varian query sumber kandidat ini (planner query)
+
+    def take(self, score, dbg, rec, source, variant=None):
+        # rec = record dari extract_place_record / cache place
+        self.score = score
+        self.dbg = dbg
+        self.nama = rec["nama"]
+        self.alamat = rec["alamat"]
+        self.phone = rec["phone"]
+        self.lat = rec["lat"]
+        self.lon = rec["lon"]
+        self.is_closed = rec["is_closed"]
+        self.closed_type = rec["closed_type"]
+        self.source = source
+        self.variant = variant
+
+def score_candidate_profile(prof, nama_g, alamat_g, *, is_echo=False, is_generic=False):
+    """
+    Sama dengan score_candidate, tapi sisi input diambil dari RowProfile.
+    Return (score, ScoreDebug).
+    """
+    n_in = prof.n_in
     n_g = name_tokens2(nama_g)
+    name_norm_g = normalize_name(nama_g)
 
     s_name_tok = jaccard(n_in, n_g)
     s_name_soft = soft_jaccard(n_in, n_g, sim_thr=0.88)
-    s_name_fuz = fuzzy_ratio(strip_loc_words(normalize_name(nama_in)), strip_loc_words(normalize_name(nama_g)))
-    s_name_cont = containment_score(nama_in, nama_g)
+    s_name_fuz = fuzzy_ratio(prof.name_fuzzy, strip_loc_words(name_norm_g))
+    s_name_cont = _containment_norm(prof.name_norm, name_norm_g)
 
-    abv = abbrev_input(nama_in)
+    abv = prof.abv
     acr_g = acronym_of_words(nama_g)
     s_abbrev = 1.0 if (abv and acr_g and abv == acr_g) else 0.0
 
     s_name = max(s_name_tok, s_name_soft, s_name_fuz, s_name_cont, s_abbrev)
     ov_name = soft_token_overlap(n_in, n_g, sim_thr=0.88)
 
-    a_in = addr_tokens(alamat_in)
+    a_in = prof.a_in
     a_g = addr_tokens(alamat_g)
     s_addr = jaccard(a_in, a_g)
     ov_addr = len(a_in & a_g)
 
     ag_low = (alamat_g or "").lower()
-    kec_raw = (kec_in or "").strip()
-    kec_eff = (kec_raw or extract_kec_from_gmaps(alamat_g)).strip().lower()
+    kec_eff = (prof.kec_raw or extract_kec_from_gmaps(alamat_g)).strip().lower()
 
     bonus = 0.0
     penalty = 0.0
@@ -662,7 +963,7 @@ def score_candidate(nama_in, alamat_in, kec_in, nama_g, alamat_g, *, is_echo=Fal
     if is_generic:
         penalty -= 0.18
 
-    addr_in_weak = len(a_in) < 2
+    addr_in_weak = prof.addr_in_weak
     if addr_in_weak:
         w_name, w_addr = 0.78, 0.22
     else:
@@ -674,7 +975,155 @@ def score_candidate(nama_in, alamat_in, kec_in, nama_g, alamat_g, *, is_echo=Fal
     score = (w_name * s_name) + (w_addr * s_addr) + bonus + penalty
     score = max(0.0, min(1.2, score))
 
-    dbg = {
+    dbg = ScoreDebug()
+    dbg.s_name = s_name
+    dbg.s_name_tok = s_name_tok
+    dbg.s_name_soft = s_name_soft
+    dbg.s_name_fuzzy = s_name_fuz
+    dbg.s_name_cont = s_name_cont
+    dbg.s_abbrev = s_abbrev
+    dbg.s_addr = s_addr
+    dbg.ov_addr = ov_addr
+    dbg.ov_name = ov_name
+    dbg.kec_eff = kec_eff
+    dbg.bonus = bonus
+    dbg.penalty = penalty
+    dbg.addr_in_weak = addr_in_weak
+    dbg.w_name = w_name
+    dbg.w_addr = w_addr
+    dbg.abv = abv
+    dbg.acr_g = acr_g
+    dbg.is_echo = is_echo
+    dbg.is_generic = is_generic
+    return score, dbg
+
+def score_candidate(nama_in, alamat_in, kec_in, nama_g, alamat_g, *, is_echo=False, is_generic=False):
+    # API lama (dbg berupa dict); loop utama pakai score_candidate_profile
+    score, dbg = score_candidate_profile(
+        RowProfile(nama_in, alamat_in, kec_in), nama_g, alamat_g,
+        is_echo=is_echo, is_generic=is_generic,
+    )
+    return score, dbg.as_dict()
+
+def score_record(prof, rec, query):
+    """
+    Skor satu place record (extract_place_record / cache) untuk query yang dipakai.
+    Kandidat tanpa kecocokan tapi punya coords dapat skor kecil (coords_only_boost).
+    """
+    nama_detail = rec["nama"] or ""
+    sc, dbg = score_candidate_profile(
+        prof,
+        nama_detail, rec["alamat"] or "",
+        is_echo=looks_like_query_echo(nama_detail, query, CITY_CONTEXT),
+        is_generic=is_generic_place_name(nama_detail),
+    )
+    if sc <= 0 and rec["lat"] is not None and rec["lon"] is not None:
+        sc = 0.12
+        dbg.coords_only_boost = True
+    return sc, dbg
+
+# =========================
+# Batch scoring (NumPy)
+# - Rumus sama dengan score_candidate_profile; bagian set token (jaccard nama/alamat,
+#   ov_addr) + bonus/penalty/bobot dihitung vektor untuk semua pasangan sekaligus
+# - Urutan operasi float sama dengan versi skalar, jadi skornya identik
+# - Fitur nama berbasis string (soft/fuzzy/containment/akronim, ov_name) tetap
+#   per kandidat lewat similarity.py (ter-memo)
+# =========================
+def _token_ids(sets, vocab):
+    owners, ids = [], []
+    for i, toks in enumerate(sets):
+        for t in toks:
+            ids.append(vocab.setdefault(t, len(vocab)))
+            owners.append(i)
+    return np.asarray(owners, dtype=np.int64), np.asarray(ids, dtype=np.int64)
+
+def _batch_jaccard(in_sets, row_ix, g_sets):
+    """
+    in_sets: token set per profil; g_sets: token set per pasangan; row_ix: profil tiap pasangan.
+    Return (jaccard, irisan) sebagai array.
+    """
+    vocab = {}
+    in_own, in_tok = _token_ids(in_sets, vocab)
+    g_own, g_tok = _token_ids(g_sets, vocab)
+    v = max(1, len(vocab))
+
+    in_keys = np.unique(in_own * v + in_tok)
+    hit = np.isin(row_ix[g_own] * v + g_tok, in_keys)
+    inter = np.bincount(g_own[hit], minlength=len(g_sets))
+
+    n_in = np.fromiter((len(t) for t in in_sets), dtype=np.int64, count=len(in_sets))[row_ix]
+    n_g = np.fromiter((len(t) for t in g_sets), dtype=np.int64, count=len(g_sets))
+    union = n_in + n_g - inter
+    jac = np.where((n_in > 0) & (n_g > 0), inter / np.maximum(1, union), 0.0)
+    return jac, inter
+
+def score_pairs_batch(profiles, row_ix, names, addrs, *, is_echo=None, is_generic=None) -> dict:
+    """
+    Skor banyak pasangan (profil, kandidat) sekaligus.
+    profiles: list RowProfile; row_ix: index profil untuk tiap kandidat;
+    names/addrs: nama & alamat gmaps per kandidat; is_echo/is_generic: list bool (default False).
+    Return {kolom: np.ndarray} berisi "score" + kolom ScoreDebug numerik.
+    """
+    n = len(names)
+    row_ix = np.asarray(row_ix, dtype=np.int64).reshape(n)
+    names = [nm or "" for nm in names]
+    addrs = [ad or "" for ad in addrs]
+    echo = np.zeros(n, dtype=bool) if is_echo is None else np.asarray(is_echo, dtype=bool)
+    gen = np.zeros(n, dtype=bool) if is_generic is None else np.asarray(is_generic, dtype=bool)
+    profs = [profiles[i] for i in row_ix.tolist()]
+
+    # --- sisi kandidat, sekali per nama unik: (token, nama normal, nama fuzzy, akronim)
+    by_name = {}
+    for nm in names:
+        if nm not in by_name:
+            nn = normalize_name(nm)
+            by_name[nm] = (name_tokens2(nm), nn, strip_loc_words(nn), acronym_of_words(nm))
+    g_feat = [by_name[nm] for nm in names]
+    n_g = [f[0] for f in g_feat]
+    a_g = [addr_tokens(ad) for ad in addrs]
+
+    # --- set token (vektor)
+    s_name_tok, _ = _batch_jaccard([p.n_in for p in profiles], row_ix, n_g)
+    s_addr, ov_addr = _batch_jaccard([p.a_in for p in profiles], row_ix, a_g)
+
+    # --- fitur nama berbasis string (per kandidat, ter-memo)
+    s_name_soft = np.array([soft_jaccard(p.n_in, t, sim_thr=0.88) for p, t in zip(profs, n_g)], dtype=float)
+    s_name_fuz = np.array([fuzzy_ratio(p.name_fuzzy, f[2]) for p, f in zip(profs, g_feat)], dtype=float)
+    s_name_cont = np.array([_containment_norm(p.name_norm, f[1]) for p, f in zip(profs, g_feat)], dtype=float)
+    s_abbrev = np.array([1.0 if (p.abv and p.abv == f[3]) else 0.0 for p, f in zip(profs, g_feat)], dtype=float)
+    ov_name = np.array([soft_token_overlap(p.n_in, t, sim_thr=0.88) for p, t in zip(profs, n_g)], dtype=np.int64)
+    s_name = np.maximum.reduce([s_name_tok, s_name_soft, s_name_fuz, s_name_cont, s_abbrev])
+
+    # --- flag alamat gmaps
+    ag_low = [ad.lower() for ad in addrs]
+    has_den = np.array(["denpasar" in a for a in ag_low], dtype=bool)
+    kec_eff = [(p.kec_raw or extract_kec_from_gmaps(ad)).strip().lower() for p, ad in zip(profs, addrs)]
+    has_kec = np.array([bool(k) for k in kec_eff], dtype=bool)
+    kec_hit = np.array([bool(k) and k in a for k, a in zip(kec_eff, ag_low)], dtype=bool)
+    addr_empty = np.array([not ad.strip() for ad in addrs], dtype=bool)
+    addr_in_weak = np.array([p.addr_in_weak for p in profs], dtype=bool)
+
+    # --- bonus/penalty (urutan penjumlahan sama dengan versi skalar)
+    bonus = np.zeros(n)
+    penalty = np.zeros(n)
+    bonus += np.where(has_den, 0.05, 0.0)
+    bonus += np.where(kec_hit, 0.06, 0.0)
+    penalty -= np.where(has_kec & ~kec_hit, 0.03, 0.0)
+    bonus += np.select([ov_addr >= 4, ov_addr == 3, ov_addr == 2, ov_addr == 1], [0.18, 0.14, 0.10, 0.05], 0.0)
+    bonus += np.select([ov_name >= 3, ov_name == 2, ov_name == 1], [0.09, 0.07, 0.03], 0.0)
+    penalty -= np.where(addr_empty, np.where(s_name >= 0.78, 0.08, 0.18), 0.0)
+    penalty -= np.where(echo, 0.35, 0.0)
+    penalty -= np.where(gen, 0.18, 0.0)
+
+    w_name = np.where(addr_in_weak, 0.78, np.where(s_name >= 0.75, 0.60, 0.35))
+    w_addr = np.where(addr_in_weak, 0.22, np.where(s_name >= 0.75, 0.40, 0.65))
+
+    score = (w_name * s_name) + (w_addr * s_addr) + bonus + penalty
+    score = np.clip(score, 0.0, 1.2)
+
+    return {
+        "score": score,
         "s_name": s_name,
         "s_name_tok": s_name_tok,
         "s_name_soft": s_name_soft,
@@ -684,44 +1133,131 @@ def score_candidate(nama_in, alamat_in, kec_in, nama_g, alamat_g, *, is_echo=Fal
         "s_addr": s_addr,
         "ov_addr": ov_addr,
         "ov_name": ov_name,
-        "kec_eff": kec_eff,
         "bonus": bonus,
         "penalty": penalty,
-        "addr_in_weak": addr_in_weak,
         "w_name": w_name,
         "w_addr": w_addr,
-        "abv": abv,
-        "acr_g": acr_g,
-        "is_echo": is_echo,
-        "is_generic": is_generic,
     }
-    return score, dbg
+
+def score_candidates_batch(prof, names, addrs, *, is_echo=None, is_generic=None) -> dict:
+    """
+    score_pairs_batch untuk satu RowProfile dan daftar kandidatnya.
+    """
+    return score_pairs_batch(
+        [prof], np.zeros(len(names), dtype=np.int64), names, addrs,
+        is_echo=is_echo, is_generic=is_generic,
+    )
+
+def quick_score_list_batch(prof, cands) -> list:
+    """
+    Versi batch quick_score_from_list_profile untuk raw_cands list mode.
+    Return list skor (float) sejajar dengan cands.
+    """
+    if not cands:
+        return []
+    names = [c.get("name_hint", "") or "" for c in cands]
+    subs = [c.get("sub_hint", "") or "" for c in cands]
+    res = score_candidates_batch(prof, names, subs, is_generic=[is_generic_place_name(nm) for nm in names])
+
+    low = [sb.lower() for sb in subs]
+    bonus = np.zeros(len(cands))
+    bonus += np.where([("denpasar" in l) for l in low], 0.04, 0.0)
+    if prof.kec_low:
+        bonus += np.where([(prof.kec_low in l) for l in low], 0.05, 0.0)
+    return np.clip(res["score"] + bonus, 0.0, 1.2).tolist()
 
 # =========================
 # Search helpers (paksa buka place)
 # =========================
 
-def should_early_stop(best, threshold, bbox=DENPASAR_BBOX):
-    if best["score"] < threshold:
+def should_early_stop(best, threshold, bbox=DENPASAR_BBOX, kec_in=""):
+    # best: BestMatch
+    if best.score < threshold:
         return False
-    lat, lon = best.get("lat"), best.get("lon")
+    lat, lon = best.lat, best.lon
     if lat is None or lon is None:
         return False
-    if not is_within_bbox(lat, lon, bbox=bbox):
+    if not in_city(lat, lon, bbox=bbox):
+        return False
+    if kec_conflict(kec_in, lat, lon):
         return False
-    dbg = best.get("dbg") or {}
-    if dbg.get("is_echo"):
+    dbg = best.dbg or EMPTY_DEBUG
+    if dbg.is_echo:
         return False
 
-    strong_name = (float(dbg.get("s_name", 0) or 0) >= 0.82) or (float(dbg.get("s_name_fuzzy", 0) or 0) >= 0.85)
-    strong_addr = (int(dbg.get("ov_addr", 0) or 0) >= 3) or (float(dbg.get("s_addr", 0) or 0) >= 0.28)
+    strong_name = (dbg.s_name >= 0.82) or (dbg.s_name_fuzzy >= 0.85)
+    strong_addr = (dbg.ov_addr >= 3) or (dbg.s_addr >= 0.28)
     return strong_name or strong_addr
 
 
+
+def candidate_stop_ok(best, prof) -> bool:
+    """
+    Kandidat terbaik sudah cukup untuk berhenti buka kandidat berikut:
+    skor >= THRESHOLD_EARLY_STOP, atau coords di kota/kecamatan input + nama/alamat kuat (bukan echo).
+    """
+    if best.score >= THRESHOLD_EARLY_STOP:
+        return True
+    if best.lat is None or best.lon is None:
+        return False
+    if not in_city(best.lat, best.lon) or kec_conflict(prof.kec_in, best.lat, best.lon):
+        return False
+    dbg = best.dbg or EMPTY_DEBUG
+    strong_name = (dbg.s_name >= 0.82) or (dbg.s_name_fuzzy >= 0.85)
+    strong_addr = (dbg.ov_addr >= 3) or (dbg.s_addr >= 0.28)
+    return (strong_name or strong_addr) and not dbg.is_echo
+
+# Satu execute_script untuk semua kandidat (ganti ~50-80 roundtrip WebDriver per list).
+# Logika sama dengan get_list_candidates_webdriver: aria-label = nama, teks card = sub hint.
+LIST_CANDIDATES_JS = r"""
+const limit = Math.max(arguments[0] || 1, 1);
+const skip = new Set(["hasil", "result", "results"]);
+const sels = ["div.W4Efsd", "div.W4Efsd span", "div.qBF1Pd", "div.fontBodyMedium"];
+const out = [];
+const links = Array.from(document.querySelectorAll("a.hfpxzc")).slice(0, limit);
+for (const a of links) {
+  const href = a.href || a.getAttribute("href") || "";
+  if (!href) continue;
+  const name = (a.getAttribute("aria-label") || "").trim();
+  let sub = "";
+  const card = a.closest("div[role*='article'], div[class*='Nv2PK']");
+  if (card) {
+    const texts = [];
+    for (const sel of sels) {
+      const els = Array.from(card.querySelectorAll(sel)).slice(0, 6);
+      for (const e of els) {
+        const t = (e.innerText || "").trim();
+        if (t && !skip.has(t.toLowerCase())) texts.push(t);
+      }
+    }
+    sub = Array.from(new Set(texts)).slice(0, 3).join(" | ").trim();
+  }
+  out.push({href: href, name_hint: name, sub_hint: sub});
+}
+return JSON.stringify(out);
+"""
+
+@timed("list_cands")
 def get_list_candidates_fast(driver, limit=12):
     """
     Ambil kandidat dari list mode tanpa klik/buka detail dulu.
     Return list of dict: {href, name_hint, sub_hint}
+    Semua kandidat diambil dalam satu execute_script; kalau gagal, fallback per elemen.
+    """
+    try:
+        raw = driver.execute_script(LIST_CANDIDATES_JS, int(limit))
+        cands = json.loads(raw or "[]")
+        return [
+            {"href": c.get("href"), "name_hint": c.get("name_hint") or "", "sub_hint": c.get("sub_hint") or ""}
+            for c in cands if c.get("href")
+        ]
+    except Exception:
+        return get_list_candidates_webdriver(driver, limit=limit)
+
+def get_list_candidates_webdriver(driver, limit=12):
+    """
+    Versi lama (per elemen via WebDriver), dipakai kalau execute_script gagal.
+    Return list of dict: {href, name_hint, sub_hint}
     """
     out = []
     try:
@@ -779,9 +1315,13 @@ def quick_score_from_list(nama_in, alamat_in, kec_in, cand_name, cand_sub):
     Scoring cepat berbasis hint list (nama + sub text).
     Ini bukan final, hanya untuk ranking top-k agar hemat waktu.
     """
+    sc, dbg = quick_score_from_list_profile(RowProfile(nama_in, alamat_in, kec_in), cand_name, cand_sub)
+    return sc, dbg.as_dict()
+
+def quick_score_from_list_profile(prof, cand_name, cand_sub):
     # anggap cand_sub sebagai “alamat kasar” (best-effort)
-    sc, dbg = score_candidate(
-        nama_in, alamat_in, kec_in,
+    sc, dbg = score_candidate_profile(
+        prof,
         cand_name or "", cand_sub or "",
         is_echo=False, is_generic=is_generic_place_name(cand_name or "")
     )
@@ -790,12 +1330,13 @@ def quick_score_from_list(nama_in, alamat_in, kec_in, cand_name, cand_sub):
     bonus = 0.0
     if "denpasar" in low:
         bonus += 0.04
-    if (kec_in or "").strip().lower() and (kec_in or "").strip().lower() in low:
+    if prof.kec_low and prof.kec_low in low:
         bonus += 0.05
 
     sc2 = max(0.0, min(1.2, sc + bonus))
     return sc2, dbg
 
+@timed("open_details")
 def force_open_place_details(driver, timeout=8) -> bool:
     try:
         u = (driver.current_url or "").lower()
@@ -803,7 +1344,8 @@ def force_open_place_details(driver, timeout=8) -> bool:
             return True
 
         if "/maps/search" in u:
-            WebDriverWait(driver, timeout).until(lambda d: len(d.find_elements(By.CSS_SELECTOR, "a.hfpxzc")) > 0)
+            if not wait_for(driver, "links", timeout):
+                return False
             a = driver.find_elements(By.CSS_SELECTOR, "a.hfpxzc")[0]
             href = a.get_attribute("href")
             if href:
@@ -814,40 +1356,37 @@ def force_open_place_details(driver, timeout=8) -> bool:
             wait_document_ready(driver, 12)
             click_consent_if_any(driver, timeout=1)
 
-            WebDriverWait(driver, timeout).until(
-                lambda d: ("/maps/place" in (d.current_url or "").lower()) or len(d.find_elements(By.XPATH, "//h1")) > 0
-            )
+            wait_for(driver, "place_or_h1", timeout)
             return "/maps/place" in (driver.current_url or "").lower()
 
-        WebDriverWait(driver, timeout).until(lambda d: len(d.find_elements(By.XPATH, "//h1")) > 0)
+        wait_for(driver, "h1", timeout)
         return "/maps/place" in (driver.current_url or "").lower()
 
     except Exception:
         return False
 
+def query_url(q: str) -> str:
+    return MAPS_BASE_URL + "/search/?api=1&query=" + quote_plus(q)
+
+@timed("query")
 def run_query_via_url(driver, query, timeout=18):
     q = " ".join(str(query).split()).strip()
     if not q:
         # penting: jangan lempar driver ke query kosong
         return ""
 
-    url = "https://www.google.com/maps/search/?api=1&query=" + quote_plus(q)
+    url = query_url(q)
 
-    driver.get(url)
+    pf = getattr(driver, "screp_prefetch", None)
+    if pf is None or not pf.take(q):
+        driver.get(url)
+    # (kalau take berhasil: halaman sudah di-load duluan di tab cadangan, tinggal dipakai)
     wait_document_ready(driver, 12)
     click_consent_if_any(driver, timeout=1)
 
-    def cond(d):
-        u = d.current_url or ""
-        if ("!3d" in u and "!4d" in u):
-            return True
-        if len(d.find_elements(By.CSS_SELECTOR, "a.hfpxzc")) > 0:
-            return True
-        if len(d.find_elements(By.XPATH, "//h1")) > 0:
-            return True
-        return False
-
-    WebDriverWait(driver, timeout).until(cond)
+    # URL place (!3d!4d) / list hasil (a.hfpxzc) / panel (h1)
+    if not wait_for(driver, "results", timeout):
+        raise TimeoutException(f"hasil query belum muncul setelah {timeout}s")
     return url
 
 def partial_match_detected(driver):
@@ -856,41 +1395,82 @@ def partial_match_detected(driver):
     except Exception:
         return False
 
+@timed("panel_wait")
 def wait_place_panel_ready(driver, timeout=8) -> bool:
-    end = time.time() + timeout
-    while time.time() < end:
-        try:
-            u = (driver.current_url or "").lower()
-            if "/maps/place" not in u:
-                time.sleep(0.15)
-                continue
+    # URL /maps/place + h1 (atau document.title "Nama - Google Maps") sudah berisi nama
+    try:
+        return wait_for(driver, "place", timeout)
+    except Exception:
+        return False
 
-            h1s = driver.find_elements(By.XPATH, "//h1")
-            for h in h1s[:2]:
-                try:
-                    t = (h.text or "").strip()
-                    if t and t.lower() not in {"hasil", "result", "results"}:
-                        return True
-                except Exception:
-                    pass
+# =========================
+# Snapshot panel place (satu execute_script untuk semua field)
+# =========================
+# Selector sama persis dengan extractor lama; pembersihan teks tetap di Python.
+PLACE_SNAPSHOT_JS = r"""
+const skip = new Set(["hasil", "result", "results"]);
+const txt = (e) => ((e && e.innerText) || "").trim();
+const aria = (e) => ((e && e.getAttribute("aria-label")) || "").trim();
+const all = (sel) => Array.from(document.querySelectorAll(sel));
+const snap = {url: location.href, doc_title: document.title || "", title: "", addr: [], phone: "", closed_text: ""};
+
+for (const h of all("h1").slice(0, 3)) {
+  const t = txt(h);
+  if (t && !skip.has(t.toLowerCase())) { snap.title = t; break; }
+}
 
-            t = (driver.title or "").strip()
-            if t and " - " in t:
-                base = t.split(" - ")[0].strip()
-                if base and base.lower() not in {"hasil", "result", "results"}:
-                    return True
-        except Exception:
-            pass
+// [teks, is_aria] urut sesuai strategi get_address lama
+for (const e of all("div.Io6YTe.fontBodyMedium.kR99db.fdkmkc")) snap.addr.push([txt(e), 0]);
+for (const e of all('[data-item-id*="address"]').slice(0, 6)) { snap.addr.push([txt(e), 0]); snap.addr.push([aria(e), 1]); }
+for (const e of all('[aria-label*="Alamat"], [aria-label*="Address"]').slice(0, 8)) snap.addr.push([aria(e), 1]);
 
-        time.sleep(0.2)
-    return False
+for (const b of all('button[aria-label*="Telepon"], button[aria-label*="telepon"], button[aria-label*="Phone"], button[aria-label*="phone"]')) {
+  const t = txt(b);
+  if (t) { snap.phone = t; break; }
+}
+
+const closedEls = [].concat(all("div.UGUb2e"), all("div.fontBodyMedium"), all("div.rogA2c"), all("div[role='main']"));
+snap.closed_text = closedEls.slice(0, 6).map(txt).filter(Boolean).join("\n");
+return JSON.stringify(snap);
+"""
 
-def get_place_title(driver, timeout=6):
+def get_place_snapshot(driver):
+    """
+    Ambil judul, kandidat alamat, telp, teks status tutup dan URL dalam satu roundtrip.
+    Return dict, atau None kalau execute_script gagal (caller pakai jalur lama).
+    """
     try:
-        wait_place_panel_ready(driver, timeout=timeout)
+        snap = json.loads(driver.execute_script(PLACE_SNAPSHOT_JS) or "{}")
+        return snap if isinstance(snap, dict) else None
     except Exception:
-        pass
+        return None
+
+def get_place_title(driver, timeout=6, snap=None):
+    """
+    snap: hasil get_place_snapshot (anggap panel sudah siap, jadi tidak menunggu lagi).
+    """
+    if snap is None:
+        try:
+            wait_place_panel_ready(driver, timeout=timeout)
+        except Exception:
+            pass
+        snap = get_place_snapshot(driver)
+        if snap is None:
+            return _get_place_title_webdriver(driver)
+
+    t = (snap.get("title") or "").strip()
+    if t and t.lower() not in {"hasil", "result", "results"}:
+        return t
+
+    t = (snap.get("doc_title") or "").strip()
+    if " - " in t:
+        t = t.split(" - ")[0].strip()
+    if t and t.lower() not in {"hasil", "result", "results"}:
+        return t
 
+    return ""
+
+def _get_place_title_webdriver(driver):
     try:
         h1s = driver.find_elements(By.XPATH, '//h1[contains(@class,"DUwDvf")] | //h1')
         for el in h1s[:3]:
@@ -923,7 +1503,25 @@ def _clean_gmaps_address_text(t: str) -> str:
     t = re.sub(r"\s+", " ", t).strip()
     return t
 
-def get_address(driver, timeout=2):
+def get_address(driver, timeout=2, snap=None):
+    if snap is None:
+        snap = get_place_snapshot(driver)
+        if snap is None:
+            return _get_address_webdriver(driver)
+
+    # fallback terakhir: page_source (berat, jadi hanya kalau semua selector kosong)
+    return address_from_snap(snap) or _address_from_page_source(driver)
+
+def address_from_snap(snap) -> str:
+    for t, is_aria in snap.get("addr") or []:
+        if is_aria:
+            t = re.sub(r"^(alamat|address)\s*:\s*", "", (t or "").strip(), flags=re.I).strip()
+        t = _clean_gmaps_address_text(t)
+        if t:
+            return t
+    return ""
+
+def _get_address_webdriver(driver):
     try:
         els = driver.find_elements(By.CSS_SELECTOR, "div.Io6YTe.fontBodyMedium.kR99db.fdkmkc")
         for e in els:
@@ -960,8 +1558,16 @@ def get_address(driver, timeout=2):
     except Exception:
         pass
 
+    return _address_from_page_source(driver)
+
+def _address_from_page_source(driver):
+    try:
+        return address_from_html(driver.page_source or "")
+    except Exception:
+        return ""
+
+def address_from_html(html: str) -> str:
     try:
-        html = driver.page_source or ""
         m = re.search(
             r'(Alamat|Address)\\u003c\\/span\\u003e\\s*\\u003cspan[^\\>]*\\u003e([^\\<]{10,200})\\u003c',
             html,
@@ -976,7 +1582,14 @@ def get_address(driver, timeout=2):
 
     return ""
 
-def get_phone(driver):
+def get_phone(driver, snap=None):
+    if snap is None:
+        snap = get_place_snapshot(driver)
+        if snap is None:
+            return _get_phone_webdriver(driver)
+    return (snap.get("phone") or "").strip() or None
+
+def _get_phone_webdriver(driver):
     try:
         btns = driver.find_elements(
             By.XPATH,
@@ -1006,7 +1619,28 @@ CLOSED_PATTERNS = [
     r"\bsecara permanen ditutup\b",
 ]
 
-def detect_closed_status(driver):
+def detect_closed_status(driver, snap=None):
+    if snap is None:
+        snap = get_place_snapshot(driver)
+        if snap is None:
+            return _detect_closed_status_webdriver(driver)
+    try:
+        text = ((snap.get("closed_text") or "").strip() or driver.page_source).lower()
+        return _closed_from_text(text)
+    except Exception:
+        return False, None
+
+def _closed_from_text(text: str):
+    for pat in CLOSED_PATTERNS:
+        if re.search(pat, text, flags=re.I):
+            if "temporary" in pat or "sementara" in pat:
+                return True, "temporary"
+            if "permanent" in pat or "permanen" in pat:
+                return True, "permanent"
+            return True, "unknown"
+    return False, None
+
+def _detect_closed_status_webdriver(driver):
     try:
         panel_text = ""
         candidates = []
@@ -1021,725 +1655,2613 @@ def detect_closed_status(driver):
                 panel_text += "\n" + t
 
         text = (panel_text.strip() or driver.page_source).lower()
-
-        for pat in CLOSED_PATTERNS:
-            if re.search(pat, text, flags=re.I):
-                if "temporary" in pat or "sementara" in pat:
-                    return True, "temporary"
-                if "permanent" in pat or "permanen" in pat:
-                    return True, "permanent"
-                return True, "unknown"
-        return False, None
+        return _closed_from_text(text)
     except Exception:
         return False, None
 
+DETAILS_WAIT_SEC = 0.6
+
+@timed("extract")
+def extract_place_record(driver, title_timeout=4) -> dict:
+    """
+    Ambil semua field place yang sedang terbuka (judul, alamat, telp, coords, tutup).
+    Return dict polos (bisa di-json-kan untuk cache).
+    """
+    try:
+        wait_place_panel_ready(driver, timeout=title_timeout)
+    except Exception:
+        pass
+
+    driver.execute_script("window.scrollBy(0, 300);")
+    # baris alamat biasanya sudah ada; beberapa place memang tanpa alamat -> batas pendek
+    wait_for(driver, "details", DETAILS_WAIT_SEC)
+
+    # satu snapshot untuk semua field; helper fallback sendiri kalau snapshot gagal
+    snap = get_place_snapshot(driver)
+
+    nama_detail = get_place_title(driver, timeout=title_timeout, snap=snap) or ""
+    if nama_detail.strip().lower() in {"hasil", "result", "results"}:
+        nama_detail = ""
+
+    alamat_detail = get_address(driver, timeout=2, snap=snap) or ""
+    phone = get_phone(driver, snap=snap)
+    cur_url = (snap or {}).get("url") or driver.current_url
+    lat, lon = parse_coords_from_url(cur_url)
+
+    is_closed, closed_type = detect_closed_status(driver, snap=snap)
+    return {
+        "nama": nama_detail,
+        "alamat": alamat_detail,
+        "phone": phone,
+        "lat": lat,
+        "lon": lon,
+        "is_closed": bool(is_closed),
+        "closed_type": closed_type,
+        "url": cur_url or "",
+    }
+
 # =========================
-# Output mapping
+# Kandidat list dibuka paralel di tab (SCREP_CAND_TABS=1, default)
+# - Semua kandidat top-k dibuka sekaligus di tab baru driver yang sama; navigasi
+#   tidak ditunggu (location.href via JS) jadi page load-nya jalan bersamaan
+# - Diekstrak berurutan sesuai ranking (keputusan stop dini sama dengan mode lama),
+#   tab lain tetap loading di belakang; tab kandidat ditutup di akhir
+# - Tab list tidak disentuh -> tidak ada lagi driver.get(last_search_url) per kandidat
 # =========================
-def apply_gc_fields(df, idx, status_kode, nama_usaha, alamat_usaha, lat, lon):
-    if status_kode == 99:
-        lat = None
-        lon = None
+def open_candidate_tabs(driver, hrefs) -> dict:
+    """
+    Buka tiap href di tab baru tanpa menunggu load. Return {href: handle}.
+    Window aktif kembali ke tab asal.
+    """
+    home = driver.current_window_handle
+    tabs = {}
+    try:
+        for href in hrefs:
+            if href in tabs:
+                continue
+            driver.switch_to.new_window("tab")
+            tabs[href] = driver.current_window_handle
+            if getattr(driver, "screp_profile", BROWSER_PROFILE) == "lean":
+                # blokir URL dipasang per tab (CDP target), sebelum navigasi
+                apply_lean_network_blocking(driver)
+            driver.execute_script("window.location.href = arguments[0];", href)
+    finally:
+        driver.switch_to.window(home)
+    return tabs
+
+@timed("cand_tab")
+def extract_candidate_tab(driver, handle) -> dict:
+    driver.switch_to.window(handle)
+    wait_document_ready(driver, 12)
+    click_consent_if_any(driver, timeout=1)
+    force_open_place_details(driver, timeout=6)
+    wait_place_panel_ready(driver, timeout=6)
+    return extract_place_record(driver, title_timeout=4)
 
-    latlong_status = "valid" if (lat is not None and lon is not None) else "invalid"
+def close_candidate_tabs(driver, tabs: dict, home):
+    for handle in tabs.values():
+        try:
+            driver.switch_to.window(handle)
+            driver.close()
+        except WebDriverException:
+            pass
+    driver.switch_to.window(home)
 
-    df.at[idx, "latitude"] = lat
-    df.at[idx, "longitude"] = lon
-    df.at[idx, "latlong_status"] = latlong_status
+# =========================
+# Prefetch lintas baris (SCREP_PREFETCH=1, default)
+# - Satu tab cadangan per driver: query pertama baris BERIKUTNYA mulai di-load
+#   (navigasi tidak ditunggu) begitu baris sekarang sudah memakai halaman
+#   prefetch-nya sendiri, jadi load berjalan selama ekstraksi/scoring/tulis hasil
+# - run_query_via_url untuk query yang sama cukup pindah ke tab itu; tab lama
+#   jadi cadangan berikutnya (tidak ada tab yang ditutup/dibuat per baris)
+# - Lookahead hanya 1 baris; dilewati kalau query sudah ada di cache;
+#   dibatalkan kalau baris itu terjawab tanpa browser atau STOP diminta
+# =========================
+class QueryPrefetcher:
+    def __init__(self, driver):
+        self.driver = driver
+        self.spare = None      # handle tab cadangan
+        self.query = None      # query yang sedang/sudah di-load di tab cadangan
+        self.next = None       # query baris berikut, menunggu tab cadangan bebas
+        self.plans = {}        # idx -> QueryPlan baris berikut (dipakai ulang process_row)
+        self.started = 0
+        self.hits = 0
+        self.cancelled = 0
+
+    def start(self, query):
+        q = " ".join(str(query or "").split()).strip()
+        if not q or q == self.query or query_cache_has(q):
+            return
+        driver = self.driver
+        home = driver.current_window_handle
+        try:
+            if self.spare is None:
+                driver.switch_to.new_window("tab")
+                self.spare = driver.current_window_handle
+                if getattr(driver, "screp_profile", BROWSER_PROFILE) == "lean":
+                    apply_lean_network_blocking(driver)
+            else:
+                driver.switch_to.window(self.spare)
+            driver.execute_script("window.location.href = arguments[0];", query_url(q))
+            self.query = q
+            self.started += 1
+        except WebDriverException as e:
+            print(f"⚠️ Prefetch dimatikan: {type(e).__name__}: {e}", flush=True)
+            self.spare = None
+            self.query = None
+            driver.screp_prefetch = None
+        finally:
+            driver.switch_to.window(home)
+
+    def start_row(self, idx, row):
+        """
+        Jadwalkan query pertama baris berikut. Langsung jalan kalau tab cadangan bebas;
+        kalau masih memegang prefetch baris sekarang, jalan setelah take() / flush().
+        Rencana query-nya disimpan supaya process_row baris itu memakai rencana yang sama.
+        """
+        self.next = None
+        if row is None or not row_needs_browser(row):
+            return
+        plan = row_plan(row)
+        self.plans[idx] = plan
+        while len(self.plans) > 2:   # baris sekarang + baris berikut
+            self.plans.pop(next(iter(self.plans)))
+        q = plan.first_query()
+        if self.query is None:
+            self.start(q)
+        else:
+            self.next = q
 
-    df.at[idx, "gcs_result"] = status_kode
-    df.at[idx, "latitude_gc"] = lat
-    df.at[idx, "longitude_gc"] = lon
-    df.at[idx, "latlong_status_gc"] = latlong_status
+    def flush(self):
+        # baris selesai: prefetch yang tidak terpakai ditimpa query berikut
+        if self.next is not None:
+            q, self.next = self.next, None
+            self.start(q)
 
-    df.at[idx, "nama_usaha_gc"] = nama_usaha
-    df.at[idx, "alamat_usaha_gc"] = alamat_usaha
+    def take(self, q) -> bool:
+        if self.query is None or q != self.query:
+            return False
+        home = self.driver.current_window_handle
+        self.driver.switch_to.window(self.spare)
+        self.spare = home
+        self.query = None
+        self.hits += 1
+        self.flush()
+        return True
 
-    df.at[idx, "hasilgc"] = status_kode
+    def cancel(self):
+        self.next = None
+        self.plans = {}
+        if self.query is None:
+            return
+        self.query = None
+        self.cancelled += 1
+        home = self.driver.current_window_handle
+        try:
+            self.driver.switch_to.window(self.spare)
+            self.driver.execute_script("window.stop(); window.location.href = 'about:blank';")
+        except WebDriverException:
+            pass
+        finally:
+            self.driver.switch_to.window(home)
+
+    def report(self):
+        if self.started:
+            print(
+                f"⏩ Prefetch query: {self.started} dimulai, {self.hits} terpakai, {self.cancelled} dibatalkan",
+                flush=True
+            )
+
+def attach_prefetcher(driver):
+    if not PREFETCH_ENABLED or driver is None:
+        return None
+    driver.screp_prefetch = QueryPrefetcher(driver)
+    return driver.screp_prefetch
 
 # =========================
-# MAIN
+# QUERY CACHE + PLACE CACHE (SQLite, dipakai ulang antar run)
 # =========================
-file_path = "test.xlsx"
-df = pd.read_excel(file_path)
+QUERY_CACHE_ENABLED = True
+QUERY_CACHE_FILE = "screp_cache.sqlite"       # satu file di folder script
+QUERY_CACHE_TTL_SEC = _env_int("SCREP_CACHE_TTL_SEC", 14 * 24 * 3600)  # hasil lebih tua dari ini dianggap basi
+QUERY_CACHE_MAX_ROWS = _env_int("SCREP_CACHE_MAX_ROWS", 50000)        # lewat dari ini -> buang yang paling lama tidak dipakai
+PLACE_CACHE_MAX_ROWS = _env_int("SCREP_PLACE_CACHE_MAX_ROWS", 100000)
 
-# FIX: pastikan kolom input yang dipakai memang ada
-input_cols = ["nama_usaha", "alamat_usaha", "nmkec"]
-for c in input_cols:
-    if c not in df.columns:
-        df[c] = ""
+def normalize_query_key(query: str) -> str:
+    return " ".join(str(query or "").split()).strip().lower()
 
-needed_cols = [
-    "nama_gmaps", "alamat_gmaps", "nomor_telepon",
-    "latitude", "longitude",
-    "keterangan", "score_match",
-    "status_bisnis", "status_kode", "status_tutup",
-    "latlong_status", "gcs_result", "latitude_gc", "longitude_gc", "latlong_status_gc",
-    "nama_usaha_gc", "alamat_usaha_gc", "hasilgc"
-]
-for col in needed_cols:
-    if col not in df.columns:
-        df[col] = pd.NA
+_FEATURE_ID_RE = re.compile(r"!1s(0x[0-9a-f]+:0x[0-9a-f]+)", re.I)
+_LATLON_PAIR_RE = re.compile(r"!3d(-?\d+(?:\.\d+)?)!4d(-?\d+(?:\.\d+)?)")
 
-# =========================
-# FIX KRUSIAL: paksa dtype kolom output (hindari float64 -> string error)
-# =========================
-TEXT_COLS = [
-    "nama_gmaps", "alamat_gmaps", "nomor_telepon",
-    "keterangan", "status_bisnis", "status_tutup",
-    "nama_usaha_gc", "alamat_usaha_gc", "latlong_status", "latlong_status_gc",
-]
-for c in TEXT_COLS:
-    df[c] = df[c].astype("string")
+def place_key_from_url(url: str) -> str:
+    """
+    Identitas stabil satu place dari href/URL Google Maps:
+    - feature id (!1s0x..:0x..) kalau ada
+    - kalau tidak, pasangan !3d!4d (dibulatkan 6 desimal)
+    Return "" kalau URL tidak bisa dikenali (misal /maps/search).
+    """
+    if not url:
+        return ""
+    m = _FEATURE_ID_RE.search(url)
+    if m:
+        return "fid:" + m.group(1).lower()
+    m = _LATLON_PAIR_RE.search(url)
+    if m:
+        lat, lon = _to_float(m.group(1)), _to_float(m.group(2))
+        if lat is not None and lon is not None:
+            return f"ll:{lat:.6f},{lon:.6f}"
+    return ""
 
-NUM_COLS = ["latitude", "longitude", "latitude_gc", "longitude_gc", "score_match"]
-for c in NUM_COLS:
-    df[c] = pd.to_numeric(df[c], errors="coerce")
+class SqliteCache:
+    """
+    Cache key -> payload json di SQLite (satu tabel per jenis cache).
+    TTL per entri + eviction LRU (last_access) kalau jumlah baris lewat max_rows.
+    Satu instance per proses (koneksi sqlite tidak dibagi antar worker).
+    """
 
-INT_COLS = ["status_kode", "gcs_result", "hasilgc"]
-for c in INT_COLS:
-    df[c] = pd.to_numeric(df[c], errors="coerce").astype("Int64")
-
-# === Chrome options ===
-options = webdriver.ChromeOptions()
-options.page_load_strategy = "eager"
-options.add_argument("--start-maximized")
-options.add_argument("--log-level=3")
-options.add_argument("--silent")
-options.add_experimental_option("excludeSwitches", ["enable-logging", "enable-automation"])
-options.add_argument("--disable-gpu")
-options.add_argument("--disable-software-rasterizer")
-options.add_argument("--disable-features=DirectComposition,UseSkiaRenderer")
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-dev-shm-usage")
-options.add_argument("--disable-notifications")
-options.add_argument("--disable-popup-blocking")
-options.add_argument("--lang=id-ID")
-
-prefs = {
-    "profile.managed_default_content_settings.images": 1,
-    "profile.default_content_setting_values.notifications": 2,
-    "profile.default_content_setting_values.geolocation": 2,
-}
-options.add_experimental_option("prefs", prefs)
+    def __init__(self, path, table="query_cache", ttl_sec=QUERY_CACHE_TTL_SEC, max_rows=QUERY_CACHE_MAX_ROWS):
+        self.path = path
+        self.table = table
+        self.ttl_sec = ttl_sec
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        try:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.Error:
+            pass
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " qkey TEXT PRIMARY KEY, payload TEXT NOT NULL,"
+            " created REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self.conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_access ON {table}(last_access)")
 
-options.add_argument(
-    "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-)
-options.add_experimental_option("useAutomationExtension", False)
+    def get(self, query):
+        key = normalize_query_key(query)
+        if not key:
+            return None
+        now = time.time()
+        row = self.conn.execute(f"SELECT payload, created FROM {self.table} WHERE qkey=?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        payload, created = row
+        if self.ttl_sec and (now - created) > self.ttl_sec:
+            self.conn.execute(f"DELETE FROM {self.table} WHERE qkey=?", (key,))
+            self.misses += 1
+            return None
+        self.conn.execute(f"UPDATE {self.table} SET last_access=? WHERE qkey=?", (now, key))
+        self.hits += 1
+        return json.loads(payload)
+
+    def contains(self, query) -> bool:
+        # cek ada & belum basi, tanpa efek samping (hit/miss, last_access, hapus entri basi)
+        key = normalize_query_key(query)
+        if not key:
+            return False
+        row = self.conn.execute(f"SELECT created FROM {self.table} WHERE qkey=?", (key,)).fetchone()
+        return row is not None and not (self.ttl_sec and (time.time() - row[0]) > self.ttl_sec)
 
-service = Service(ChromeDriverManager().install())
-log_fh = None
-try:
-    log_fh = open(os.devnull, "w")
-    service.log_output = log_fh
-except Exception:
-    pass
+    def put(self, query, payload: dict):
+        key = normalize_query_key(query)
+        if not key:
+            return
+        now = time.time()
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO {self.table}(qkey, payload, created, last_access) VALUES (?,?,?,?)",
+            (key, json.dumps(payload, ensure_ascii=False), now, now),
+        )
+        self._puts += 1
+        if self._puts % 100 == 1:
+            self.evict()
+
+    def evict(self):
+        if self.ttl_sec:
+            self.conn.execute(f"DELETE FROM {self.table} WHERE created < ?", (time.time() - self.ttl_sec,))
+        n = self.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        if self.max_rows and n > self.max_rows:
+            self.conn.execute(
+                f"DELETE FROM {self.table} WHERE qkey IN ("
+                f" SELECT qkey FROM {self.table} ORDER BY last_access ASC LIMIT ?)",
+                (n - self.max_rows,),
+            )
 
-driver = webdriver.Chrome(service=service, options=options)
-driver.implicitly_wait(0.4)
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
 
-MAX_CANDIDATES = 10
-THRESHOLD_OK = 0.45
-THRESHOLD_EARLY_STOP = 0.70
-CITY_CONTEXT = "Denpasar, Bali, Indonesia"
-MAX_RETRY = 0
+_caches = {}  # table -> SqliteCache (per proses)
 
-ALLOW_COORDS_ONLY_MATCH = True
+def get_cache(table: str):
+    if not QUERY_CACHE_ENABLED:
+        return None
+    cache = _caches.get(table)
+    if cache is None:
+        max_rows = PLACE_CACHE_MAX_ROWS if table == "place_cache" else QUERY_CACHE_MAX_ROWS
+        try:
+            cache = SqliteCache(QUERY_CACHE_FILE, table=table, max_rows=max_rows)
+        except Exception as e:
+            print(f"⚠️ Cache {table} tidak aktif: {e}", flush=True)
+            return None
+        _caches[table] = cache
+    return cache
 
-ensure_dir(SCREENSHOT_DIR)
+def query_cache_get(query):
+    qc = get_cache("query_cache")
+    if qc is None:
+        return None
+    try:
+        return qc.get(query)
+    except Exception:
+        return None
 
-try:
-    open_home(driver)
+def query_cache_has(query) -> bool:
+    qc = get_cache("query_cache")
+    if qc is None:
+        return False
+    try:
+        return qc.contains(query)
+    except Exception:
+        return False
 
-    _last_save_ts = time.time()
-    total_rows = len(df)
+def query_cache_put(query, payload: dict):
+    qc = get_cache("query_cache")
+    if qc is None:
+        return
+    try:
+        qc.put(query, payload)
+    except Exception:
+        pass
 
-    for idx, row in df.iterrows():
-        # ---- stop check (STOP.txt / Ctrl+C) ----
-        if should_stop():
-            print(f"\n🛑 Berhenti aman di baris {idx}/{total_rows}.", flush=True)
-            break
+def place_cache_get(url):
+    key = place_key_from_url(url)
+    pc = get_cache("place_cache") if key else None
+    if pc is None:
+        return None
+    try:
+        return pc.get(key)
+    except Exception:
+        return None
 
-        # ---- autosave check ----
-        now = time.time()
-        if (idx > 0 and idx % AUTOSAVE_EVERY_ROWS == 0) or ((now - _last_save_ts) >= AUTOSAVE_EVERY_SEC):
-            safe_save_excel(df, file_path, tag=f"(autosave row {idx})")
-            _last_save_ts = now
-
-        nama_usaha_raw = s_cell(row.get("nama_usaha"))
-        alamat_usaha_raw = s_cell(row.get("alamat_usaha"))
-        kec_in_raw = s_cell(row.get("nmkec"))
-
-        # kalau input nama kosong total, skip cepat (menghindari query aneh)
-        if not clean_text(nama_usaha_raw):
-            df.at[idx, "keterangan"] = "Skip: nama_usaha kosong"
-            df.at[idx, "status_bisnis"] = "Tidak ditemukan"
-            df.at[idx, "status_kode"] = 99
-            apply_gc_fields(df, idx, 99, nama_usaha_raw, alamat_usaha_raw, None, None)
+def place_cache_put(rec: dict, *urls):
+    """
+    Simpan record place di bawah semua identitas yang dikenali
+    (href kandidat + URL akhir setelah redirect biasanya beda bentuk).
+    """
+    if not rec or not any([rec.get("nama"), rec.get("alamat"), rec.get("lat"), rec.get("lon")]):
+        return
+    pc = get_cache("place_cache")
+    if pc is None:
+        return
+    keys = {place_key_from_url(u) for u in (*urls, rec.get("url"))}
+    for key in keys:
+        if not key:
             continue
+        try:
+            pc.put(key, rec)
+        except Exception:
+            pass
 
-        lat_existing = row.get("latitude")
-        lon_existing = row.get("longitude")
-        if pd.notnull(lat_existing) and pd.notnull(lon_existing):
-            apply_gc_fields(df, idx, 1, nama_usaha_raw, alamat_usaha_raw, float(lat_existing), float(lon_existing))
-            continue
+def close_caches():
+    for table, cache in list(_caches.items()):
+        total = cache.hits + cache.misses
+        if total:
+            print(f"⚡ Cache {table}: {cache.hits} hit / {cache.misses} miss ({cache.hits * 100.0 / total:.0f}% hit)", flush=True)
+        cache.close()
+    _caches.clear()
+    # statistik planner query ikut ditulis di sini (semua jalur run memanggil close_caches)
+    close_query_planner()
 
-        nama_in = clean_text(nama_usaha_raw)
-        alamat_in = normalize_addr(alamat_usaha_raw)
-        kec_in = clean_text(kec_in_raw)
-
-        # kec_part = f", {kec_in}" if kec_in.strip() else ""
-        # q_full = clean_text(f"{nama_in}, {alamat_in}{kec_part}, {CITY_CONTEXT}") if alamat_in.strip() else ""
-        # q_name = clean_text(f"{nama_in}{kec_part}, {CITY_CONTEXT}")
-        # queries = [q for q in [q_full, q_name] if q.strip()]
-
-        queries = build_queries_adaptive(nama_in, alamat_usaha_raw, kec_in, CITY_CONTEXT)
-        if not queries:
-            queries = [clean_text(f"{nama_in}, {CITY_CONTEXT}")]
-
-
-        print(f"\n🔍 Baris {idx} | mulai", flush=True)
-
-        best = {
-            "score": -1.0,
-            "dbg": None,
-            "nama": None,
-            "alamat": None,
-            "phone": None,
-            "lat": None,
-            "lon": None,
-            "is_closed": False,
-            "closed_type": None,
-            "source": None,
-        }
+# =========================
+# PLANNER QUERY (statistik varian per jenis baris, lihat queryplan.py)
+# =========================
+_planner = None  # QueryPlanner per proses; False = gagal dibuka (jangan coba lagi)
 
+def get_query_planner():
+    global _planner
+    if not PLANNER_ENABLED or _planner is False:
+        return None
+    if _planner is None:
         try:
-            # jika queries kosong (misal alamat kosong & city context somehow kosong) -> fallback minimal
-            if not queries:
-                queries = [clean_text(f"{nama_in}, {CITY_CONTEXT}")]
-
-            stop_queries = False
-            for q in queries:
-                if should_stop():
-                    print(f"\n🛑 Stop saat proses baris {idx}.", flush=True)
-                    break
+            _planner = QueryPlanner(QUERYPLAN_FILE)
+        except Exception as e:
+            print(f"⚠️ Planner query tidak aktif: {e}", flush=True)
+            _planner = False
+            return None
+    return _planner
 
-                print(f"   ▶ query: {q}", flush=True)
+def close_query_planner():
+    global _planner
+    if _planner:
+        _planner.report()
+        _planner.close()
+    _planner = None
 
-                last_search_url = None
-                for attempt in range(MAX_RETRY + 1):
-                    try:
-                        last_search_url = run_query_via_url(driver, q, timeout=18)
-                        force_open_place_details(driver, timeout=8)
-                        wait_place_panel_ready(driver, timeout=6)
-                        break
-                    except (StaleElementReferenceException, TimeoutException):
-                        if attempt == MAX_RETRY:
-                            raise
-                        open_home(driver)
-
-                if partial_match_detected(driver):
-                    print("   ⚠ partial match terdeteksi", flush=True)
-
-                cur_url = (driver.current_url or "")
-                cur_low = cur_url.lower()
-                in_place = ("/maps/place" in cur_low)
-
-                results_links = driver.find_elements(By.CSS_SELECTOR, "a.hfpxzc")
-
-                # A) DIRECT PLACE
-                if in_place:
-                    nama_detail = get_place_title(driver, timeout=4) or ""
-                    if nama_detail.strip().lower() in {"hasil", "result", "results"}:
-                        nama_detail = ""
-
-                    driver.execute_script("window.scrollBy(0, 300);")
-                    time.sleep(0.2)
-
-                    alamat_detail = get_address(driver, timeout=2) or ""
-                    phone = get_phone(driver)
-                    lat, lon = parse_coords_from_url(driver.current_url)
-
-                    if not nama_detail:
-                        t = (driver.title or "").strip()
-                        if " - " in t:
-                            t = t.split(" - ")[0].strip()
-                        if t.lower() not in {"hasil", "result", "results"}:
-                            nama_detail = t
-
-                    is_closed, closed_type = detect_closed_status(driver)
-                    is_echo = looks_like_query_echo(nama_detail or "", q, CITY_CONTEXT)
-                    is_gen = is_generic_place_name(nama_detail or "")
-
-                    sc, dbg = score_candidate(
-                        nama_in, alamat_in, kec_in,
-                        nama_detail or "", alamat_detail or "",
-                        is_echo=is_echo, is_generic=is_gen
-                    )
-
-                    if sc <= 0 and lat is not None and lon is not None:
-                        sc = 0.12
-                        dbg = dbg or {}
-                        dbg["coords_only_boost"] = True
-
-                    print(
-                        f"   • direct/place | score={sc:.2f} "
-                        f"(ov_addr={dbg.get('ov_addr',0)}, ov_name={dbg.get('ov_name',0)}, "
-                        f"s_name={dbg.get('s_name',0):.2f}, fuz={dbg.get('s_name_fuzzy',0):.2f}, "
-                        f"s_addr={dbg.get('s_addr',0):.2f}, echo={dbg.get('is_echo')}, gen={dbg.get('is_generic')}) "
-                        f"| url_latlon=({lat},{lon}) | nama={nama_detail} | alamat={alamat_detail}",
-                        flush=True
-                    )
-
-                    if any([nama_detail, alamat_detail, lat, lon]) and sc > best["score"]:
-                        best.update({
-                            "score": sc,
-                            "dbg": dbg,
-                            "nama": nama_detail,
-                            "alamat": alamat_detail,
-                            "phone": phone,
-                            "lat": lat,
-                            "lon": lon,
-                            "is_closed": is_closed,
-                            "closed_type": closed_type,
-                            "source": "direct/place",
-                        })
-                    if should_early_stop(best, THRESHOLD_EARLY_STOP):
-                        stop_queries = True
-                        break
-    
-
-                # B) LIST MODE
-                elif results_links:
-                    # 1) ambil kandidat banyak tapi tanpa buka detail
-                    raw_cands = get_list_candidates_fast(driver, limit=max(8, MAX_CANDIDATES))
-                    if not raw_cands:
-                        raw_cands = [{"href": a.get_attribute("href"), "name_hint": a.get_attribute("aria-label") or "", "sub_hint": ""} 
-                                    for a in results_links[:max(8, MAX_CANDIDATES)] if a.get_attribute("href")]
-
-                    # 2) quick-score untuk ranking top-k
-                    scored = []
-                    for c in raw_cands:
-                        qs, qdbg = quick_score_from_list(nama_in, alamat_in, kec_in, c.get("name_hint",""), c.get("sub_hint",""))
-                        scored.append((qs, c))
-                    scored.sort(key=lambda x: x[0], reverse=True)
-
-                    # 3) buka detail hanya top_k (hemat waktu)
-                    TOP_OPEN = 2  # <-- bisa 2 kalau mau lebih cepat
-                    to_open = scored[:TOP_OPEN]
+# =========================
+# Output mapping
+# =========================
+def apply_gc_fields(df, idx, status_kode, nama_usaha, alamat_usaha, lat, lon):
+    if status_kode == 99:
+        lat = None
+        lon = None
 
-                    for ci, (qs, c) in enumerate(to_open, start=1):
-                        if should_stop():
-                            print(f"\n🛑 Stop saat proses kandidat baris {idx}.", flush=True)
-                            break
+    latlong_status = "valid" if (lat is not None and lon is not None) else "invalid"
 
-                        href = c.get("href")
-                        if not href:
-                            continue
+    df.at[idx, "latitude"] = lat
+    df.at[idx, "longitude"] = lon
+    df.at[idx, "latlong_status"] = latlong_status
 
-                        # buka detail kandidat pilihan
-                        driver.get(href)
-                        wait_document_ready(driver, 12)
-                        click_consent_if_any(driver, timeout=1)
-                        force_open_place_details(driver, timeout=6)
-                        wait_place_panel_ready(driver, timeout=6)
-
-                        nama_detail = get_place_title(driver, timeout=4) or ""
-                        if nama_detail.strip().lower() in {"hasil", "result", "results"}:
-                            nama_detail = ""
-
-                        driver.execute_script("window.scrollBy(0, 300);")
-                        time.sleep(0.2)
-                        alamat_detail = get_address(driver, timeout=2) or ""
-                        phone = get_phone(driver)
-                        lat, lon = parse_coords_from_url(driver.current_url)
-
-                        is_closed, closed_type = detect_closed_status(driver)
-                        is_echo = looks_like_query_echo(nama_detail or "", q, CITY_CONTEXT)
-                        is_gen = is_generic_place_name(nama_detail or "")
-
-                        sc, dbg = score_candidate(
-                            nama_in, alamat_in, kec_in,
-                            nama_detail or "", alamat_detail or "",
-                            is_echo=is_echo, is_generic=is_gen
-                        )
+    df.at[idx, "gcs_result"] = status_kode
+    df.at[idx, "latitude_gc"] = lat
+    df.at[idx, "longitude_gc"] = lon
+    df.at[idx, "latlong_status_gc"] = latlong_status
 
-                        if sc <= 0 and lat is not None and lon is not None:
-                            sc = 0.12
-                            dbg = dbg or {}
-                            dbg["coords_only_boost"] = True
-
-                        print(
-                            f"   • cand#{ci} (pre={qs:.2f}) | score={sc:.2f} "
-                            f"(ov_addr={dbg.get('ov_addr',0)}, ov_name={dbg.get('ov_name',0)}, "
-                            f"s_name={dbg.get('s_name',0):.2f}, fuz={dbg.get('s_name_fuzzy',0):.2f}, "
-                            f"s_addr={dbg.get('s_addr',0):.2f}, echo={dbg.get('is_echo')}, gen={dbg.get('is_generic')}) "
-                            f"| latlon=({lat},{lon}) | nama={nama_detail} | alamat={alamat_detail}",
-                            flush=True
-                        )
+    df.at[idx, "nama_usaha_gc"] = nama_usaha
+    df.at[idx, "alamat_usaha_gc"] = alamat_usaha
 
-                        if any([nama_detail, alamat_detail, lat, lon]) and sc > best["score"]:
-                            best.update({
-                                "score": sc,
-                                "dbg": dbg,
-                                "nama": nama_detail,
-                                "alamat": alamat_detail,
-                                "phone": phone,
-                                "lat": lat,
-                                "lon": lon,
-                                "is_closed": is_closed,
-                                "closed_type": closed_type,
-                                "source": f"listTop#{ci}",
-                            })
+    df.at[idx, "hasilgc"] = status_kode
 
-                        # stop dini kalau sudah sangat meyakinkan + coords valid di Denpasar
-                        has_coords = (best["lat"] is not None and best["lon"] is not None)
-                        in_den = is_within_bbox(best["lat"], best["lon"]) if has_coords else False
-                        dbg_best = best.get("dbg") or {}
+def apply_row_result(df, idx, res):
+    """
+    Tulis hasil process_row ke df (hanya coordinator / loop utama yang boleh).
+    """
+    if not res:
+        return
+    for col, val in (res.get("fields") or {}).items():
+        df.at[idx, col] = val
+    if res.get("gc") is not None:
+        apply_gc_fields(df, idx, *res["gc"])
 
-                        strong_name = (
-                            float(dbg_best.get("s_name", 0.0) or 0.0) >= 0.82
-                            or float(dbg_best.get("s_name_fuzzy", 0.0) or 0.0) >= 0.85
-                        )
+# =========================
+# JOURNAL per baris (resume setelah crash / STOP.txt)
+# - <workbook>.journal.jsonl di sebelah file Excel, append-only
+# - tiap baris selesai: {"idx", "fp" (sidik jari kolom input), "res" (hasil process_row)}
+#   ditulis + fsync, jadi crash paling banyak kehilangan baris yang sedang diproses
+# - saat start: journal di-replay ke df, baris yang fp-nya cocok dilewati
+# - baris "Gagal diproses" (timeout/driver) tidak dicatat, jadi dicoba lagi
+# =========================
+JOURNAL_ENABLED = os.environ.get("SCREP_JOURNAL", "1").strip() != "0"
+JOURNAL_SUFFIX = ".journal.jsonl"
+JOURNAL_INPUT_COLS = ("nama_usaha", "alamat_usaha", "nmkec")  # kolom input yang tidak pernah ditimpa output
 
-                        strong_addr = (
-                            int(dbg_best.get("ov_addr", 0) or 0) >= 3
-                            or float(dbg_best.get("s_addr", 0.0) or 0.0) >= 0.28
-                        )
+def journal_path_for(file_path: str) -> str:
+    base, _ = os.path.splitext(file_path)
+    return base + JOURNAL_SUFFIX
 
-                        if best["score"] >= THRESHOLD_EARLY_STOP:
-                            break
+def _fingerprint(*values) -> str:
+    payload = "\x1f".join(s_cell(v) for v in values)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
 
-                        # ✅ tambahan: kalau sudah dapat coords Denpasar + (nama kuat atau alamat kuat), stop query berikutnya
-                        if has_coords and in_den and (strong_name or strong_addr) and not dbg_best.get("is_echo"):
-                            break
+def row_fingerprint(row) -> str:
+    return _fingerprint(*(row.get(c) for c in JOURNAL_INPUT_COLS))
 
+def _json_cell(v):
+    # pd.NA / NaN -> null, numpy scalar -> python
+    if v is None:
+        return None
+    try:
+        if pd.isna(v):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if hasattr(v, "item"):
+        return v.item()
+    return v
 
-                        # kembali ke search list kalau masih perlu kandidat berikut
-                        if last_search_url:
-                            driver.get(last_search_url)
-                            wait_document_ready(driver, 12)
-                            click_consent_if_any(driver, timeout=1)
+def row_result_final(res) -> bool:
+    return (res.get("fields") or {}).get("status_bisnis") != "Gagal diproses"
 
-                        if should_early_stop(best, THRESHOLD_EARLY_STOP):
-                            stop_queries = True
+class RowJournal:
+    """
+    Journal hasil per baris (JSONL). load() -> {idx: (fp, res)}, entri terakhir menang.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._fh = None
+        self._unsynced = False
+        self.appended = 0
+
+    def load(self) -> dict:
+        out = {}
+        if not os.path.exists(self.path):
+            return out
+        torn = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    e = json.loads(line)
+                    out[int(e["idx"])] = (e["fp"], e["res"])
+                except Exception:
+                    torn += 1  # baris terpotong (crash saat menulis)
+        if torn:
+            print(f"⚠️ Journal: {torn} baris rusak diabaikan ({self.path})", flush=True)
+        return out
+
+    def _open(self):
+        # kalau crash meninggalkan baris tanpa newline, mulai di baris baru
+        needs_nl = False
+        try:
+            if os.path.getsize(self.path) > 0:
+                with open(self.path, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    needs_nl = f.read(1) != b"\n"
+        except OSError:
+            pass
+        self._fh = open(self.path, "a", encoding="utf-8")
+        if needs_nl:
+            self._fh.write("\n")
+
+    def append(self, idx, fp: str, res: dict, sync: bool = True):
+        if self._fh is None:
+            self._open()
+        entry = {
+            "idx": int(idx),
+            "fp": fp,
+            "res": {
+                "fields": {k: _json_cell(v) for k, v in (res.get("fields") or {}).items()},
+                "gc": [_json_cell(v) for v in res["gc"]] if res.get("gc") is not None else None,
+            },
+        }
+        self._fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._fh.flush()
+        if sync:
+            os.fsync(self._fh.fileno())
+        self._unsynced = not sync
+        self.appended += 1
+
+    def close(self):
+        if self._fh is None:
+            return
+        try:
+            self._fh.flush()
+            if self._unsynced:
+                os.fsync(self._fh.fileno())
+        finally:
+            self._fh.close()
+            self._fh = None
+
+def replay_journal(df: pd.DataFrame, journal) -> set:
+    """
+    Terapkan hasil dari journal ke df. Return set idx yang sudah selesai.
+    Entri yang idx-nya tidak ada / input barisnya berubah diabaikan (baris diproses ulang).
+    """
+    if journal is None:
+        return set()
+    t0 = time.time()
+    entries = journal.load()
+    if not entries:
+        return set()
 
-                        if stop_queries:
-                            break
-    
+    done, _ = replay_entries(df, entries)
+    stale = len(entries) - len(done)  # fp beda atau idx di luar df
 
+    print(
+        f"♻️ Journal: {len(done)} baris selesai di-replay, {stale} diabaikan "
+        f"({time.time() - t0:.1f}s) <- {journal.path}",
+        flush=True
+    )
+    return done
 
-                # C) EMPTY FALLBACK
-                else:
-                    nama_detail = get_place_title(driver, timeout=3) or ""
-                    if nama_detail.strip().lower() in {"hasil", "result", "results"}:
-                        nama_detail = ""
-
-                    driver.execute_script("window.scrollBy(0, 300);")
-                    time.sleep(0.2)
-                    alamat_detail = get_address(driver, timeout=2) or ""
-                    phone = get_phone(driver)
-                    lat, lon = parse_coords_from_url(driver.current_url)
-
-                    is_closed, closed_type = detect_closed_status(driver)
-                    is_echo = looks_like_query_echo(nama_detail or "", q, CITY_CONTEXT)
-                    is_gen = is_generic_place_name(nama_detail or "")
-
-                    sc, dbg = score_candidate(
-                        nama_in, alamat_in, kec_in,
-                        nama_detail or "", alamat_detail or "",
-                        is_echo=is_echo, is_generic=is_gen
-                    )
-
-                    if sc <= 0 and lat is not None and lon is not None:
-                        sc = 0.12
-                        dbg = dbg or {}
-                        dbg["coords_only_boost"] = True
-
-                    print(
-                        f"   • fallback/empty | score={sc:.2f} "
-                        f"(ov_addr={dbg.get('ov_addr',0)}, ov_name={dbg.get('ov_name',0)}, "
-                        f"s_name={dbg.get('s_name',0):.2f}, fuz={dbg.get('s_name_fuzzy',0):.2f}, "
-                        f"s_addr={dbg.get('s_addr',0):.2f}, echo={dbg.get('is_echo')}, gen={dbg.get('is_generic')}) "
-                        f"| latlon=({lat},{lon}) | nama={nama_detail} | alamat={alamat_detail}",
-                        flush=True
-                    )
-
-                    if any([nama_detail, alamat_detail, lat, lon]) and sc > best["score"]:
-                        best.update({
-                            "score": sc,
-                            "dbg": dbg,
-                            "nama": nama_detail,
-                            "alamat": alamat_detail,
-                            "phone": phone,
-                            "lat": lat,
-                            "lon": lon,
-                            "is_closed": is_closed,
-                            "closed_type": closed_type,
-                            "source": "fallback/empty",
-                        })
-
-                        
+def replay_entries(df: pd.DataFrame, entries: dict):
+    """
+    Terapkan entri journal {idx: (fp, res)} yang idx-nya ada di df.
+    Return (set idx selesai, jumlah entri yang fp-nya tidak cocok).
+    """
+    done = set()
+    stale = 0
+    fps = map(_fingerprint, *(df[c] for c in JOURNAL_INPUT_COLS))
+    for idx, fp in zip(df.index, fps):
+        entry = entries.get(idx)
+        if entry is None:
+            continue
+        if entry[0] != fp:
+            stale += 1
+            continue
+        apply_row_result(df, idx, entry[1])
+        done.add(idx)
+    return done, stale
 
-                        # stop dini kalau sudah sangat meyakinkan + coords valid di Denpasar
-                        has_coords = (best["lat"] is not None and best["lon"] is not None)
-                        in_den = is_within_bbox(best["lat"], best["lon"]) if has_coords else False
-                        dbg_best = best.get("dbg") or {}
+def journal_row(journal, idx, row, res, sync: bool = True):
+    if journal is None or not res or not row_result_final(res):
+        return
+    try:
+        journal.append(idx, row_fingerprint(row), res, sync=sync)
+    except Exception as e:
+        print(f"⚠️ Gagal tulis journal baris {idx}: {e}", flush=True)
 
-                        strong_name = (
-                            float(dbg_best.get("s_name", 0.0) or 0.0) >= 0.82
-                            or float(dbg_best.get("s_name_fuzzy", 0.0) or 0.0) >= 0.85
-                        )
+# =========================
+# MAIN: setting
+# =========================
+INPUT_FILE = os.environ.get("SCREP_INPUT", "") or "test.xlsx"  # .xlsx / .csv / .parquet
 
-                        strong_addr = (
-                            int(dbg_best.get("ov_addr", 0) or 0) >= 3
-                            or float(dbg_best.get("s_addr", 0.0) or 0.0) >= 0.28
-                        )
+# Streaming: input dibaca per chunk, hasil ditulis berurutan (untuk register sangat besar).
+# Otomatis untuk .csv/.parquet; untuk .xlsx nyalakan dengan SCREP_STREAM=1.
+STREAM_INPUT = os.environ.get("SCREP_STREAM", "0").strip() == "1"
+STREAM_CHUNK_ROWS = _env_int("SCREP_CHUNK_ROWS", 1000)
+STREAM_OUTPUT_FILE = os.environ.get("SCREP_OUTPUT", "")  # default: xlsx -> file input itu sendiri, lainnya -> <nama>_output.xlsx
 
-                        if best["score"] >= THRESHOLD_EARLY_STOP:
-                            break
+MAX_CANDIDATES = 10
+TOP_OPEN = _env_int("SCREP_TOP_OPEN", 2)  # kandidat list teratas yang dibuka detailnya
+CAND_TABS = os.environ.get("SCREP_CAND_TABS", "1").strip() != "0"  # buka kandidat paralel di tab (0 = berurutan di tab list)
+PREFETCH_ENABLED = os.environ.get("SCREP_PREFETCH", "1").strip() != "0"  # load query pertama baris berikutnya di tab cadangan
+PLANNER_ENABLED = os.environ.get("SCREP_PLANNER", "1").strip() != "0"    # urutan/penundaan varian query belajar dari run sebelumnya
+THRESHOLD_OK = 0.45
+THRESHOLD_EARLY_STOP = 0.70
+CITY_CONTEXT = "Denpasar, Bali, Indonesia"
+MAX_RETRY = 0
 
-                        # ✅ tambahan: kalau sudah dapat coords Denpasar + (nama kuat atau alamat kuat), stop query berikutnya
-                        if has_coords and in_den and (strong_name or strong_addr) and not dbg_best.get("is_echo"):
-                            break
+ALLOW_COORDS_ONLY_MATCH = True
 
-                        if should_early_stop(best, THRESHOLD_EARLY_STOP):
-                            stop_queries = True
-                            break
+# =========================
+# WORKER POOL (multi-Chrome)
+# =========================
+WORKERS = _env_int("SCREP_WORKERS", 1)  # jumlah Chrome paralel (1 = mode lama, satu browser)
+WORKER_QUEUE_DEPTH = 2                  # baris antre per worker (lookahead kecil saja)
+WORKER_START_STAGGER_SEC = 1.5          # jeda start antar Chrome biar tidak barengan
+WORKER_TASK_RETRIES = 1                 # baris milik worker/tab yang mati dicoba ulang N kali, lalu dilepas
+# Engine browser: "selenium" (default, chromedriver) atau "cdp" (asyncio DevTools, satu Chrome banyak tab)
+ENGINE = os.environ.get("SCREP_ENGINE", "selenium").strip().lower() or "selenium"
+CDP_TABS = _env_int("SCREP_CDP_TABS", 4)  # tab paralel di engine cdp
 
+TEXT_COLS = [
+    "nama_gmaps", "alamat_gmaps", "nomor_telepon",
+    "keterangan", "status_bisnis", "status_tutup",
+    "nama_usaha_gc", "alamat_usaha_gc", "latlong_status", "latlong_status_gc",
+]
+NUM_COLS = ["latitude", "longitude", "latitude_gc", "longitude_gc", "score_match"]
+INT_COLS = ["status_kode", "gcs_result", "hasilgc"]
 
-            # bila stop saat query loop, tetap simpan progres baris yg sudah ada
-            if should_stop():
-                print(f"\n🛑 Stop sebelum finalize scoring baris {idx}.", flush=True)
-                break
+def prepare_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    # FIX: pastikan kolom input yang dipakai memang ada
+    input_cols = ["nama_usaha", "alamat_usaha", "nmkec"]
+    for c in input_cols:
+        if c not in df.columns:
+            df[c] = ""
+
+    needed_cols = [
+        "nama_gmaps", "alamat_gmaps", "nomor_telepon",
+        "latitude", "longitude",
+        "keterangan", "score_match",
+        "status_bisnis", "status_kode", "status_tutup",
+        "latlong_status", "gcs_result", "latitude_gc", "longitude_gc", "latlong_status_gc",
+        "nama_usaha_gc", "alamat_usaha_gc", "hasilgc"
+    ]
+    for col in needed_cols:
+        if col not in df.columns:
+            df[col] = pd.NA
 
-            has_coords = (best["lat"] is not None and best["lon"] is not None)
-            in_denpasar = is_within_bbox(best["lat"], best["lon"]) if has_coords else False
+    # =========================
+    # FIX KRUSIAL: paksa dtype kolom output (hindari float64 -> string error)
+    # =========================
+    for c in TEXT_COLS:
+        df[c] = df[c].astype("string")
 
-            dbg = best.get("dbg") or {}
-            score_ok = best["score"] >= THRESHOLD_OK
+    for c in NUM_COLS:
+        df[c] = pd.to_numeric(df[c], errors="coerce")
 
-            echo_bad = bool(dbg.get("is_echo")) and not (best.get("alamat") or "").strip()
+    for c in INT_COLS:
+        df[c] = pd.to_numeric(df[c], errors="coerce").astype("Int64")
 
-            name_very_strong = (
-                float(dbg.get("s_name", 0.0) or 0.0) >= 0.78
-                or float(dbg.get("s_name_cont", 0.0) or 0.0) >= 0.70
-                or float(dbg.get("s_name_fuzzy", 0.0) or 0.0) >= 0.80
-            )
+    return df
 
-            name_signal_ok = (
-                int(dbg.get("ov_name", 0) or 0) >= 1
-                or float(dbg.get("s_name_fuzzy", 0.0) or 0.0) >= 0.55
-                or float(dbg.get("s_name", 0.0) or 0.0) >= 0.50
-            )
+# =========================
+# Chrome
+# =========================
+# "default" = Chrome tampil seperti biasa; "lean" = headless + blok tile/gambar/font/analytics
+BROWSER_PROFILE = os.environ.get("SCREP_BROWSER_PROFILE", "default").strip().lower() or "default"
+LEAN_WINDOW_SIZE = "1280,900"
+
+# Pola URL yang diblok di profil lean (Network.setBlockedURLs, wildcard *).
+# Scraper hanya baca DOM panel/list, jadi semua ini tidak pernah dipakai.
+LEAN_BLOCKED_URLS = [
+    # tile peta & citra satelit / street view
+    "*/maps/vt*", "*/kh/v=*", "*khms*.google.com/*", "*streetviewpixels*", "*geo*.ggpht.com/*",
+    # foto tempat & gambar umum
+    "*.googleusercontent.com/*", "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.ico",
+    # font
+    "*fonts.gstatic.com/*", "*fonts.googleapis.com/*", "*.woff", "*.woff2", "*.ttf",
+    # analytics / logging
+    "*google-analytics.com/*", "*googletagmanager.com/*", "*doubleclick.net/*",
+    "*/gen_204*", "*/log?*", "*play.google.com/log*",
+]
 
-            alamat_g_ada = bool((best.get("alamat") or "").strip())
-            alamat_in_ada = bool((alamat_in or "").strip())
+def build_chrome_options(profile=None, perf_log=False):
+    profile = (profile or BROWSER_PROFILE).lower()
+    lean = profile == "lean"
+
+    options = webdriver.ChromeOptions()
+    options.page_load_strategy = "eager"
+    if lean:
+        options.add_argument("--headless=new")
+        options.add_argument(f"--window-size={LEAN_WINDOW_SIZE}")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--mute-audio")
+        options.add_argument("--disable-extensions")
+    else:
+        options.add_argument("--start-maximized")
+    options.add_argument("--log-level=3")
+    options.add_argument("--silent")
+    options.add_experimental_option("excludeSwitches", ["enable-logging", "enable-automation"])
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-software-rasterizer")
+    options.add_argument("--disable-features=DirectComposition,UseSkiaRenderer")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-notifications")
+    options.add_argument("--disable-popup-blocking")
+    # tab kandidat di belakang tetap render/jalan timer-nya (tidak di-throttle Chrome)
+    options.add_argument("--disable-background-timer-throttling")
+    options.add_argument("--disable-renderer-backgrounding")
+    options.add_argument("--disable-backgrounding-occluded-windows")
+    options.add_argument("--lang=id-ID")
+
+    prefs = {
+        "profile.managed_default_content_settings.images": 2 if lean else 1,
+        "profile.default_content_setting_values.notifications": 2,
+        "profile.default_content_setting_values.geolocation": 2,
+    }
+    options.add_experimental_option("prefs", prefs)
 
-            if has_coords and not in_denpasar:
-                status_bisnis = f"Di luar Denpasar (lat={best['lat']}, lon={best['lon']})"
-                status_kode = 0
-                status_tutup = pd.NA
-                lat_out = best["lat"]
-                lon_out = best["lon"]
+    options.add_argument(
+        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    )
+    options.add_experimental_option("useAutomationExtension", False)
+    if perf_log:
+        # dipakai bench untuk hitung byte transfer dari event Network.*
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
 
-            elif (not has_coords) and best["score"] < 0:
-                status_bisnis = "Tidak ditemukan"
-                status_kode = 99
-                status_tutup = pd.NA
-                lat_out = None
-                lon_out = None
+def apply_lean_network_blocking(driver):
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+        return True
+    except Exception as e:
+        print(f"⚠️ Gagal pasang blokir URL (lean): {e}", flush=True)
+        return False
 
-            elif echo_bad:
-                status_bisnis = f"Tidak ditemukan (echo_query, score={best['score']:.2f})"
-                status_kode = 99
-                status_tutup = pd.NA
-                lat_out = None
-                lon_out = None
+def resolve_chromedriver_path() -> str:
+    # cukup sekali di proses utama (worker jangan download barengan)
+    # PC offline: set SCREP_CHROMEDRIVER=path\chromedriver.exe (tanpa download)
+    path = os.environ.get("SCREP_CHROMEDRIVER", "").strip()
+    if path:
+        return path
+    return ChromeDriverManager().install()
+
+def build_driver(driver_path=None, profile=None, perf_log=False):
+    """
+    Start satu Chrome. Return (driver, log_fh); tutup dengan close_driver().
+    profile: "default" / "lean" (default ambil dari BROWSER_PROFILE).
+    """
+    profile = (profile or BROWSER_PROFILE).lower()
+    service = Service(driver_path or resolve_chromedriver_path())
+    log_fh = None
+    try:
+        log_fh = open(os.devnull, "w")
+        service.log_output = log_fh
+    except Exception:
+        pass
 
-            elif best["is_closed"] and has_coords and in_denpasar and (score_ok or name_very_strong):
-                status_bisnis = "Tutup"
-                status_kode = 3
-                status_tutup = best["closed_type"] or "unknown"
-                lat_out = best["lat"]
-                lon_out = best["lon"]
+    driver = webdriver.Chrome(service=service, options=build_chrome_options(profile, perf_log=perf_log))
+    # semua tunggu eksplisit (wait_for); find_elements yang kosong langsung kembali
+    driver.implicitly_wait(0)
+    driver.set_script_timeout(60)
+    driver.screp_profile = profile  # dibaca open_candidate_tabs (blokir URL per tab baru)
+    if profile == "lean":
+        apply_lean_network_blocking(driver)
+    return driver, log_fh
 
-            elif has_coords and in_denpasar and not dbg.get("is_echo") and (score_ok or name_very_strong):
-                # ===== hitung sinyal alamat sekali, dipakai untuk generic & non-generic =====
-                ov_addr = int(dbg.get("ov_addr", 0) or 0)
-                s_addr = float(dbg.get("s_addr", 0.0) or 0.0)
+def close_driver(driver, log_fh=None):
+    try:
+        if driver is not None:
+            driver.quit()
+    except Exception:
+        pass
+    try:
+        if log_fh:
+            log_fh.close()
+    except Exception:
+        pass
 
-                a_in_alpha = addr_alpha_tokens(alamat_in)
-                a_g_alpha = addr_alpha_tokens(best.get("alamat") or "")
-                alpha_overlap = len(a_in_alpha & a_g_alpha)
+# =========================
+# Proses satu baris (query -> score -> decide)
+# =========================
+def finalize_decision(prof, best, alamat_in, kec_in):
+    """
+    Pohon keputusan akhir satu baris dari kandidat terbaik (tanpa browser/df).
+    Return (status_bisnis, status_kode, status_tutup, lat_out, lon_out, in_denpasar).
+    """
+    has_coords = (best.lat is not None and best.lon is not None)
+    in_denpasar = in_city(best.lat, best.lon) if has_coords else False
 
-                strong_addr = (ov_addr >= 3) or (s_addr >= 0.35) or (alpha_overlap >= 1)
+    dbg = best.dbg or EMPTY_DEBUG
+    score_ok = best.score >= THRESHOLD_OK
 
-                # ===== default accept dulu (biar selalu ada assignment) =====
-                status_bisnis = "Ditemukan"
-                status_kode = 1
-                status_tutup = pd.NA
-                lat_out = best["lat"]
-                lon_out = best["lon"]
-
-                # ===== guard untuk nama generik yang lemah DAN alamat juga lemah =====
-                if dbg.get("is_generic") and (not name_signal_ok) and (not strong_addr):
-                    status_bisnis = f"Tidak ditemukan (nama_generik_lemah, score={best['score']:.2f})"
-                    status_kode = 99
-                    lat_out = None
-                    lon_out = None
-
-                # ===== jika alamat input & alamat gmaps sama-sama ada, lakukan lock alamat =====
-                elif alamat_in_ada and alamat_g_ada:
-                    # kalau nama super kuat, boleh abaikan alamat
-                    if float(dbg.get("s_name", 0.0) or 0.0) >= 0.92 or float(dbg.get("s_name_fuzzy", 0.0) or 0.0) >= 0.92:
-                        status_bisnis = "Ditemukan (nama sangat kuat; alamat diabaikan)"
-                    else:
-                        addr_lock_ok = True
-                        if len(a_in_alpha) >= 2:
-                            addr_lock_ok = (alpha_overlap >= 1) or (ov_addr >= 2) or (s_addr >= 0.18)
-
-                        if not addr_lock_ok:
-                            # ===== KODE 2: nama kuat tapi alamat beda -> perlu dicek =====
-                            sname = float(dbg.get("s_name", 0.0) or 0.0)
-                            sfuz  = float(dbg.get("s_name_fuzzy", 0.0) or 0.0)
-
-                            # ambang "nama kuat" (silakan sesuaikan)
-                            name_strong_for_review = (sname >= 0.85) or (sfuz >= 0.85)
-
-                            if name_strong_for_review:
-                                status_bisnis = (
-                                    f"Perlu dicek (nama kuat; alamat beda) "
-                                    f"(score={best['score']:.2f}, alpha_overlap={alpha_overlap}, "
-                                    f"ov_addr={ov_addr}, s_addr={s_addr:.2f})"
-                                )
-                                status_kode = 2  # <-- KODE KHUSUS
-                                status_tutup = pd.NA
-                                lat_out = best["lat"]
-                                lon_out = best["lon"]
-                            else:
-                                status_bisnis = (
-                                    f"Tidak ditemukan (alamat_tidak_match, score={best['score']:.2f}, "
-                                    f"alpha_overlap={alpha_overlap}, ov_addr={ov_addr}, s_addr={s_addr:.2f})"
-                                )
-                                status_kode = 99
-                                lat_out = None
-                                lon_out = None
-
-
-                # ===== kalau salah satu alamat kosong, pakai nama sebagai sinyal =====
-                else:
-                    if name_signal_ok:
-                        status_bisnis = "Ditemukan (nama+coords; alamat_kosong)"
-                        status_kode = 1
-                        lat_out = best["lat"]
-                        lon_out = best["lon"]
+    echo_bad = bool(dbg.is_echo) and not (best.alamat or "").strip()
+
+    name_very_strong = (
+        dbg.s_name >= 0.78
+        or dbg.s_name_cont >= 0.70
+        or dbg.s_name_fuzzy >= 0.80
+    )
+
+    name_signal_ok = (
+        dbg.ov_name >= 1
+        or dbg.s_name_fuzzy >= 0.55
+        or dbg.s_name >= 0.50
+    )
+
+    alamat_g_ada = bool((best.alamat or "").strip())
+    alamat_in_ada = bool((alamat_in or "").strip())
+
+    if has_coords and not in_denpasar:
+        status_bisnis = f"Di luar Denpasar (lat={best.lat}, lon={best.lon})"
+        status_kode = 0
+        status_tutup = pd.NA
+        lat_out = best.lat
+        lon_out = best.lon
+
+    elif (not has_coords) and best.score < 0:
+        status_bisnis = "Tidak ditemukan"
+        status_kode = 99
+        status_tutup = pd.NA
+        lat_out = None
+        lon_out = None
+
+    elif echo_bad:
+        status_bisnis = f"Tidak ditemukan (echo_query, score={best.score:.2f})"
+        status_kode = 99
+        status_tutup = pd.NA
+        lat_out = None
+        lon_out = None
+
+    elif best.is_closed and has_coords and in_denpasar and (score_ok or name_very_strong):
+        status_bisnis = "Tutup"
+        status_kode = 3
+        status_tutup = best.closed_type or "unknown"
+        lat_out = best.lat
+        lon_out = best.lon
+
+    elif has_coords and in_denpasar and not dbg.is_echo and (score_ok or name_very_strong):
+        # ===== hitung sinyal alamat sekali, dipakai untuk generic & non-generic =====
+        ov_addr = dbg.ov_addr
+        s_addr = dbg.s_addr
+
+        a_in_alpha = prof.a_in_alpha
+        a_g_alpha = addr_alpha_tokens(best.alamat or "")
+        alpha_overlap = len(a_in_alpha & a_g_alpha)
+
+        strong_addr = (ov_addr >= 3) or (s_addr >= 0.35) or (alpha_overlap >= 1)
+
+        # ===== default accept dulu (biar selalu ada assignment) =====
+        status_bisnis = "Ditemukan"
+        status_kode = 1
+        status_tutup = pd.NA
+        lat_out = best.lat
+        lon_out = best.lon
+
+        # ===== guard untuk nama generik yang lemah DAN alamat juga lemah =====
+        if dbg.is_generic and (not name_signal_ok) and (not strong_addr):
+            status_bisnis = f"Tidak ditemukan (nama_generik_lemah, score={best.score:.2f})"
+            status_kode = 99
+            lat_out = None
+            lon_out = None
+
+        # ===== jika alamat input & alamat gmaps sama-sama ada, lakukan lock alamat =====
+        elif alamat_in_ada and alamat_g_ada:
+            # kalau nama super kuat, boleh abaikan alamat
+            if dbg.s_name >= 0.92 or dbg.s_name_fuzzy >= 0.92:
+                status_bisnis = "Ditemukan (nama sangat kuat; alamat diabaikan)"
+            else:
+                addr_lock_ok = True
+                if len(a_in_alpha) >= 2:
+                    addr_lock_ok = (alpha_overlap >= 1) or (ov_addr >= 2) or (s_addr >= 0.18)
+
+                if not addr_lock_ok:
+                    # ===== KODE 2: nama kuat tapi alamat beda -> perlu dicek =====
+                    sname = dbg.s_name
+                    sfuz  = dbg.s_name_fuzzy
+
+                    # ambang "nama kuat" (silakan sesuaikan)
+                    name_strong_for_review = (sname >= 0.85) or (sfuz >= 0.85)
+
+                    if name_strong_for_review:
+                        status_bisnis = (
+                            f"Perlu dicek (nama kuat; alamat beda) "
+                            f"(score={best.score:.2f}, alpha_overlap={alpha_overlap}, "
+                            f"ov_addr={ov_addr}, s_addr={s_addr:.2f})"
+                        )
+                        status_kode = 2  # <-- KODE KHUSUS
+                        status_tutup = pd.NA
+                        lat_out = best.lat
+                        lon_out = best.lon
                     else:
-                        status_bisnis = f"Tidak ditemukan (alamat_kosong & nama_lemah, score={best['score']:.2f})"
+                        status_bisnis = (
+                            f"Tidak ditemukan (alamat_tidak_match, score={best.score:.2f}, "
+                            f"alpha_overlap={alpha_overlap}, ov_addr={ov_addr}, s_addr={s_addr:.2f})"
+                        )
                         status_kode = 99
                         lat_out = None
                         lon_out = None
 
 
-
-                
-
-            elif ALLOW_COORDS_ONLY_MATCH and has_coords and in_denpasar:
-                # pakai guard function yang sudah ada (biar fungsi kepakai, tidak cuma definisi)
-                if coords_only_guard_ok(best.get("nama") or "", dbg):
-                    status_bisnis = "Ditemukan (coords-only)"
-                    status_kode = 5
-                    status_tutup = pd.NA
-                    lat_out = best["lat"]
-                    lon_out = best["lon"]
-                else:
-                    status_bisnis = (
-                        f"Tidak ditemukan (coords_only_ditolak, score={best['score']:.2f}, "
-                        f"echo={dbg.get('is_echo')}, gen={dbg.get('is_generic')}, "
-                        f"ov_name={dbg.get('ov_name',0)}, fuz={dbg.get('s_name_fuzzy',0.0):.2f})"
-                    )
-                    status_kode = 99
-                    status_tutup = pd.NA
-                    lat_out = None
-                    lon_out = None
-
+        # ===== kalau salah satu alamat kosong, pakai nama sebagai sinyal =====
+        else:
+            if name_signal_ok:
+                status_bisnis = "Ditemukan (nama+coords; alamat_kosong)"
+                status_kode = 1
+                lat_out = best.lat
+                lon_out = best.lon
             else:
-                status_bisnis = (
-                    f"Tidak ditemukan (score_kurang, score={best['score']:.2f}, "
-                    f"ov_addr={dbg.get('ov_addr',0)}, ov_name={dbg.get('ov_name',0)}, "
-                    f"s_addr={dbg.get('s_addr',0.0):.2f})"
-                )
+                status_bisnis = f"Tidak ditemukan (alamat_kosong & nama_lemah, score={best.score:.2f})"
                 status_kode = 99
-                status_tutup = best["closed_type"] if best["is_closed"] else pd.NA
                 lat_out = None
                 lon_out = None
 
-            # =========================
-            # SAFE ASSIGN (hindari dtype error)
-            # =========================
-            df.at[idx, "nama_gmaps"] = best["nama"] or ""
-            df.at[idx, "alamat_gmaps"] = best["alamat"] or ""
-            df.at[idx, "nomor_telepon"] = best["phone"] or ""
-            df.at[idx, "score_match"] = round(best["score"], 4) if best["score"] >= 0 else pd.NA
 
-            df.at[idx, "status_bisnis"] = status_bisnis or ""
-            df.at[idx, "status_kode"] = int(status_kode) if status_kode is not None else pd.NA
-            df.at[idx, "status_tutup"] = status_tutup if (status_tutup is not None and status_tutup is not pd.NA) else pd.NA
 
-            apply_gc_fields(df, idx, int(status_kode) if status_kode is not None else 99,
-                            nama_usaha_raw, alamat_usaha_raw, lat_out, lon_out)
 
-            print(
-                f"✅ Baris {idx} | best_score={best['score']:.2f} | source={best['source']} "
-                f"| best_latlon=({best['lat']},{best['lon']}) | in_denpasar={in_denpasar} "
-                f"| ov_addr={dbg.get('ov_addr',0)} ov_name={dbg.get('ov_name',0)} "
-                f"| kode={status_kode} | {status_bisnis}",
-                flush=True
+
+    elif ALLOW_COORDS_ONLY_MATCH and has_coords and in_denpasar:
+        # pakai guard function yang sudah ada (biar fungsi kepakai, tidak cuma definisi)
+        if coords_only_guard_ok(best.nama or "", dbg):
+            status_bisnis = "Ditemukan (coords-only)"
+            status_kode = 5
+            status_tutup = pd.NA
+            lat_out = best.lat
+            lon_out = best.lon
+        else:
+            status_bisnis = (
+                f"Tidak ditemukan (coords_only_ditolak, score={best.score:.2f}, "
+                f"echo={dbg.is_echo}, gen={dbg.is_generic}, "
+                f"ov_name={dbg.ov_name}, fuz={dbg.s_name_fuzzy:.2f})"
             )
+            status_kode = 99
+            status_tutup = pd.NA
+            lat_out = None
+            lon_out = None
 
-        except (TimeoutException, WebDriverException) as e:
-            df.at[idx, "keterangan"] = f"Gagal diproses (timeout/driver): {e}"
-            df.at[idx, "status_bisnis"] = "Gagal diproses"
-            df.at[idx, "status_kode"] = 99
-            apply_gc_fields(df, idx, 99, nama_usaha_raw, alamat_usaha_raw, None, None)
-            try:
-                driver.save_screenshot(os.path.join(SCREENSHOT_DIR, f"debug_row_{idx}.png"))
-            except Exception:
-                pass
-            try:
-                open_home(driver)
-            except Exception:
-                pass
-            continue
+    else:
+        status_bisnis = (
+            f"Tidak ditemukan (score_kurang, score={best.score:.2f}, "
+            f"ov_addr={dbg.ov_addr}, ov_name={dbg.ov_name}, "
+            f"s_addr={dbg.s_addr:.2f})"
+        )
+        status_kode = 99
+        status_tutup = best.closed_type if best.is_closed else pd.NA
+        lat_out = None
+        lon_out = None
+
+    # ===== titik di kecamatan lain dari nmkec input (hanya dengan GeoJSON) -> perlu dicek =====
+    if status_kode == 1 and kec_conflict(kec_in, lat_out, lon_out):
+        status_bisnis = (
+            f"Perlu dicek (kecamatan beda: input {kec_in}, titik {get_kec_index().kec_of(lat_out, lon_out)}) "
+            f"(score={best.score:.2f})"
+        )
+        status_kode = 2
 
-        except Exception as e:
-            df.at[idx, "keterangan"] = f"Gagal diproses: {e}"
-            df.at[idx, "status_bisnis"] = "Gagal diproses"
-            df.at[idx, "status_kode"] = 99
-            apply_gc_fields(df, idx, 99, nama_usaha_raw, alamat_usaha_raw, None, None)
-            try:
-                driver.save_screenshot(os.path.join(SCREENSHOT_DIR, f"debug_row_{idx}.png"))
-            except Exception:
-                pass
-            try:
-                open_home(driver)
-            except Exception:
-                pass
-            continue
+    return status_bisnis, status_kode, status_tutup, lat_out, lon_out, in_denpasar
 
-    # final save (aman)
-    safe_save_excel(df, file_path, tag="(final save)")
-    print(f"\n✅ Proses selesai! File disimpan kembali ke: {file_path}", flush=True)
+def row_quick_result(row):
+    """
+    Hasil baris yang tidak butuh browser (nama kosong / coords sudah ada), selain itu None.
+    """
+    nama_usaha_raw = s_cell(row.get("nama_usaha"))
+    alamat_usaha_raw = s_cell(row.get("alamat_usaha"))
+
+    # kalau input nama kosong total, skip cepat (menghindari query aneh)
+    if not clean_text(nama_usaha_raw):
+        res = {"fields": {}, "gc": None}
+        res["fields"]["keterangan"] = "Skip: nama_usaha kosong"
+        res["fields"]["status_bisnis"] = "Tidak ditemukan"
+        res["fields"]["status_kode"] = 99
+        res["gc"] = (99, nama_usaha_raw, alamat_usaha_raw, None, None)
+        return res
+
+    lat_existing = row.get("latitude")
+    lon_existing = row.get("longitude")
+    if pd.notnull(lat_existing) and pd.notnull(lon_existing):
+        return {"fields": {}, "gc": (1, nama_usaha_raw, alamat_usaha_raw, float(lat_existing), float(lon_existing))}
+    return None
+
+def apply_decision(res, best, status_bisnis, status_kode, status_tutup, lat_out, lon_out,
+                   nama_usaha_raw, alamat_usaha_raw):
+    # =========================
+    # SAFE ASSIGN (hindari dtype error)
+    # =========================
+    res["fields"]["nama_gmaps"] = best.nama or ""
+    res["fields"]["alamat_gmaps"] = best.alamat or ""
+    res["fields"]["nomor_telepon"] = best.phone or ""
+    res["fields"]["score_match"] = round(best.score, 4) if best.score >= 0 else pd.NA
+
+    res["fields"]["status_bisnis"] = status_bisnis or ""
+    res["fields"]["status_kode"] = int(status_kode) if status_kode is not None else pd.NA
+    res["fields"]["status_tutup"] = status_tutup if (status_tutup is not None and status_tutup is not pd.NA) else pd.NA
+
+    res["gc"] = (int(status_kode) if status_kode is not None else 99,
+                 nama_usaha_raw, alamat_usaha_raw, lat_out, lon_out)
+    return res
+
+# =========================
+# Alur satu baris, dipakai engine Selenium dan CDP
+# - row_search: query-walk planner, cache query/place, quick-score list, stop dini,
+#   finalize_decision; semua I/O browser lewat objek engine (SeleniumRowIO / CdpRowIO)
+# - Ditulis sebagai coroutine: CDP meng-await I/O sungguhan, I/O Selenium sinkron
+#   jadi coroutine-nya selesai dalam satu langkah (run_sync, tanpa event loop)
+# - Mode list ditentukan dari kandidat yang terbaca (raw_cands) di kedua engine
+# =========================
+def run_sync(coro):
+    """
+    Jalankan coroutine yang tidak pernah menunggu I/O async sampai selesai, di context pemanggil.
+    """
+    try:
+        coro.send(None)
+    except StopIteration as e:
+        return e.value
+    coro.close()
+    raise RuntimeError("coroutine menunggu I/O async di engine sinkron")
+
+def print_candidate(tag, label, sc, dbg, rec):
+    print(
+        f"   • {tag}{label} | score={sc:.2f} "
+        f"(ov_addr={dbg.ov_addr}, ov_name={dbg.ov_name}, "
+        f"s_name={dbg.s_name:.2f}, fuz={dbg.s_name_fuzzy:.2f}, "
+        f"s_addr={dbg.s_addr:.2f}, echo={dbg.is_echo}, gen={dbg.is_generic}) "
+        f"| latlon=({rec['lat']},{rec['lon']}) | nama={rec['nama']} | alamat={rec['alamat']}",
+        flush=True
+    )
+
+def rec_has_data(rec) -> bool:
+    return any([rec["nama"], rec["alamat"], rec["lat"], rec["lon"]])
+
+async def row_search(io, idx, row, plan):
+    """
+    Logika satu baris (setelah row_quick_result) dengan I/O browser dari io.
+    Return dict {"fields": ..., "gc": ...} atau None kalau stop diminta di tengah baris.
+    """
+    res = {"fields": {}, "gc": None}
+    tag = io.tag
+
+    nama_usaha_raw = s_cell(row.get("nama_usaha"))
+    alamat_usaha_raw = s_cell(row.get("alamat_usaha"))
+    kec_in_raw = s_cell(row.get("nmkec"))
+
+    nama_in = clean_text(nama_usaha_raw)
+    alamat_in = normalize_addr(alamat_usaha_raw)
+    kec_in = clean_text(kec_in_raw)
+
+    print(f"\n🔍 Baris {idx} | mulai", flush=True)
+    reset_row_wait()
+
+    # sisi input dihitung sekali per baris, dipakai semua kandidat
+    prof = RowProfile(nama_in, alamat_in, kec_in)
+    best = BestMatch()
+
+    try:
+        # planner: varian cadangan hanya dicoba kalau belum ada kandidat yang layak
+        stop_queries = False
+        for variant, q in plan.walk(lambda: plan_need_more(prof, best, alamat_in, kec_in)):
+            if should_stop():
+                print(f"\n🛑 Stop saat proses baris {idx}.", flush=True)
+                break
+
+            print(f"   ▶ {tag}query[{variant}]: {q}", flush=True)
+
+            cached = query_cache_get(q)
+            raw_cands = []
+            if cached is not None:
+                # cache hit: tidak perlu membuka browser sama sekali
+                print(f"   ⚡ {tag}cache hit ({cached.get('kind')})", flush=True)
+                in_place = cached.get("kind") == "place"
+                if cached.get("kind") == "list":
+                    raw_cands = cached.get("cands") or []
+                cur_url = ""
+            else:
+                cur_url = await io.query(q)
+                in_place = "/maps/place" in cur_url.lower()
+                if not in_place:
+                    raw_cands = await io.list_candidates(max(8, MAX_CANDIDATES))
+
+            # A) DIRECT PLACE
+            if in_place:
+                if cached is not None:
+                    rec = cached["place"]
+                else:
+                    rec = place_cache_get(cur_url) or await io.place_record(4)
+                    if rec_has_data(rec):
+                        query_cache_put(q, {"kind": "place", "place": rec})
+                        place_cache_put(rec, cur_url)
+
+                sc, dbg = score_record(prof, rec, q)
+                print_candidate(tag, "direct/place", sc, dbg, rec)
+
+                if rec_has_data(rec):
+                    take_candidate(best, plan, sc, dbg, rec, "direct/place", variant)
+                if should_early_stop(best, THRESHOLD_EARLY_STOP, kec_in=prof.kec_in):
+                    stop_queries = True
+                    break
+
+            # B) LIST MODE
+            elif raw_cands:
+                if cached is None:
+                    query_cache_put(q, {"kind": "list", "cands": raw_cands})
+
+                # quick-score untuk ranking top-k, detail hanya dibuka untuk top-k (hemat waktu)
+                with stage("quick_score"):
+                    scored = list(zip(quick_score_list_batch(prof, raw_cands), raw_cands))
+                scored.sort(key=lambda x: x[0], reverse=True)
+                to_open = scored[:TOP_OPEN]
+
+                # kandidat yang belum ada di place cache dibuka sekaligus (SCREP_CAND_TABS)
+                cached_recs = {c["href"]: place_cache_get(c["href"]) for _, c in to_open if c.get("href")}
+                await io.open_candidates([h for h, r in cached_recs.items() if r is None])
+
+                try:
+                    for ci, (qs, c) in enumerate(to_open, start=1):
+                        if should_stop():
+                            print(f"\n🛑 Stop saat proses kandidat baris {idx}.", flush=True)
+                            break
+
+                        href = c.get("href")
+                        if not href:
+                            continue
+
+                        # place yang sama sudah pernah dibuka (query/baris lain) -> skor langsung dari cache
+                        rec = cached_recs.get(href)
+                        if rec is not None:
+                            print(f"   ⚡ {tag}place cache hit cand#{ci}", flush=True)
+                        else:
+                            rec = await io.candidate(href, ci)
+                            if rec is None:
+                                continue  # kandidat ini gagal dibuka -> lewati, kandidat lain tetap dinilai
+                            place_cache_put(rec, href)
+
+                        sc, dbg = score_record(prof, rec, q)
+                        print_candidate(tag, f"cand#{ci} (pre={qs:.2f})", sc, dbg, rec)
+
+                        if rec_has_data(rec):
+                            take_candidate(best, plan, sc, dbg, rec, f"listTop#{ci}", variant)
+
+                        # stop dini kalau sudah sangat meyakinkan + coords valid di Denpasar
+                        if candidate_stop_ok(best, prof):
+                            break
+                        # (tidak perlu kembali ke halaman list: href kandidat sudah dipegang)
+                        if should_early_stop(best, THRESHOLD_EARLY_STOP, kec_in=prof.kec_in):
+                            stop_queries = True
+                        if stop_queries:
+                            break
+                finally:
+                    await io.close_candidates()
+
+            # C) EMPTY FALLBACK
+            else:
+                if cached is not None:
+                    rec = cached["place"]
+                else:
+                    rec = await io.place_record(3)
+                    if rec_has_data(rec):
+                        query_cache_put(q, {"kind": "empty", "place": rec})
+
+                sc, dbg = score_record(prof, rec, q)
+                print_candidate(tag, "fallback/empty", sc, dbg, rec)
+
+                if rec_has_data(rec):
+                    take_candidate(best, plan, sc, dbg, rec, "fallback/empty", variant)
+
+                    # stop dini kalau sudah sangat meyakinkan + coords valid di Denpasar
+                    if candidate_stop_ok(best, prof):
+                        break
+                    if should_early_stop(best, THRESHOLD_EARLY_STOP, kec_in=prof.kec_in):
+                        stop_queries = True
+                        break
+
+        # bila stop saat query loop, tetap simpan progres baris yg sudah ada
+        if should_stop():
+            print(f"\n🛑 Stop sebelum finalize scoring baris {idx}.", flush=True)
+            return None
+
+        status_bisnis, status_kode, status_tutup, lat_out, lon_out, in_denpasar = finalize_decision(
+            prof, best, alamat_in, kec_in
+        )
+        dbg = best.dbg or EMPTY_DEBUG
+
+        apply_decision(res, best, status_bisnis, status_kode, status_tutup, lat_out, lon_out,
+                       nama_usaha_raw, alamat_usaha_raw)
+        plan_record(plan, prof, alamat_in, kec_in)
+
+        print(
+            f"✅ Baris {idx} | best_score={best.score:.2f} | source={best.source} "
+            f"| best_latlon=({best.lat},{best.lon}) | in_denpasar={in_denpasar} "
+            f"| ov_addr={dbg.ov_addr} ov_name={dbg.ov_name} "
+            f"| kode={status_kode} | query={len(plan.tried)}/{plan.n_default} "
+            f"| wait={row_wait_sec():.2f}s | {status_bisnis}",
+            flush=True
+        )
+
+    except Exception as e:
+        res["fields"]["keterangan"] = io.failure_note(e)
+        res["fields"]["status_bisnis"] = "Gagal diproses"
+        res["fields"]["status_kode"] = 99
+        res["gc"] = (99, nama_usaha_raw, alamat_usaha_raw, None, None)
+        await io.recover(idx)
+        return res
+
+    return res
+
+class SeleniumRowIO:
+    """
+    I/O browser row_search untuk satu driver Selenium (semua method selesai tanpa menunggu).
+    """
+    tag = ""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.tabs = {}
+        self.home = None
+
+    async def query(self, q) -> str:
+        driver = self.driver
+        for attempt in range(MAX_RETRY + 1):
+            try:
+                run_query_via_url(driver, q, timeout=18)
+                force_open_place_details(driver, timeout=8)
+                wait_place_panel_ready(driver, timeout=6)
+                break
+            except (StaleElementReferenceException, TimeoutException):
+                if attempt == MAX_RETRY:
+                    raise
+                open_home(driver)
+
+        if partial_match_detected(driver):
+            print("   ⚠ partial match terdeteksi", flush=True)
+        return driver.current_url or ""
+
+    async def list_candidates(self, limit):
+        driver = self.driver
+        raw_cands = get_list_candidates_fast(driver, limit=limit)
+        if not raw_cands:
+            raw_cands = [{"href": a.get_attribute("href"), "name_hint": a.get_attribute("aria-label") or "", "sub_hint": ""}
+                         for a in driver.find_elements(By.CSS_SELECTOR, "a.hfpxzc")[:limit] if a.get_attribute("href")]
+        return raw_cands
+
+    async def place_record(self, title_timeout):
+        return extract_place_record(self.driver, title_timeout=title_timeout)
+
+    async def open_candidates(self, hrefs):
+        if not CAND_TABS:
+            return
+        self.home = self.driver.current_window_handle
+        with stage("cand_nav"):
+            self.tabs = open_candidate_tabs(self.driver, hrefs)
+
+    async def candidate(self, href, ci):
+        driver = self.driver
+        if href in self.tabs:
+            try:
+                return extract_candidate_tab(driver, self.tabs[href])
+            except (TimeoutException, WebDriverException) as e:
+                # satu tab kandidat gagal -> lewati; kalau tab list juga tidak bisa dipakai, driver-nya yang rusak
+                driver.switch_to.window(self.home)
+                print(f"   ⚠ cand#{ci} dilewati ({type(e).__name__}: {e})", flush=True)
+                return None
+
+        # buka detail kandidat di tab list (SCREP_CAND_TABS=0)
+        with stage("cand_nav"):
+            driver.get(href)
+            wait_document_ready(driver, 12)
+        click_consent_if_any(driver, timeout=1)
+        force_open_place_details(driver, timeout=6)
+        wait_place_panel_ready(driver, timeout=6)
+        return extract_place_record(driver, title_timeout=4)
+
+    async def close_candidates(self):
+        if self.tabs:
+            close_candidate_tabs(self.driver, self.tabs, self.home)
+        self.tabs = {}
+
+    def failure_note(self, e) -> str:
+        if isinstance(e, (TimeoutException, WebDriverException)):
+            return f"Gagal diproses (timeout/driver): {e}"
+        return f"Gagal diproses: {e}"
+
+    async def recover(self, idx):
+        try:
+            self.driver.save_screenshot(os.path.join(SCREENSHOT_DIR, f"debug_row_{idx}.png"))
+        except Exception:
+            pass
+        try:
+            open_home(self.driver)
+        except Exception:
+            pass
+
+def process_row(driver, idx, row):
+    """
+    Jalankan seluruh logika satu baris dengan driver yang diberikan.
+    row cukup mapping dengan key nama_usaha/alamat_usaha/nmkec/latitude/longitude.
+
+    Return dict {"fields": {kolom: nilai}, "gc": args apply_gc_fields}
+    atau None kalau stop diminta di tengah baris (baris tidak ditulis).
+    Tidak menyentuh df, jadi aman dipanggil dari proses worker.
+    """
+    quick = row_quick_result(row)
+    if quick is not None:
+        return quick
+    return run_sync(row_search(SeleniumRowIO(driver), idx, row, plan_for_row(driver, idx, row)))
+
+def run_row(driver, idx, row):
+    # process_row + durasi per tahap baris ini (res["stages"], dikumpulkan coordinator)
+    take_row_stages()
+    t0 = time.perf_counter()
+    res = process_row(driver, idx, row)
+    if res is not None:
+        res["stages"] = take_row_stages() + [("row", time.perf_counter() - t0)]
+    return res
+
+def finish_row(table, journal, idx, row, res, sync: bool = True):
+    # satu pintu untuk semua hasil baris: journal -> tabel -> metrik
+    stages = res.pop("stages", None)
+    journal_row(journal, idx, row, res, sync=sync)
+    table.apply(idx, res)
+    gc = res.get("gc")
+    METRICS.row_done(gc[0] if gc is not None else (res.get("fields") or {}).get("status_kode"), stages)
+
+def row_kind(nama_in, alamat_raw, kec_in) -> str:
+    # jenis baris untuk planner query: alamat ada/lemah/kosong, nama generik, kec ada
+    if not clean_text(alamat_raw):
+        alamat = "kosong"
+    elif len(addr_tokens(alamat_raw)) < 2:
+        alamat = "lemah"
+    else:
+        alamat = "ada"
+    return f"alamat={alamat}|generik={int(is_too_generic_name(nama_in))}|kec={int(bool(kec_in))}"
+
+def row_plan(row):
+    """
+    Rencana query process_row untuk satu baris (dipakai juga oleh prefetch).
+    Tanpa planner (SCREP_PLANNER=0): urutan bawaan build_query_variants, tanpa cadangan.
+    """
+    nama_in = clean_text(s_cell(row.get("nama_usaha")))
+    alamat_raw = s_cell(row.get("alamat_usaha"))
+    kec_in = clean_text(s_cell(row.get("nmkec")))
+    variants = build_query_variants(nama_in, alamat_raw, kec_in, CITY_CONTEXT)
+    if not variants:
+        variants = [("nama_kota", clean_text(f"{nama_in}, {CITY_CONTEXT}"))]
+    kind = row_kind(nama_in, alamat_raw, kec_in)
+    planner = get_query_planner()
+    return planner.plan(kind, variants) if planner is not None else QueryPlan(kind, variants)
+
+def plan_for_row(driver, idx, row):
+    # rencana yang sudah dibuat prefetch untuk baris ini dipakai ulang (planner cukup sekali per baris)
+    prefetch = getattr(driver, "screp_prefetch", None)
+    if prefetch is not None:
+        plan = prefetch.plans.pop(idx, None)
+        if plan is not None:
+            return plan
+    return row_plan(row)
+
+PLAN_ACCEPT_STATUS = (1, 3)  # keputusan akhir yang dihitung "diterima" oleh planner
+
+def take_candidate(best, plan, sc, dbg, rec, source, variant):
+    # kandidat valid: terbaik per varian (planner) + terbaik baris
+    plan.offer(variant, sc, (dbg, rec, source))
+    if sc > best.score:
+        best.take(sc, dbg, rec, source, variant)
+
+def plan_accepts(prof, best, alamat_in, kec_in) -> bool:
+    return finalize_decision(prof, best, alamat_in, kec_in)[1] in PLAN_ACCEPT_STATUS
+
+def plan_need_more(prof, best, alamat_in, kec_in) -> bool:
+    # cadangan dicoba kalau keputusan akhir dari kandidat terbaik sejauh ini belum diterima
+    # (skor tinggi tapi ditolak finalize_decision juga masih perlu fallback)
+    return not plan_accepts(prof, best, alamat_in, kec_in)
+
+def plan_record(plan, prof, alamat_in, kec_in):
+    # baris selesai: tiap varian yang dijalankan dinilai dari kandidat terbaiknya sendiri
+    planner = get_query_planner()
+    if planner is None:
+        return
+    won = set()
+    for variant, (sc, (dbg, rec, source)) in plan.top.items():
+        own = BestMatch()
+        own.take(sc, dbg, rec, source, variant)
+        if plan_accepts(prof, own, alamat_in, kec_in):
+            won.add(variant)
+    planner.record(plan, won)
+
+def row_task(row) -> dict:
+    # payload kecil untuk dikirim ke worker (hanya kolom input)
+    return {c: row.get(c) for c in ("nama_usaha", "alamat_usaha", "nmkec", "latitude", "longitude")}
+
+def row_needs_browser(row) -> bool:
+    # nama kosong / coords sudah ada -> process_row tidak menyentuh driver
+    if not clean_text(s_cell(row.get("nama_usaha"))):
+        return False
+    return not (pd.notnull(row.get("latitude")) and pd.notnull(row.get("longitude")))
+
+def autosave_due(rows_done: int, last_save_ts: float, journal=None, last_save_sec: float = 0.0) -> bool:
+    if journal is not None:
+        # baris sudah tercatat di journal -> xlsx penuh hanya sesekali (compact);
+        # jeda ikut lama save terakhir supaya total waktu tulis tetap kecil walau file membesar
+        gap = max(AUTOSAVE_COMPACT_EVERY_SEC, (last_save_sec or 0.0) / AUTOSAVE_COMPACT_MAX_SHARE)
+        return (time.time() - last_save_ts) >= gap
+    if rows_done > 0 and rows_done % AUTOSAVE_EVERY_ROWS == 0:
+        return True
+    return (time.time() - last_save_ts) >= AUTOSAVE_EVERY_SEC
+
+# =========================
+# Tabel kerja: sumber baris + tempat hasil
+# - FrameTable: seluruh workbook di memori (mode lama), checkpoint lewat CheckpointWriter
+# - StreamTable: input per chunk, hanya chunk yang barisnya masih diproses ada di memori;
+#   chunk yang sudah beres langsung ditulis (urut) ke xlsx streaming
+# Runner (run_sequential / run_worker_pool) cuma pakai: rows(), done, row(idx), hold(idx),
+# apply(idx, res), checkpoint(tag), last_save_sec, total, finish(), close()
+# =========================
+class FrameTable:
+    def __init__(self, df: pd.DataFrame, file_path: str, done=frozenset()):
+        self.df = df
+        self.file_path = file_path
+        self.done = done
+        self.total = len(df)
+        self._writer = CheckpointWriter(file_path)
+
+    def rows(self):
+        return self.df.iterrows()
+
+    def row(self, idx):
+        return self.df.loc[idx]
+
+    def hold(self, idx):
+        pass
+
+    def apply(self, idx, res):
+        apply_row_result(self.df, idx, res)
+
+    @property
+    def last_save_sec(self) -> float:
+        return self._writer.last_save_sec
+
+    def checkpoint(self, tag: str):
+        self._writer.submit(self.df, tag=tag)
+
+    def finish(self) -> str:
+        self._writer.submit(self.df, tag="(final save)")
+        self._writer.flush()
+        return self.file_path
+
+    def close(self):
+        self._writer.close()
+        self._writer.report()
+
+def stream_output_path(input_path: str) -> str:
+    if STREAM_OUTPUT_FILE:
+        return STREAM_OUTPUT_FILE
+    base, ext = os.path.splitext(input_path)
+    if ext.lower() in tableio.STREAM_EXCEL_EXT:
+        return input_path
+    return base + "_output.xlsx"
+
+class StreamTable:
+    """
+    Input dibaca per chunk (tableio), hasil ditulis berurutan ke xlsx write-only.
+    Baris yang sudah ada di journal di-replay per chunk saat chunk dibaca.
+    File output baru terganti saat finish() (tmp -> os.replace); sampai saat itu
+    journal yang menjaga hasil kalau proses mati.
+    """
+    def __init__(self, input_path: str, output_path: str, journal=None, chunk_rows: int = STREAM_CHUNK_ROWS):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.chunk_rows = chunk_rows
+        self.entries = journal.load() if journal is not None else {}
+        self.done = set()
+        self.total = None  # belum diketahui sampai input habis
+        self.last_save_sec = 0.0
+        self._chunks = collections.deque()  # [df, semua_baris_sudah_diambil]
+        self._held = set()                  # idx yang sedang di worker
+        self._out = tableio.StreamingXlsxWriter(output_path)
+        self._iter = self._gen()
+        self._finished = False
+
+    def _gen(self):
+        for chunk in tableio.iter_input_chunks(self.input_path, self.chunk_rows):
+            chunk = prepare_dataframe(chunk)
+            if self.entries:
+                done, _ = replay_entries(chunk, self.entries)
+                self.done |= done
+            entry = [chunk, False]
+            self._chunks.append(entry)
+            for idx, row in chunk.iterrows():
+                yield idx, row
+            entry[1] = True
+            self._write_ready()
+        self.total = self._out.rows + sum(len(c[0]) for c in self._chunks)
+
+    def _chunk_for(self, idx):
+        for df, _ in self._chunks:
+            if df.index[0] <= idx <= df.index[-1]:
+                return df
+        raise KeyError(idx)
+
+    def _write_ready(self):
+        while self._chunks and self._chunks[0][1]:
+            df = self._chunks[0][0]
+            lo, hi = df.index[0], df.index[-1]
+            if any(lo <= i <= hi for i in self._held):
+                break
+            self._out.append_frame(df)
+            self._chunks.popleft()
+
+    def rows(self):
+        return self._iter
+
+    def row(self, idx):
+        return self._chunk_for(idx).loc[idx]
+
+    def hold(self, idx):
+        self._held.add(idx)
+
+    def apply(self, idx, res):
+        apply_row_result(self._chunk_for(idx), idx, res)
+        self._held.discard(idx)
+        self._write_ready()
+
+    def checkpoint(self, tag: str):
+        # hasil per baris sudah aman di journal; xlsx streaming baru ditulis utuh di akhir
+        pass
+
+    def finish(self) -> str:
+        # baris yang belum sempat diproses (stop) tetap ikut ditulis apa adanya
+        self._held.clear()
+        for _ in self._iter:
+            pass
+        self._write_ready()
+        t0 = time.time()
+        self._out.close()
+        self._finished = True
+        self.last_save_sec = time.time() - t0
+        print(
+            f"💾 Saved (streaming, {self._out.rows} baris, {len(self.done)} dari journal) "
+            f"-> {self.output_path} ({self.last_save_sec:.1f}s)",
+            flush=True
+        )
+        return self.output_path
+
+    def close(self):
+        if not self._finished:
+            self._out.abort()
+        self._iter.close()
+
+# =========================
+# DEDUP input: usaha yang sama (nama/alamat/kec ternormalisasi) cukup dicari sekali
+# - baris pertama tiap grup = wakil, diproses biasa; anggota lain menyalin hasilnya
+# - mode worker: anggota yang wakilnya masih di worker diparkir sampai hasil wakil datang
+# - hasil wakil yang gagal (timeout/driver) tidak disalin; anggota berikut jadi wakil baru
+# =========================
+DEDUP_ENABLED = os.environ.get("SCREP_DEDUP", "1").strip() != "0"
+DEDUP_MAX_KEYS = 200000  # batas hasil yang diingat (mode streaming: semua key dilacak)
+
+def dedup_key(row) -> tuple:
+    return (
+        normalize_name(s_cell(row.get("nama_usaha"))),
+        normalize_addr(s_cell(row.get("alamat_usaha"))).lower(),
+        clean_text(s_cell(row.get("nmkec"))).lower(),
+    )
+
+def fan_out_result(res: dict, row, rep_idx) -> dict:
+    # salinan hasil wakil; nama/alamat _gc tetap milik baris anggota sendiri
+    out = {"fields": dict(res.get("fields") or {}), "gc": res.get("gc")}
+    if out["gc"] is not None:
+        gc = list(out["gc"])
+        gc[1] = s_cell(row.get("nama_usaha"))
+        gc[2] = s_cell(row.get("alamat_usaha"))
+        out["gc"] = tuple(gc)
+    if not out["fields"].get("keterangan"):
+        out["fields"]["keterangan"] = f"Duplikat baris {rep_idx} (hasil disalin)"
+    return out
+
+DEDUP_PARKED = object()
+
+class RowDeduper:
+    def __init__(self, keys=None):
+        self._keys = keys                       # None = lacak semua key
+        self._pending = {}                      # key -> idx wakil yang sedang diproses
+        self._results = collections.OrderedDict()  # key -> (idx wakil, res)
+        self._parked = {}                       # key -> [(idx, row)]
+        self.fanned = 0
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, done=frozenset()):
+        """
+        Pre-pass: hitung grup duplikat di antara baris yang masih butuh browser,
+        lalu hanya key yang punya anggota > 1 yang dilacak.
+        """
+        counts = collections.Counter(
+            dedup_key(row) for idx, row in df.iterrows()
+            if idx not in done and row_needs_browser(row)
+        )
+        dup = {k: c for k, c in counts.items() if c > 1}
+        saved = sum(c - 1 for c in dup.values())
+        if dup:
+            print(
+                f"♊ Dedup pre-pass: {sum(counts.values())} baris butuh browser, {len(dup)} grup duplikat "
+                f"-> {saved} sesi browser bisa dihemat",
+                flush=True
+            )
+        return cls(keys=set(dup))
+
+    def claim(self, idx, row):
+        """
+        None = proses sendiri (jadi wakil); DEDUP_PARKED = tunggu wakil; dict = hasil salinan.
+        """
+        key = dedup_key(row)
+        if self._keys is not None and key not in self._keys:
+            return None
+        hit = self._results.get(key)
+        if hit is not None:
+            self.fanned += 1
+            return fan_out_result(hit[1], row, hit[0])
+        if key in self._pending:
+            self._parked.setdefault(key, []).append((idx, row))
+            return DEDUP_PARKED
+        self._pending[key] = idx
+        return None
+
+    def resolve(self, idx, row, res) -> list:
+        """
+        Hasil wakil datang. Return [(idx, row, res_salinan)] untuk anggota yang diparkir;
+        kalau hasil wakil tidak final, res_salinan None (anggota harus diproses sendiri,
+        anggota pertama jadi wakil baru).
+        """
+        key = dedup_key(row)
+        if self._pending.get(key) != idx:
+            return []
+        del self._pending[key]
+        parked = self._parked.pop(key, [])
+
+        if not res or not row_result_final(res):
+            if not parked:
+                return []
+            new_idx, new_row = parked[0]
+            self._pending[key] = new_idx
+            if len(parked) > 1:
+                self._parked[key] = parked[1:]
+            return [(new_idx, new_row, None)]
+
+        self._results[key] = (idx, res)
+        if len(self._results) > DEDUP_MAX_KEYS:
+            self._results.popitem(last=False)
+        self.fanned += len(parked)
+        return [(p_idx, p_row, fan_out_result(res, p_row, idx)) for p_idx, p_row in parked]
+
+    def report(self):
+        if self.fanned:
+            print(f"♊ Dedup: {self.fanned} baris diisi dari duplikat -> {self.fanned} sesi browser dihemat", flush=True)
+
+# =========================
+# GAZETTEER LOKAL: cocokkan baris ke tempat terverifikasi dari run sebelumnya
+# - shortlist dari inverted index (gazetteer.py), diskor dengan scoring yang sama (batch)
+# - hanya diterima kalau yakin: lolos should_early_stop, nama kuat, alamat tidak bertentangan,
+#   dan tidak ada kandidat lain yang hampir sama skornya di lokasi berbeda (cabang/toko jaringan)
+# - sisanya tetap ke browser seperti biasa; di akhir run output ikut masuk gazetteer
+# =========================
+GAZETTEER_ENABLED = os.environ.get("SCREP_GAZETTEER", "1").strip() != "0"
+GAZETTEER_SHORTLIST = 30
+GAZETTEER_MIN_SCORE = THRESHOLD_EARLY_STOP
+GAZETTEER_AMBIGUOUS_GAP = 0.05     # selisih skor ke kandidat kedua yang dianggap "seri"
+GAZETTEER_AMBIGUOUS_M = 150        # ...kalau kandidat kedua itu lebih jauh dari ini (tempat lain)
+
+def load_gazetteer():
+    if not GAZETTEER_ENABLED:
+        return None
+    try:
+        gz = Gazetteer.load(GAZETTEER_FILE)
+    except Exception as e:
+        print(f"⚠️ Gazetteer tidak aktif: {e}", flush=True)
+        return None
+    if len(gz):
+        print(f"📚 Gazetteer lokal: {len(gz)} tempat ({GAZETTEER_FILE})", flush=True)
+    return gz
+
+def gazetteer_confident(prof, best) -> bool:
+    if not should_early_stop(best, GAZETTEER_MIN_SCORE, kec_in=prof.kec_in):
+        return False
+    dbg = best.dbg
+    if not ((dbg.s_name >= 0.82) or (dbg.s_name_fuzzy >= 0.85)):
+        return False
+    if dbg.is_generic and dbg.ov_addr < 2:
+        return False
+    # alamat dua-duanya ada -> harus nyambung, kecuali nama sangat kuat (aturan lock alamat finalize)
+    name_super = (dbg.s_name >= 0.92) or (dbg.s_name_fuzzy >= 0.92)
+    if not name_super and prof.alamat_in.strip() and (best.alamat or "").strip() and len(prof.a_in_alpha) >= 2:
+        alpha_overlap = len(prof.a_in_alpha & addr_alpha_tokens(best.alamat))
+        if not ((alpha_overlap >= 1) or (dbg.ov_addr >= 2) or (dbg.s_addr >= 0.18)):
+            return False
+    return True
+
+def gazetteer_resolve(gz, idx, row):
+    """
+    Return hasil baris (bentuk sama dengan process_row) kalau gazetteer yakin, selain itu None.
+    """
+    if gz is None or not len(gz) or not row_needs_browser(row):
+        return None
+    nama_usaha_raw = s_cell(row.get("nama_usaha"))
+    alamat_usaha_raw = s_cell(row.get("alamat_usaha"))
+    prof = RowProfile(clean_text(nama_usaha_raw), normalize_addr(alamat_usaha_raw), clean_text(s_cell(row.get("nmkec"))))
+    ids = gz.candidates(prof.n_in, prof.a_in, limit=GAZETTEER_SHORTLIST)
+    if not ids:
+        return None
+
+    places = [gz.places[i] for i in ids]
+    names = [p.nama for p in places]
+    scores = score_candidates_batch(
+        prof, names, [p.alamat for p in places],
+        is_generic=[is_generic_place_name(nm) for nm in names],
+    )["score"]
+    order = np.argsort(-scores, kind="stable")
+    top = places[order[0]]
+
+    sc, dbg = score_candidate_profile(prof, top.nama, top.alamat, is_generic=is_generic_place_name(top.nama))
+    best = BestMatch()
+    best.take(sc, dbg, top.as_record(), "gazetteer")
+    if not gazetteer_confident(prof, best):
+        return None
+    for k in order[1:]:
+        if scores[k] < sc - GAZETTEER_AMBIGUOUS_GAP:
+            break
+        other = places[k]
+        if distance_m(top.lat, top.lon, other.lat, other.lon) > GAZETTEER_AMBIGUOUS_M:
+            return None
+
+    gz.hits += 1
+    if best.is_closed:
+        status_bisnis, status_kode, status_tutup = "Tutup (gazetteer lokal)", 3, best.closed_type
+    else:
+        status_bisnis, status_kode, status_tutup = "Ditemukan (gazetteer lokal)", 1, pd.NA
+    print(
+        f"📚 Baris {idx} | gazetteer score={sc:.2f} (s_name={dbg.s_name:.2f}, ov_addr={dbg.ov_addr}) "
+        f"| nama={best.nama} | alamat={best.alamat}",
+        flush=True
+    )
+    return {
+        "fields": {
+            "nama_gmaps": best.nama or "",
+            "alamat_gmaps": best.alamat or "",
+            "nomor_telepon": best.phone or "",
+            "score_match": round(sc, 4),
+            "status_bisnis": status_bisnis,
+            "status_kode": status_kode,
+            "status_tutup": status_tutup,
+        },
+        "gc": (status_kode, nama_usaha_raw, alamat_usaha_raw, best.lat, best.lon),
+    }
+
+def gazetteer_learn(gz, out_path):
+    # hasil run ini (match yang diterima) masuk gazetteer untuk register berikutnya
+    if gz is None:
+        return
+    if gz.hits:
+        print(f"📚 Gazetteer: {gz.hits} baris terjawab tanpa browser", flush=True)
+    try:
+        t0 = time.time()
+        added = gz.import_workbook(out_path)
+        gz.save(GAZETTEER_FILE)
+        print(f"📚 Gazetteer: +{added} tempat baru dari {out_path} -> {len(gz)} tempat ({time.time() - t0:.1f}s)", flush=True)
+    except Exception as e:
+        print(f"⚠️ Gazetteer tidak diperbarui: {e}", flush=True)
+
+# =========================
+# Mode 1 browser (lama)
+# =========================
+def run_sequential(table, journal=None, dedup=None, gazetteer=None):
+    driver = log_fh = None
+    prefetch = None
+    try:
+        driver, log_fh = build_driver()
+        open_home(driver)
+        prefetch = attach_prefetcher(driver)
+
+        _last_save_ts = time.time()
+        total_rows = table.total if table.total is not None else "?"
+
+        # lookahead 1 baris (hanya kalau prefetch aktif): baris berikut diambil tepat
+        # sebelum baris sekarang masuk browser, supaya query pertamanya bisa di-prefetch
+        rows_iter = iter(table.rows())
+        ahead = None
+        while True:
+            if ahead is not None:
+                (idx, row), ahead = ahead, None
+            else:
+                nxt = next(rows_iter, None)
+                if nxt is None:
+                    break
+                idx, row = nxt
+
+            # ---- sudah selesai di run sebelumnya (journal) ----
+            if idx in table.done:
+                continue
+
+            # ---- stop check (STOP.txt / Ctrl+C) ----
+            if should_stop():
+                if prefetch is not None:
+                    prefetch.cancel()
+                print(f"\n🛑 Berhenti aman di baris {idx}/{total_rows}.", flush=True)
+                break
+
+            # ---- autosave check ----
+            if autosave_due(idx, _last_save_ts, journal, table.last_save_sec):
+                table.checkpoint(tag=f"(autosave row {idx})")
+                _last_save_ts = time.time()
+
+            # ---- duplikat baris yang sudah dicari -> salin hasil ----
+            # ---- lalu gazetteer lokal, baru browser ----
+            res = dedup.claim(idx, row) if (dedup is not None and row_needs_browser(row)) else None
+            if res is None:
+                res = gazetteer_resolve(gazetteer, idx, row)
+                if res is None:
+                    if prefetch is not None:
+                        # tahan baris ini dulu: membaca baris berikut bisa menutup chunk-nya
+                        # (StreamTable menulis chunk yang sudah lengkap); dilepas lagi di apply
+                        table.hold(idx)
+                        ahead = next(rows_iter, None)
+                        if ahead is not None and ahead[0] not in table.done:
+                            prefetch.start_row(ahead[0], ahead[1])
+                    res = run_row(driver, idx, row)
+                    if prefetch is not None:
+                        prefetch.flush()
+                elif prefetch is not None:
+                    # baris ini terjawab tanpa browser -> hasil prefetch-nya tidak terpakai
+                    prefetch.cancel()
+                if res is None:
+                    break
+                if dedup is not None:
+                    dedup.resolve(idx, row, res)
+            elif prefetch is not None:
+                prefetch.cancel()
+            finish_row(table, journal, idx, row, res, sync=row_needs_browser(row))
+            if METRICS.rows % PROGRESS_EVERY_ROWS == 0:
+                print(METRICS.progress_line(), flush=True)
+
+        # final save (aman)
+        out_path = table.finish()
+        print(f"\n✅ Proses selesai! File disimpan kembali ke: {out_path}", flush=True)
+
+    finally:
+        if prefetch is not None:
+            prefetch.report()
+        close_driver(driver, log_fh)
+        table.close()
+        if dedup is not None:
+            dedup.report()
+        METRICS.report()
+        close_caches()
+        report_wait_stats()
+        report_norm_cache_stats()
+        report_sim_cache_stats()
+
+# =========================
+# Mode worker pool (N Chrome, 1 coordinator)
+# =========================
+class HeldTasks:
+    """
+    Baris yang sedang dipegang tiap worker/tab (dari pesan "take" worker), supaya
+    worker yang mati / berhenti karena error tidak membawa baris itu ikut hilang.
+    """
+    def __init__(self, retries: int = WORKER_TASK_RETRIES):
+        self.retries = retries
+        self.held = {}                       # wid -> {idx}
+        self.gone = set()                    # wid yang sudah selesai / mati
+        self.lost = collections.Counter()    # idx -> berapa kali workernya mati
+
+    def take(self, wid, idx):
+        self.held.setdefault(wid, set()).add(idx)
+
+    def returned(self, wid, idx):
+        self.held.get(wid, set()).discard(idx)
+
+    def release(self, wid, table, dedup, requeue, retry: bool = True) -> int:
+        """
+        Worker wid selesai/mati: baris yang masih dipegangnya masuk requeue (maks
+        retries kali) atau dilepas tanpa hasil (tidak masuk journal -> diproses lagi
+        di run berikutnya). Return jumlah baris yang dilepas dari in_flight.
+        """
+        self.gone.add(wid)
+        lost = sorted(self.held.pop(wid, set()))
+        for idx in lost:
+            row = table.row(idx)
+            self.lost[idx] += 1
+            if retry and self.lost[idx] <= self.retries:
+                requeue.append((idx, row))
+                continue
+            print(f"⚠️ Baris {idx} dilepas tanpa hasil (worker/tab #{wid} berhenti saat memprosesnya)", flush=True)
+            if dedup is not None:
+                # anggota duplikat yang menunggu baris ini diproses sendiri
+                for f_idx, f_row, _ in dedup.resolve(idx, row, None):
+                    requeue.append((f_idx, f_row))
+        return len(lost)
+
+async def coordinate_rows(table, n_workers: int, task_q, get_result, worker_dead, all_stopped,
+                          journal=None, dedup=None, gazetteer=None, label: str = "worker"):
+    """
+    Loop coordinator bersama worker pool (proses) dan engine CDP (task per tab):
+    isi task_q dari tabel (baris tanpa browser/dedup/gazetteer dijawab di sini),
+    terima hasil, kembalikan baris milik worker yang mati, autosave.
+
+    get_result(): coroutine, (kind, wid, idx, payload) atau None kalau belum ada hasil (timeout)
+    worker_dead(wid): alasan kalau worker berakhir tanpa pesan "done", selain itu None
+    all_stopped(): True kalau semua worker sudah berakhir dan tidak ada hasil tersisa
+    """
+    rows_iter = table.rows()
+    rows_left = True
+    requeue = collections.deque()  # anggota dedup yang wakilnya gagal -> diproses sendiri
+    next_task = None
+    feeding = True
+    sentinels_left = 0
+    in_flight = 0
+    alive = n_workers
+    held = HeldTasks()
+    rows_done = 0
+    _last_save_ts = time.time()
+
+    while alive > 0:
+        if feeding and should_stop():
+            print(f"\n🛑 Berhenti aman: tunggu {alive} {label} selesai.", flush=True)
+            feeding = False
+            sentinels_left = 0
+
+        # ---- isi antrean (ringan: baris tanpa browser langsung diproses di sini) ----
+        while feeding:
+            if next_task is None:
+                if requeue:
+                    idx, row = requeue.popleft()
+                    next_task = (idx, row_task(row))
+                elif not rows_left:
+                    # input habis; sentinel baru dikirim kalau tidak ada hasil yang bisa memicu requeue
+                    if in_flight == 0:
+                        feeding = False
+                        sentinels_left = alive
+                    break
+                else:
+                    try:
+                        idx, row = next(rows_iter)
+                    except StopIteration:
+                        rows_left = False
+                        continue
+                    if idx in table.done:
+                        continue
+                    if not row_needs_browser(row):
+                        res = process_row(None, idx, row)
+                        finish_row(table, journal, idx, row, res, sync=False)
+                        rows_done += 1
+                        continue
+                    got = dedup.claim(idx, row) if dedup is not None else None
+                    if got is DEDUP_PARKED:
+                        table.hold(idx)
+                        continue
+                    if got is None:
+                        got = gazetteer_resolve(gazetteer, idx, row)
+                        if got is not None and dedup is not None:
+                            dedup.resolve(idx, row, got)
+                    if got is not None:
+                        finish_row(table, journal, idx, row, got)
+                        rows_done += 1
+                        continue
+                    table.hold(idx)
+                    next_task = (idx, row_task(row))
+            try:
+                task_q.put_nowait(next_task)
+                in_flight += 1
+                next_task = None
+            except (queue.Full, asyncio.QueueFull):
+                break
+
+        while sentinels_left > 0:
+            try:
+                task_q.put_nowait(None)
+                sentinels_left -= 1
+            except (queue.Full, asyncio.QueueFull):
+                break
+
+        # ---- terima hasil ----
+        msg = await get_result()
+        if msg is None:
+            # worker yang berakhir tanpa "done" (crash/di-kill/dibatalkan): baris yang
+            # masih dipegangnya dikembalikan
+            for w in range(1, n_workers + 1):
+                if w in held.gone:
+                    continue
+                reason = worker_dead(w)
+                if reason is None:
+                    continue
+                print(f"⚠️ {label}#{w} {reason}", flush=True)
+                alive -= 1
+                in_flight -= held.release(w, table, dedup, requeue, retry=feeding)
+            if all_stopped():
+                break
+            continue
+
+        kind, wid, idx, payload = msg
+        if kind == "take":
+            held.take(wid, idx)
+            continue
+        if kind == "row":
+            held.returned(wid, idx)
+            in_flight -= 1
+            if payload is not None:
+                row = table.row(idx)
+                followers = dedup.resolve(idx, row, payload) if dedup is not None else []
+                finish_row(table, journal, idx, row, payload)
+                rows_done += 1
+                for f_idx, f_row, f_res in followers:
+                    if f_res is None:
+                        requeue.append((f_idx, f_row))
+                        continue
+                    finish_row(table, journal, f_idx, f_row, f_res)
+                    rows_done += 1
+                if rows_done % PROGRESS_EVERY_ROWS == 0:
+                    print(f"{METRICS.progress_line()} | {alive} {label}", flush=True)
+            elif feeding:
+                # dikembalikan tanpa diproses (worker berhenti karena error) -> worker lain
+                requeue.append((idx, table.row(idx)))
+        elif kind == "error":
+            print(f"⚠️ {label}#{wid} error: {payload}", flush=True)
+        elif kind == "done":
+            if wid in held.gone:
+                continue
+            alive -= 1
+            # berhenti karena error -> baris yang sedang diproses dicoba worker lain
+            in_flight -= held.release(wid, table, dedup, requeue, retry=feeding)
+
+        # ---- autosave check ----
+        if kind == "row" and autosave_due(rows_done, _last_save_ts, journal, table.last_save_sec):
+            table.checkpoint(tag=f"(autosave {rows_done} baris)")
+            _last_save_ts = time.time()
+
+def _worker_main(worker_id, driver_path, task_q, result_q, stop_event):
+    """
+    Proses worker: punya Chrome sendiri, ambil (idx, row) dari task_q,
+    kirim hasil ke result_q. df & file Excel hanya dipegang coordinator.
+    """
+    global _stop_event
+    _stop_event = stop_event
+    # Ctrl+C diurus coordinator (dia yang set stop_event)
+    try:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+    except Exception:
+        pass
+
+    driver = log_fh = None
+    prefetch = None
+    ahead = None      # task berikut yang sudah diambil (lookahead 1 baris untuk prefetch)
+    try:
+        driver, log_fh = build_driver(driver_path)
+        open_home(driver)
+        prefetch = attach_prefetcher(driver)
+        print(f"🧵 worker#{worker_id} siap", flush=True)
+
+        last = False      # sentinel sudah terambil sebagai lookahead -> selesai setelah task ini
+        while not should_stop():
+            if ahead is not None:
+                task, ahead = ahead, None
+            elif last:
+                break
+            else:
+                try:
+                    task = task_q.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if task is not None:
+                    result_q.put(("take", worker_id, task[0], None))
+            if task is None:
+                break
+            idx, row = task
+            # stop sudah diminta -> jangan ambil task baru (tidak akan sempat diproses)
+            if prefetch is not None and not last and not should_stop():
+                try:
+                    ahead = task_q.get_nowait()
+                except queue.Empty:
+                    ahead = None
+                else:
+                    if ahead is None:
+                        last = True
+                    else:
+                        result_q.put(("take", worker_id, ahead[0], None))
+                        prefetch.start_row(ahead[0], ahead[1])
+            res = run_row(driver, idx, row)
+            if prefetch is not None:
+                prefetch.flush()
+            result_q.put(("row", worker_id, idx, res))
+        if prefetch is not None:
+            prefetch.cancel()
+    except Exception as e:
+        result_q.put(("error", worker_id, None, f"{type(e).__name__}: {e}"))
+    finally:
+        if ahead is not None:
+            # lookahead yang belum sempat diproses (stop/error) -> kembalikan sebagai
+            # "tidak diproses" supaya coordinator tidak menunggunya
+            result_q.put(("row", worker_id, ahead[0], None))
+        if prefetch is not None:
+            prefetch.report()
+        close_driver(driver, log_fh)
+        close_caches()
+        report_wait_stats()
+        report_norm_cache_stats()
+        report_sim_cache_stats()
+        result_q.put(("done", worker_id, None, None))
+
+def run_worker_pool(table, n_workers: int, journal=None, dedup=None, gazetteer=None):
+    global _stop_event
+    # spawn: sama perilakunya di Windows & Linux (driver/Chrome tidak aman di-fork)
+    ctx = mp.get_context("spawn")
+    _stop_event = ctx.Event()
+    task_q = ctx.Queue(maxsize=max(1, n_workers * WORKER_QUEUE_DEPTH))
+    result_q = ctx.Queue()
+
+    driver_path = resolve_chromedriver_path()
+    procs = []
+    for w in range(n_workers):
+        if should_stop():
+            break
+        p = ctx.Process(
+            target=_worker_main,
+            args=(w + 1, driver_path, task_q, result_q, _stop_event),
+            daemon=True,
+        )
+        p.start()
+        procs.append(p)
+        if w + 1 < n_workers:
+            time.sleep(WORKER_START_STAGGER_SEC)
+
+    exited = set()  # worker yang sudah terlihat keluar (diproses di timeout berikutnya)
+
+    async def get_result():
+        # antrean proses: get blocking, coroutine ini tidak pernah menunggu event loop
+        try:
+            return result_q.get(timeout=0.5)
+        except queue.Empty:
+            return None
+
+    def worker_dead(w):
+        # keluar tanpa "done" (crash/di-kill): pesan terakhirnya sudah terbaca di timeout ini
+        p = procs[w - 1]
+        if p.exitcode is None:
+            return None
+        if w not in exited:
+            exited.add(w)
+            return None
+        return f"mati (exitcode {p.exitcode})"
+
+    try:
+        run_sync(coordinate_rows(
+            table, len(procs), task_q, get_result, worker_dead,
+            lambda: not any(p.is_alive() for p in procs),
+            journal=journal, dedup=dedup, gazetteer=gazetteer, label="worker",
+        ))
+
+        # final save (aman)
+        out_path = table.finish()
+        print(f"\n✅ Proses selesai! File disimpan kembali ke: {out_path}", flush=True)
+
+    finally:
+        table.close()
+        if dedup is not None:
+            dedup.report()
+        METRICS.report()
+        request_stop()
+        for p in procs:
+            p.join(timeout=15)
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+
+# =========================
+# Mode engine CDP (SCREP_ENGINE=cdp): satu Chrome, banyak tab, asyncio
+# - Versi async dari run_query_via_url / force_open_place_details / ekstraksi;
+#   JS-nya sama persis (WAIT_FOR_JS, CONSENT_JS, LIST_CANDIDATES_JS, PLACE_SNAPSHOT_JS)
+# - Scoring, early stop, finalize_decision, cache query/place, dedup, gazetteer,
+#   journal dan metrik sama dengan mode Selenium
+# - Koordinasi memakai loop worker pool (coordinate_rows), "worker" = task asyncio per tab
+# =========================
+async def cdp_wait_for(tab, kind, timeout) -> bool:
+    t0 = time.time()
+    deadline = t0 + timeout
+    ok = False
+    while True:
+        left = deadline - time.time()
+        if left <= 0:
+            break
+        try:
+            res = await tab.call_async(WAIT_FOR_JS, kind, int(left * 1000), timeout=left + 5)
+            ok = bool(res and res.get("ok"))
+            break
+        except asyncio.TimeoutError:
+            break
+        except cdp_engine.ContextLost:
+            # dokumen diganti di tengah tunggu (navigasi) -> ulang di dokumen baru
+            await asyncio.sleep(0.05)
+    record_wait(kind, time.time() - t0, ok)
+    return ok
+
+async def cdp_wait_document_ready(tab, timeout=12):
+    if not await cdp_wait_for(tab, "doc", timeout):
+        raise TimeoutException(f"document belum siap setelah {timeout}s")
+
+async def cdp_goto(tab, url, timeout=12):
+    await tab.navigate(url)
+    await cdp_wait_document_ready(tab, timeout)
+
+@timed("consent")
+async def cdp_click_consent_if_any(tab, timeout=2):
+    t0 = time.time()
+    try:
+        clicked = bool(await tab.call_async(CONSENT_JS, int(timeout * 1000), timeout=timeout + 5))
+    except (cdp_engine.CDPError, asyncio.TimeoutError):
+        clicked = False
+    record_wait("consent", time.time() - t0, True)
+    return clicked
+
+async def cdp_open_home(tab):
+    await cdp_goto(tab, MAPS_BASE_URL)
+    await cdp_click_consent_if_any(tab, timeout=2)
+
+@timed("query")
+async def cdp_run_query_via_url(tab, query, timeout=18):
+    q = " ".join(str(query).split()).strip()
+    if not q:
+        return ""
+    url = query_url(q)
+    await cdp_goto(tab, url)
+    await cdp_click_consent_if_any(tab, timeout=1)
+    if not await cdp_wait_for(tab, "results", timeout):
+        raise TimeoutException(f"hasil query belum muncul setelah {timeout}s")
+    return url
+
+@timed("open_details")
+async def cdp_force_open_place_details(tab, timeout=8) -> bool:
+    try:
+        u = (await tab.current_url()).lower()
+        if "/maps/place" in u:
+            return True
+
+        if "/maps/search" in u:
+            if not await cdp_wait_for(tab, "links", timeout):
+                return False
+            href = await tab.call('const a = document.querySelector("a.hfpxzc"); return a ? (a.href || "") : "";')
+            if not href:
+                return False
+            await cdp_goto(tab, href)
+            await cdp_click_consent_if_any(tab, timeout=1)
+            await cdp_wait_for(tab, "place_or_h1", timeout)
+            return "/maps/place" in (await tab.current_url()).lower()
+
+        await cdp_wait_for(tab, "h1", timeout)
+        return "/maps/place" in (await tab.current_url()).lower()
 
-finally:
-    try:
-        driver.quit()
-    except Exception:
-        pass
-    try:
-        if log_fh:
-            log_fh.close()
     except Exception:
+        return False
+
+@timed("panel_wait")
+async def cdp_wait_place_panel_ready(tab, timeout=8) -> bool:
+    try:
+        return await cdp_wait_for(tab, "place", timeout)
+    except Exception:
+        return False
+
+@timed("list_cands")
+async def cdp_get_list_candidates(tab, limit=12):
+    try:
+        cands = json.loads(await tab.call(LIST_CANDIDATES_JS, int(limit)) or "[]")
+    except (cdp_engine.CDPError, ValueError):
+        return []
+    return [
+        {"href": c.get("href"), "name_hint": c.get("name_hint") or "", "sub_hint": c.get("sub_hint") or ""}
+        for c in cands if c.get("href")
+    ]
+
+async def cdp_partial_match_detected(tab):
+    try:
+        return bool(await tab.call('return !!document.querySelector("div.L5xkq.Hk4XGb");'))
+    except cdp_engine.CDPError:
+        return False
+
+@timed("extract")
+async def cdp_extract_place_record(tab, title_timeout=4) -> dict:
+    """
+    Sama dengan extract_place_record: satu snapshot PLACE_SNAPSHOT_JS, parsing di Python.
+    """
+    await cdp_wait_place_panel_ready(tab, timeout=title_timeout)
+    try:
+        await tab.call("window.scrollBy(0, 300);")
+    except cdp_engine.CDPError:
         pass
+    await cdp_wait_for(tab, "details", DETAILS_WAIT_SEC)
+
+    try:
+        snap = json.loads(await tab.call(PLACE_SNAPSHOT_JS) or "{}")
+    except (cdp_engine.CDPError, ValueError):
+        snap = {}
+    if not isinstance(snap, dict):
+        snap = {}
+
+    nama_detail = get_place_title(None, snap=snap) or ""
+    if nama_detail.strip().lower() in {"hasil", "result", "results"}:
+        nama_detail = ""
+
+    alamat_detail = address_from_snap(snap)
+    if not alamat_detail:
+        alamat_detail = address_from_html(await tab.page_source())
+    phone = (snap.get("phone") or "").strip() or None
+    cur_url = snap.get("url") or await tab.current_url()
+    lat, lon = parse_coords_from_url(cur_url)
+
+    text = (snap.get("closed_text") or "").strip()
+    if not text:
+        text = await tab.page_source()
+    is_closed, closed_type = _closed_from_text(text.lower())
+    return {
+        "nama": nama_detail,
+        "alamat": alamat_detail,
+        "phone": phone,
+        "lat": lat,
+        "lon": lon,
+        "is_closed": bool(is_closed),
+        "closed_type": closed_type,
+        "url": cur_url or "",
+    }
+
+async def cdp_extract_candidates(tab, hrefs) -> dict:
+    """
+    Buka semua href sekaligus di tab sementara (satu Chrome), ekstrak masing-masing
+    begitu siap, lalu tutup tabnya. Return {href: rec}; href yang gagal (timeout /
+    context hilang) tidak ada di hasil, kandidat lain tetap dipakai.
+    """
+    browser = tab.browser
+
+    async def one(href):
+        ctab = await browser.new_tab()
+        try:
+            if BROWSER_PROFILE == "lean":
+                await ctab.block_urls(LEAN_BLOCKED_URLS)
+            await cdp_goto(ctab, href)
+            await cdp_click_consent_if_any(ctab, timeout=1)
+            await cdp_force_open_place_details(ctab, timeout=6)
+            await cdp_wait_place_panel_ready(ctab, timeout=6)
+            return await cdp_extract_place_record(ctab, title_timeout=4)
+        finally:
+            await ctab.close()
+
+    recs = await asyncio.gather(*(one(h) for h in hrefs), return_exceptions=True)
+    out = {}
+    for href, rec in zip(hrefs, recs):
+        if isinstance(rec, Exception):
+            print(f"   ⚠ kandidat dilewati ({type(rec).__name__}: {rec}) | {href}", flush=True)
+            continue
+        out[href] = rec
+    return out
+
+class CdpRowIO:
+    """
+    I/O browser row_search untuk satu tab CDP. Kandidat list diekstrak paralel
+    (cdp_extract_candidates) atau dibuka langsung dari href-nya di tab ini.
+    """
+
+    def __init__(self, tab, idx):
+        self.tab = tab
+        self.tag = f"[{idx}] "
+        self.opened = {}
+        self.failed = set()
+
+    async def query(self, q) -> str:
+        tab = self.tab
+        for attempt in range(MAX_RETRY + 1):
+            try:
+                await cdp_run_query_via_url(tab, q, timeout=18)
+                await cdp_force_open_place_details(tab, timeout=8)
+                await cdp_wait_place_panel_ready(tab, timeout=6)
+                break
+            except (TimeoutException, cdp_engine.ContextLost):
+                if attempt == MAX_RETRY:
+                    raise
+                await cdp_open_home(tab)
+
+        if await cdp_partial_match_detected(tab):
+            print(f"   ⚠ {self.tag}partial match terdeteksi", flush=True)
+        return await tab.current_url()
+
+    async def list_candidates(self, limit):
+        return await cdp_get_list_candidates(self.tab, limit=limit)
+
+    async def place_record(self, title_timeout):
+        return await cdp_extract_place_record(self.tab, title_timeout=title_timeout)
+
+    async def open_candidates(self, hrefs):
+        if not (CAND_TABS and hrefs):
+            return
+        with stage("cand_nav"):
+            self.opened = await cdp_extract_candidates(self.tab, hrefs)
+        self.failed = set(hrefs) - set(self.opened)
+
+    async def candidate(self, href, ci):
+        if href in self.opened:
+            return self.opened[href]
+        if href in self.failed:
+            return None  # sudah dilaporkan cdp_extract_candidates
+
+        with stage("cand_nav"):
+            await cdp_goto(self.tab, href)
+        await cdp_click_consent_if_any(self.tab, timeout=1)
+        await cdp_force_open_place_details(self.tab, timeout=6)
+        await cdp_wait_place_panel_ready(self.tab, timeout=6)
+        return await cdp_extract_place_record(self.tab, title_timeout=4)
+
+    async def close_candidates(self):
+        # tab kandidat sudah ditutup cdp_extract_candidates
+        self.opened = {}
+        self.failed = set()
+
+    def failure_note(self, e) -> str:
+        return f"Gagal diproses: {type(e).__name__}: {e}"
+
+    async def recover(self, idx):
+        try:
+            await self.tab.screenshot(os.path.join(SCREENSHOT_DIR, f"debug_row_{idx}.png"))
+        except Exception:
+            pass
+        try:
+            await cdp_open_home(self.tab)
+        except Exception:
+            pass
+
+async def cdp_process_row(tab, idx, row):
+    """
+    process_row versi engine CDP: alur query/kandidat dan keputusan sama (row_search),
+    hanya I/O browser lewat CdpRowIO.
+    """
+    quick = row_quick_result(row)
+    if quick is not None:
+        return quick
+    return await row_search(CdpRowIO(tab, idx), idx, row, row_plan(row))
+
+async def cdp_run_row(tab, idx, row):
+    # cdp_process_row + durasi per tahap (buffer tahap per task, lihat metrics.py)
+    take_row_stages()
+    t0 = time.perf_counter()
+    res = await cdp_process_row(tab, idx, row)
+    if res is not None:
+        res["stages"] = take_row_stages() + [("row", time.perf_counter() - t0)]
+    return res
+
+async def _cdp_tab_worker(wid, tab, task_q, result_q):
+    try:
+        await cdp_open_home(tab)
+        print(f"🗂 tab#{wid} siap", flush=True)
+        while not should_stop():
+            try:
+                task = await asyncio.wait_for(task_q.get(), 0.5)
+            except asyncio.TimeoutError:
+                continue
+            if task is None:
+                break
+            idx, row = task
+            await result_q.put(("take", wid, idx, None))
+            res = await cdp_run_row(tab, idx, row)
+            await result_q.put(("row", wid, idx, res))
+    except Exception as e:
+        await result_q.put(("error", wid, None, f"{type(e).__name__}: {e}"))
+    finally:
+        await result_q.put(("done", wid, None, None))
+
+async def _cdp_coordinator(table, n_tabs, journal, dedup, gazetteer):
+    args = build_chrome_options(BROWSER_PROFILE).arguments
+    browser = await cdp_engine.Browser.launch(args)
+    print(f"🧭 Engine CDP: Chrome pid {browser.proc.pid}, {n_tabs} tab", flush=True)
+    tasks = []
+    try:
+        task_q = asyncio.Queue(maxsize=max(1, n_tabs * WORKER_QUEUE_DEPTH))
+        result_q = asyncio.Queue()
+        for w in range(n_tabs):
+            tab = await browser.new_tab()
+            if BROWSER_PROFILE == "lean":
+                try:
+                    await tab.block_urls(LEAN_BLOCKED_URLS)
+                except cdp_engine.CDPError as e:
+                    print(f"⚠️ Gagal pasang blokir URL (lean) tab#{w + 1}: {e}", flush=True)
+            tasks.append(asyncio.create_task(_cdp_tab_worker(w + 1, tab, task_q, result_q)))
+
+        async def get_result():
+            try:
+                return await asyncio.wait_for(result_q.get(), 0.5)
+            except asyncio.TimeoutError:
+                return None
+
+        def tab_dead(w):
+            # task tab berakhir tanpa "done" (dibatalkan dari luar) dan antrean hasil sudah kosong
+            if tasks[w - 1].done() and result_q.empty():
+                return "berhenti tanpa pamit"
+            return None
+
+        await coordinate_rows(
+            table, len(tasks), task_q, get_result, tab_dead,
+            lambda: all(t.done() for t in tasks) and result_q.empty(),
+            journal=journal, dedup=dedup, gazetteer=gazetteer, label="tab",
+        )
+        METRICS.sample_rss()
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await browser.close()
+
+def run_cdp_engine(table, n_tabs: int, journal=None, dedup=None, gazetteer=None):
+    try:
+        asyncio.run(_cdp_coordinator(table, max(1, n_tabs), journal, dedup, gazetteer))
+
+        # final save (aman)
+        out_path = table.finish()
+        print(f"\n✅ Proses selesai! File disimpan kembali ke: {out_path}", flush=True)
+
+    finally:
+        table.close()
+        if dedup is not None:
+            dedup.report()
+        METRICS.report()
+        close_caches()
+        report_wait_stats()
+        report_norm_cache_stats()
+        report_sim_cache_stats()
+
+def main():
+    install_signal_handlers()
+
+    file_path = INPUT_FILE
+    ensure_dir(SCREENSHOT_DIR)
+
+    journal = RowJournal(journal_path_for(file_path)) if JOURNAL_ENABLED else None
+
+    stream = STREAM_INPUT or os.path.splitext(file_path)[1].lower() not in tableio.STREAM_EXCEL_EXT
+    if stream:
+        if journal is None:
+            print("⚠️ Mode streaming tanpa journal: kalau proses mati, hasil belum tersimpan.", flush=True)
+        table = StreamTable(file_path, stream_output_path(file_path), journal)
+        print(f"📥 Streaming input {file_path} (chunk {STREAM_CHUNK_ROWS} baris) -> {table.output_path}", flush=True)
+        # tanpa pre-pass (input belum terbaca semua): semua key dilacak saat jalan
+        dedup = RowDeduper() if DEDUP_ENABLED else None
+    else:
+        df = pd.read_excel(file_path)
+        df = prepare_dataframe(df)
+        table = FrameTable(df, file_path, replay_journal(df, journal))
+        dedup = RowDeduper.from_frame(df, table.done) if DEDUP_ENABLED else None
+
+    gazetteer = load_gazetteer()
+    METRICS.set_total(table.total, len(table.done))
+    metrics_server = None
+    if METRICS_PORT > 0:
+        try:
+            metrics_server = serve_metrics(METRICS, METRICS_PORT)
+            print(f"📊 Metrik: http://127.0.0.1:{METRICS_PORT}/metrics", flush=True)
+        except OSError as e:
+            print(f"⚠️ Endpoint metrik tidak jalan (port {METRICS_PORT}): {e}", flush=True)
+    try:
+        if ENGINE == "cdp":
+            run_cdp_engine(table, CDP_TABS, journal=journal, dedup=dedup, gazetteer=gazetteer)
+        elif WORKERS > 1:
+            run_worker_pool(table, WORKERS, journal=journal, dedup=dedup, gazetteer=gazetteer)
+        else:
+            run_sequential(table, journal=journal, dedup=dedup, gazetteer=gazetteer)
+        gazetteer_learn(gazetteer, table.output_path if stream else table.file_path)
+    finally:
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        if journal is not None:
+            journal.close()
+
+if __name__ == "__main__":
+    main()
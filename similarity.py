@@ -0,0 +1,216 @@
+# =========================
+# KEMIRIPAN STRING/TOKEN (dipakai scoring di script.py)
+# - Ukuran tetap ratio difflib.SequenceMatcher(None, a, b), jadi nilai dan keputusan
+#   di threshold (0.88 token, 0.78/0.90 echo) sama persis dengan versi lama
+# - Untuk cek threshold, pasangan disaring dulu pakai batas atas murah:
+#     ratio = 2*M/(len a + len b), dengan M <= LCS(a, b) <= multiset karakter <= min(len a, len b)
+#   1) batas panjang, 2) batas multiset karakter,
+#   3) batas LCS (bit-parallel, Allison-Dix/Hyyro) -> kalau < thr pasti gagal
+#   baru sisanya dihitung ratio lengkap
+# - Ratio lengkap: algoritma SequenceMatcher yang sama (blok terpanjang, rekursi kiri/kanan)
+#   tapi cari blok pakai str.find; string >= 200 karakter tetap lewat SequenceMatcher (autojunk)
+# - Hasil per pasangan di-memo pakai LRU terbatas (token yang sama muncul di
+#   banyak kandidat/query dalam satu run)
+# =========================
+
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+SIM_CACHE_SIZE = 262144  # entri per fungsi
+
+
+# =========================
+# Kernel
+# =========================
+def _lcs_len(a: str, b: str) -> int:
+    """
+    Panjang longest common subsequence, bit-parallel (satu operasi int per karakter b).
+    """
+    if not a or not b:
+        return 0
+    masks = {}
+    bit = 1
+    for ch in a:
+        masks[ch] = masks.get(ch, 0) | bit
+        bit <<= 1
+    full = bit - 1
+    v = full
+    for ch in b:
+        u = v & masks.get(ch, 0)
+        v = ((v + u) | (v - u)) & full
+    return len(a) - bin(v).count("1")
+
+def _char_overlap(a: str, b: str) -> int:
+    """
+    Jumlah karakter bersama sebagai multiset (batas atas M, sama seperti quick_ratio()).
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    n = 0
+    for ch in set(a):
+        n += min(a.count(ch), b.count(ch))
+    return n
+
+def _longest_match(a: str, b: str, alo: int, ahi: int, blo: int, bhi: int):
+    """
+    Blok sama terpanjang a[alo:ahi] vs b[blo:bhi]; kalau seri ambil i terkecil lalu j
+    terkecil -- hasil sama dengan SequenceMatcher.find_longest_match tanpa junk.
+    Tiap langkah cuma str.find (C), bukan DP per karakter.
+    """
+    find = b.find
+    best = 0
+    bi = alo
+    for i in range(alo, ahi):
+        if i + best >= ahi:
+            break
+        while i + best < ahi and find(a[i:i + best + 1], blo, bhi) >= 0:
+            best += 1
+            bi = i
+    if not best:
+        return alo, blo, 0
+    return bi, find(a[bi:bi + best], blo, bhi), best
+
+def _match_count(a: str, b: str) -> int:
+    """
+    Total ukuran matching blocks SequenceMatcher(None, a, b) (M di ratio = 2*M/T).
+    """
+    total = 0
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+        i, j, k = _longest_match(a, b, alo, ahi, blo, bhi)
+        if k:
+            total += k
+            if alo < i and blo < j:
+                stack.append((alo, i, blo, j))
+            if i + k < ahi and j + k < bhi:
+                stack.append((i + k, ahi, j + k, bhi))
+    return total
+
+@lru_cache(maxsize=SIM_CACHE_SIZE)
+def _seq_ratio(a: str, b: str) -> float:
+    total = len(a) + len(b)
+    if not total:
+        return 1.0
+    if len(b) >= 200:
+        # autojunk SequenceMatcher aktif mulai 200 karakter; serahkan ke aslinya
+        return SequenceMatcher(None, a, b).ratio()
+    return 2.0 * _match_count(a, b) / total
+
+@lru_cache(maxsize=SIM_CACHE_SIZE)
+def _ratio_at_least(a: str, b: str, thr: float) -> bool:
+    if a == b:
+        return 1.0 >= thr
+    total = len(a) + len(b)
+    # rumus sama dengan SequenceMatcher.ratio(), jadi pembulatan float ikut sama
+    if 2.0 * min(len(a), len(b)) / total < thr:
+        return False
+    if 2.0 * _char_overlap(a, b) / total < thr:
+        return False
+    if 2.0 * _lcs_len(a, b) / total < thr:
+        return False
+    return _seq_ratio(a, b) >= thr
+
+def seq_ratio(a: str, b: str) -> float:
+    """
+    Sama dengan SequenceMatcher(None, a, b).ratio(), ter-memo.
+    """
+    return _seq_ratio(a, b)
+
+def ratio_at_least(a: str, b: str, thr: float) -> bool:
+    """
+    Sama dengan SequenceMatcher(None, a, b).ratio() >= thr, tapi kebanyakan
+    pasangan diputus oleh batas panjang/karakter/LCS tanpa ratio lengkap.
+    """
+    return _ratio_at_least(a, b, float(thr))
+
+
+# =========================
+# API yang dipakai scoring
+# =========================
+def fuzzy_ratio(a: str, b: str) -> float:
+    a = (a or "").strip().lower()
+    b = (b or "").strip().lower()
+    if not a or not b:
+        return 0.0
+    return _seq_ratio(a, b)
+
+def fuzzy_at_least(a: str, b: str, thr: float) -> bool:
+    """
+    Sama dengan fuzzy_ratio(a, b) >= thr (thr > 0).
+    """
+    a = (a or "").strip().lower()
+    b = (b or "").strip().lower()
+    if not a or not b:
+        return 0.0 >= thr
+    return _ratio_at_least(a, b, float(thr))
+
+def _soft_overlap(a_set, b_set, sim_thr: float) -> int:
+    cnt = 0
+    for ta in a_set:
+        if ta in b_set:
+            cnt += 1
+            continue
+        for tb in b_set:
+            if _ratio_at_least(ta, tb, sim_thr):
+                cnt += 1
+                break
+    return cnt
+
+@lru_cache(maxsize=SIM_CACHE_SIZE)
+def _soft_overlap_frozen(a_set: frozenset, b_set: frozenset, sim_thr: float) -> int:
+    return _soft_overlap(a_set, b_set, sim_thr)
+
+def soft_token_overlap(a_set: set, b_set: set, sim_thr: float = 0.88) -> int:
+    """
+    Jumlah token a yang ada di b, atau mirip (ratio >= sim_thr) dengan salah satu token b.
+    Token set dari textnorm (frozenset) di-memo per pasangan set: soft_jaccard
+    dan ov_name memanggil dengan argumen yang sama untuk tiap kandidat.
+    """
+    if not a_set or not b_set:
+        return 0
+    sim_thr = float(sim_thr)
+    if isinstance(a_set, frozenset) and isinstance(b_set, frozenset):
+        return _soft_overlap_frozen(a_set, b_set, sim_thr)
+    return _soft_overlap(a_set, b_set, sim_thr)
+
+def soft_jaccard(a_set: set, b_set: set, sim_thr: float = 0.88) -> float:
+    if not a_set or not b_set:
+        return 0.0
+    inter = soft_token_overlap(a_set, b_set, sim_thr=sim_thr)
+    union = len(a_set) + len(b_set) - inter
+    return inter / max(1, union)
+
+
+# =========================
+# Statistik cache
+# =========================
+_CACHED = {
+    "seq_ratio": _seq_ratio,
+    "ratio_at_least": _ratio_at_least,
+    "soft_overlap": _soft_overlap_frozen,
+}
+
+def cache_stats() -> dict:
+    """
+    Return {nama_fungsi: {"hits", "misses", "size", "maxsize"}}.
+    """
+    out = {}
+    for name, fn in _CACHED.items():
+        info = fn.cache_info()
+        out[name] = {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+    return out
+
+def clear_caches():
+    for fn in _CACHED.values():
+        fn.cache_clear()
+
+def report_cache_stats():
+    stats = cache_stats()
+    if not any(st["hits"] or st["misses"] for st in stats.values()):
+        return
+    print("\n🧮 Cache kemiripan:", flush=True)
+    for name, st in stats.items():
+        total = st["hits"] + st["misses"]
+        rate = (st["hits"] * 100.0 / total) if total else 0.0
+        print(f"   {name:<18} hit={st['hits']:>8} miss={st['misses']:>8} ({rate:.0f}% hit, size={st['size']})", flush=True)
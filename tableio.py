@@ -0,0 +1,141 @@
+# =========================
+# INPUT/OUTPUT TABEL PER CHUNK (mode streaming script.py)
+# - iter_input_chunks(): baca register besar sedikit demi sedikit
+#     .xlsx/.xlsm -> openpyxl read-only (tidak memuat seluruh workbook)
+#     .csv        -> pandas read_csv(chunksize=...)
+#     .parquet    -> pyarrow iter_batches (pyarrow opsional, hanya kalau input parquet)
+#   index tiap chunk = nomor baris global (0, 1, 2, ... sama dengan pd.read_excel biasa)
+# - StreamingXlsxWriter: tulis xlsx write-only baris demi baris ke file tmp,
+#   lalu os.replace ke file tujuan saat close (atomik seperti safe_save_excel)
+# =========================
+
+import os
+
+import pandas as pd
+
+STREAM_EXCEL_EXT = (".xlsx", ".xlsm")
+
+
+def _frame(rows, columns, start):
+    df = pd.DataFrame(rows, columns=columns)
+    df.index = pd.RangeIndex(start, start + len(df))
+    return df
+
+def _header_names(header):
+    # sama dengan pandas: sel header kosong -> "Unnamed: i"
+    return [str(h) if h is not None else f"Unnamed: {i}" for i, h in enumerate(header)]
+
+def _iter_xlsx(path, chunk_rows):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]  # pd.read_excel default: sheet pertama
+        it = ws.iter_rows(values_only=True)
+        header = next(it, None)
+        if header is None:
+            return
+        columns = _header_names(header)
+        width = len(columns)
+
+        start = 0
+        buf = []
+        blank = []  # baris kosong di tengah tetap dihitung (seperti read_excel); di ujung file dibuang
+        for values in it:
+            values = list(values[:width]) + [None] * (width - len(values))
+            if all(v is None for v in values):
+                blank.append(values)
+                continue
+            if blank:
+                buf.extend(blank)
+                blank = []
+            buf.append(values)
+            if len(buf) >= chunk_rows:
+                yield _frame(buf, columns, start)
+                start += len(buf)
+                buf = []
+        if buf:
+            yield _frame(buf, columns, start)
+    finally:
+        wb.close()
+
+def _iter_csv(path, chunk_rows):
+    start = 0
+    for chunk in pd.read_csv(path, chunksize=chunk_rows):
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+        yield chunk
+
+def _iter_parquet(path, chunk_rows):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Input .parquet butuh pyarrow: pip install pyarrow") from e
+
+    start = 0
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+        chunk = batch.to_pandas()
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+        yield chunk
+
+def iter_input_chunks(path: str, chunk_rows: int = 1000):
+    """
+    Yield DataFrame per chunk (maks chunk_rows baris) dari xlsx/csv/parquet.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    chunk_rows = max(1, int(chunk_rows))
+    if ext in STREAM_EXCEL_EXT:
+        return _iter_xlsx(path, chunk_rows)
+    if ext == ".csv":
+        return _iter_csv(path, chunk_rows)
+    if ext == ".parquet":
+        return _iter_parquet(path, chunk_rows)
+    raise ValueError(f"Format input tidak dikenal: {path} (pakai .xlsx, .csv atau .parquet)")
+
+
+class StreamingXlsxWriter:
+    """
+    Tulis DataFrame per chunk ke satu sheet xlsx (openpyxl write-only).
+    Header diambil dari chunk pertama; chunk berikutnya harus punya kolom yang sama.
+    File tujuan baru muncul/terganti saat close() (tmp -> os.replace).
+    """
+    def __init__(self, path: str, sheet_name: str = "Sheet1"):
+        from openpyxl import Workbook
+
+        self.path = path
+        base, ext = os.path.splitext(path)
+        self.tmp_path = base + ".__tmp__" + (ext or ".xlsx")
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet(title=sheet_name)
+        self.columns = None
+        self.rows = 0
+
+    def append_frame(self, df: pd.DataFrame):
+        if self.columns is None:
+            self.columns = list(df.columns)
+            self._ws.append(self.columns)
+        elif list(df.columns) != self.columns:
+            df = df.reindex(columns=self.columns)
+        # NA/NaN -> sel kosong, numpy scalar -> python (sama seperti to_excel)
+        vals = df.astype(object).where(df.notna(), None)
+        for values in vals.itertuples(index=False, name=None):
+            self._ws.append(values)
+        self.rows += len(df)
+
+    def close(self):
+        if self._wb is None:
+            return
+        if self.columns is None:
+            self._ws.append([])
+        self._wb.save(self.tmp_path)
+        self._wb = None
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self._wb = None
+        try:
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+        except OSError:
+            pass
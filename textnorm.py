@@ -0,0 +1,211 @@
+# =========================
+# NORMALISASI TEKS (dipakai scoring di script.py)
+# - Semua regex dikompilasi sekali di level modul
+# - normalize_name / normalize_addr / name_tokens2 / addr_tokens / addr_alpha_tokens
+#   di-memo pakai LRU terbatas (input yang sama dipanggil berkali-kali per kandidat)
+# - Output harus identik dengan versi lama; token set dikembalikan sebagai frozenset
+#   supaya hasil cache tidak bisa diubah pemanggil
+# =========================
+
+import re
+from functools import lru_cache
+
+NORM_CACHE_SIZE = 65536  # entri per fungsi; cukup untuk satu register besar + kandidatnya
+
+# =========================
+# Kamus token
+# =========================
+STOP_WORDS = {
+    "jalan", "gang", "banjar", "br", "dk", "dusun",
+    "denpasar", "bali", "indonesia",
+    "kecamatan", "kec", "kelurahan", "kel", "desa", "rt", "rw",
+    "kota", "kab", "kabupaten", "prov", "provinsi",
+    "jl", "jln", "gg", "no", "nomor", "nmr",
+    "gn", "gunung",
+    "blok", "block", "lantai", "lt",
+    "komplek", "kompleks", "kompleksnya", "kompleksperum",
+    "perum", "perumahan",
+    "ruko", "kav", "kavling",
+    "km", "meter",
+    "ggg",
+}
+
+GENERIC_NAME = {
+    "warung", "toko", "ud", "cv", "pt", "resto", "restaurant", "cafe", "kedai", "depot",
+    "laundry", "salon", "barber", "bengkel", "apotek", "klinik", "clinic", "fotocopy", "foto",
+    "mart", "mini", "market", "shop", "store", "service", "jasa", "hasil",
+    "sewa", "kost", "kos", "kontrakan", "homestay", "guesthouse", "villa", "hotel"
+}
+
+NAME_STOP_EXTRA = {
+    "koperasi", "kpn", "ksp", "ksu", "kud", "lpd",
+    "yayasan", "perkumpulan", "asosiasi",
+    "serba", "usaha", "konsumen",
+}
+
+NAME_NOISE_PATTERNS = [
+    r"\(.*?\)",
+    r"\b(persero|tbk|t\.bk)\b",
+    r"\b(denpasar|bali|indonesia)\b",
+    r"\b(kantor|office|cabang|unit|pusat)\b.*$",
+    r"\b(pemerintah|pemkot|pemkab)\b.*$",
+]
+
+_NAME_SKIP = STOP_WORDS | GENERIC_NAME | NAME_STOP_EXTRA
+
+# =========================
+# Regex terkompilasi
+# =========================
+_RT_RW_RE = re.compile(r"\bRT\s*\d+\/?\s*RW\s*\d+\b", re.I)
+_RT_RE = re.compile(r"\bRT\s*\d+\b", re.I)
+_RW_RE = re.compile(r"\bRW\s*\d+\b", re.I)
+_WS_RE = re.compile(r"\s+")
+
+_LOWER_UPPER_RE = re.compile(r"([a-z])([A-Z])")
+_ALPHA_DIGIT_RE = re.compile(r"([A-Za-z])(\d)")
+_DIGIT_ALPHA_RE = re.compile(r"(\d)([A-Za-z])")
+
+_ADDR_ABBREV_RES = [
+    (re.compile(r"\bJl\.?\b", re.I), "Jalan"),
+    (re.compile(r"\bJln\.?\b", re.I), "Jalan"),
+    (re.compile(r"\bGg\.?\b", re.I), "Gang"),
+    (re.compile(r"\bBr\.?\b", re.I), "Banjar"),
+    (re.compile(r"\bDs\.?\b", re.I), "Desa"),
+    (re.compile(r"\bKel\.?\b", re.I), "Kelurahan"),
+]
+
+_NAME_SEP_RE = re.compile(r"[/,_\-]+")
+_NAME_NOISE_RES = [re.compile(p, re.I) for p in NAME_NOISE_PATTERNS]
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]")
+
+_NUM_TOK_RE = re.compile(r"\d{1,4}")
+_NUM_SUFFIX_TOK_RE = re.compile(r"\d{1,4}[a-z]{1,2}")
+_ALPHA2_TOK_RE = re.compile(r"[a-z]{2,}")
+_ROMAN_TOK_RE = re.compile(r"[ivxlcdm]{2,}")
+_ALPHA3_TOK_RE = re.compile(r"[a-z]{3,}")
+
+# =========================
+# Fungsi dasar (tanpa cache, murah)
+# =========================
+def clean_text(s: str) -> str:
+    s = str(s or "")
+    s = s.replace("<", " ").replace(">", " ")
+    s = _RT_RW_RE.sub(" ", s)
+    s = _RT_RE.sub(" ", s)
+    s = _RW_RE.sub(" ", s)
+    s = _WS_RE.sub(" ", s).strip()
+    return s
+
+# FIX penting: pecah "JalanIMAM" -> "Jalan IMAM", "No486A" -> "No 486 A"
+def _split_stuck_words(s: str) -> str:
+    if not s:
+        return ""
+    s = _LOWER_UPPER_RE.sub(r"\1 \2", s)
+    s = _ALPHA_DIGIT_RE.sub(r"\1 \2", s)
+    s = _DIGIT_ALPHA_RE.sub(r"\1 \2", s)
+    return s
+
+# =========================
+# Fungsi ter-memo (argumen dinormalkan ke str dulu supaya key cache stabil;
+# semua versi lama juga diawali str(x or ""), jadi hasilnya sama)
+# =========================
+@lru_cache(maxsize=NORM_CACHE_SIZE)
+def _normalize_addr(a: str) -> str:
+    a = clean_text(a)
+    a = _split_stuck_words(a)
+    for rx, repl in _ADDR_ABBREV_RES:
+        a = rx.sub(repl, a)
+    a = _WS_RE.sub(" ", a).strip()
+    return a
+
+@lru_cache(maxsize=NORM_CACHE_SIZE)
+def _normalize_name(s: str) -> str:
+    s = clean_text(s)
+    s = _split_stuck_words(s)
+    s = s.replace("&", " dan ")
+    s = _NAME_SEP_RE.sub(" ", s)
+    s = _WS_RE.sub(" ", s).strip()
+    low = s.lower()
+    for rx in _NAME_NOISE_RES:
+        low = rx.sub(" ", low)
+        low = _WS_RE.sub(" ", low).strip()
+    return low.strip()
+
+@lru_cache(maxsize=NORM_CACHE_SIZE)
+def _name_tokens2(s: str) -> frozenset:
+    s = _NON_ALNUM_RE.sub(" ", _normalize_name(s))
+    return frozenset(t for t in s.split() if len(t) >= 2 and t not in _NAME_SKIP)
+
+@lru_cache(maxsize=NORM_CACHE_SIZE)
+def _addr_tokens(addr: str) -> frozenset:
+    a = _NON_ALNUM_RE.sub(" ", _normalize_addr(addr).lower())
+    out = set()
+    for t in a.split():
+        if t in STOP_WORDS:
+            continue
+        if (
+            _NUM_TOK_RE.fullmatch(t)
+            or _NUM_SUFFIX_TOK_RE.fullmatch(t)
+            or _ALPHA2_TOK_RE.fullmatch(t)
+            or _ROMAN_TOK_RE.fullmatch(t)
+        ):
+            out.add(t)
+    return frozenset(out)
+
+@lru_cache(maxsize=NORM_CACHE_SIZE)
+def _addr_alpha_tokens(addr: str) -> frozenset:
+    a = _NON_ALNUM_RE.sub(" ", _normalize_addr(addr).lower())
+    return frozenset(
+        t for t in a.split()
+        if t and t not in STOP_WORDS and len(t) >= 3 and _ALPHA3_TOK_RE.fullmatch(t)
+    )
+
+def normalize_addr(addr: str) -> str:
+    return _normalize_addr(str(addr or ""))
+
+def normalize_name(s: str) -> str:
+    return _normalize_name(str(s or ""))
+
+def name_tokens2(s: str):
+    return _name_tokens2(str(s or ""))
+
+def addr_tokens(addr: str):
+    return _addr_tokens(str(addr or ""))
+
+def addr_alpha_tokens(addr: str):
+    return _addr_alpha_tokens(str(addr or ""))
+
+# =========================
+# Statistik cache
+# =========================
+_CACHED = {
+    "normalize_name": _normalize_name,
+    "normalize_addr": _normalize_addr,
+    "name_tokens2": _name_tokens2,
+    "addr_tokens": _addr_tokens,
+    "addr_alpha_tokens": _addr_alpha_tokens,
+}
+
+def cache_stats() -> dict:
+    """
+    Return {nama_fungsi: {"hits", "misses", "size", "maxsize"}}.
+    """
+    out = {}
+    for name, fn in _CACHED.items():
+        info = fn.cache_info()
+        out[name] = {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+    return out
+
+def clear_caches():
+    for fn in _CACHED.values():
+        fn.cache_clear()
+
+def report_cache_stats():
+    stats = cache_stats()
+    if not any(st["hits"] or st["misses"] for st in stats.values()):
+        return
+    print("\n🧮 Cache normalisasi:", flush=True)
+    for name, st in stats.items():
+        total = st["hits"] + st["misses"]
+        rate = (st["hits"] * 100.0 / total) if total else 0.0
+        print(f"   {name:<18} hit={st['hits']:>8} miss={st['misses']:>8} ({rate:.0f}% hit, size={st['size']})", flush=True)